@@ -0,0 +1,54 @@
+"""
+Compares two benchmark result files.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.2
+
+Exits with status 1 if any benchmark's median got slower by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+DEFAULT_THRESHOLD = 0.2
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """returns [(size, name, baseline_ms, current_ms, ratio, regressed)] for benchmarks in both."""
+    rows = []
+    for size, results in current["results"].items():
+        before = baseline["results"].get(size, {})
+        for name, result in results.items():
+            if name not in before:
+                continue
+            old, new = before[name]["median_ms"], result["median_ms"]
+            ratio = new / old if old else float("inf")
+            rows.append((size, name, old, new, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def print_comparison(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Prints the comparison table. returns the regressed rows."""
+    rows = compare(baseline, current, threshold)
+    for size, name, old, new, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{size:>8} {name:40} {old:10.2f} -> {new:10.2f} ms  x{ratio:5.2f}{flag}")
+    regressions = [row for row in rows if row[5]]
+    print(f"{len(regressions)} regression(s) over {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    return 1 if print_comparison(baseline, current, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
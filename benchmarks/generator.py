@@ -0,0 +1,131 @@
+"""
+Deterministic synthetic collections for the benchmarks.
+
+The same (size, seed) always produces the same rows, so timings from
+different runs are measured against identical data.
+"""
+import random
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# Share of the total row count that goes to each table.
+SPLIT = {"mickey": 0.5, "superheroes": 0.3, "arkas": 0.2}
+
+GREEK_WORDS = [
+    "Θησαυρός", "Φάντομ", "Ντακ", "Επιστροφή", "Μυστήριο", "Κάστρο", "Νησί", "Χρυσός",
+    "Ταξίδι", "Κατάσκοπος", "Δράκος", "Μάγισσα", "Πειρατές", "Φάντασμα", "Αίνιγμα",
+    "Περιπέτεια", "Βασιλιάς", "Ρομπότ", "Ήλιος", "Θάλασσα", "Βουνό", "Σκιά", "Κλέφτης",
+]
+GREEK_LINKS = ["του", "της", "στο", "και", "με", "για"]
+ENGLISH_WORDS = [
+    "House", "Powers", "Secret", "Wars", "Crisis", "Infinite", "Dark", "Knight", "Return",
+    "Civil", "War", "Age", "Apocalypse", "Long", "Halloween", "Death", "Family", "Kingdom",
+    "Come", "Court", "Owls", "Blackest", "Night", "Final", "Hour", "Legacy", "Origin",
+]
+WRITERS = [
+    "Jonathan Hickman", "Frank Miller", "Alan Moore", "Grant Morrison", "Scott Snyder",
+    "Ed Brubaker", "Brian Michael Bendis", "Geoff Johns", "Mark Millar", "Tom King",
+    "Chris Claremont", "Jeph Loeb", "Garth Ennis", "Neil Gaiman", "Warren Ellis",
+]
+ARTISTS = [
+    "Pepe Larraz", "Jim Lee", "Greg Capullo", "Steve McNiven", "Alex Ross", "John Romita Jr.",
+    "Jack Kirby", "Olivier Coipel", "Tim Sale", "Dave Gibbons", "Frank Quitely",
+]
+CHARACTERS = [
+    "Batman", "Superman", "Spider-Man", "X-Men", "Avengers", "Wonder Woman", "Daredevil",
+    "Fantastic Four", "Green Lantern", "Flash", "Hulk", "Thor", "Iron Man", "Punisher",
+]
+PUBLISHERS = ["Panini", "Marvel", "DC", "Mamouth", "Anubis", "Kaktos"]
+CATEGORIES = ["Marvel", "DC", "Image", "Dark Horse", "Other"]
+CATEGORY_WEIGHTS = [40, 35, 12, 8, 5]
+ARKAS_SERIES = ["Ο Ισοβίτης", "Κόκκορας", "Καστανούλης", "Ζωοφιλίες", "Ο Βλακέντιος", "Καστράτο"]
+
+# Mickey volumes hold this many issue numbers; about MISSING_RATE of them are left out.
+ISSUES_PER_VOLUME = 2000
+MISSING_RATE = 0.03
+
+
+def parse_size(text):
+    """'10k', '100k', '1m' or a plain integer."""
+    text = str(text).strip().lower()
+    if text in SIZES:
+        return SIZES[text]
+    return int(text.replace("_", ""))
+
+
+def table_sizes(total):
+    sizes = {table: int(total * share) for table, share in SPLIT.items()}
+    sizes["mickey"] += total - sum(sizes.values())
+    return sizes
+
+
+def _greek_title(rng):
+    words = rng.sample(GREEK_WORDS, rng.randint(2, 3))
+    if len(words) > 1 and rng.random() < 0.6:
+        words.insert(1, rng.choice(GREEK_LINKS))
+    return " ".join(words)
+
+
+def _english_title(rng):
+    return " ".join(rng.sample(ENGLISH_WORDS, rng.randint(2, 4)))
+
+
+def _numbered(title, seen):
+    """Numbers repeated titles so rows stay unique on the tables' natural keys."""
+    seen[title] = seen.get(title, 0) + 1
+    return title if seen[title] == 1 else f"{title} {seen[title]}"
+
+
+def mickey_rows(count, seed=0):
+    """(issue_num, vol_num, mainstory, year) with gaps in every volume."""
+    rng = random.Random(f"mickey-{seed}")
+    produced, vol_num, issue_num = 0, 1, 0
+    while produced < count:
+        issue_num += 1
+        if issue_num > ISSUES_PER_VOLUME:
+            vol_num, issue_num = vol_num + 1, 1
+        if rng.random() < MISSING_RATE:
+            continue
+        year = 1966 + (vol_num - 1) * 10 + issue_num * 10 // ISSUES_PER_VOLUME
+        yield (issue_num, vol_num, _greek_title(rng), year)
+        produced += 1
+
+
+def superhero_rows(count, seed=0):
+    """Rows in the column order bulk_add_superheroes expects."""
+    rng = random.Random(f"superheroes-{seed}")
+    seen = {}
+    for _ in range(count):
+        title = _numbered(_english_title(rng), seen)
+        first = rng.randint(1, 60)
+        yield (
+            title,
+            rng.choice(WRITERS),
+            rng.choice(ARTISTS),
+            rng.choice(["N/A", "Deluxe", "Omnibus", "Epic Collection", "Panini Gold"]),
+            rng.choice(PUBLISHERS),
+            f"{title} #{first}-{first + rng.randint(0, 11)}",
+            rng.choice(CHARACTERS),
+            rng.random() < 0.15,
+            rng.randint(1962, 2024),
+            rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0],
+        )
+
+
+def arkas_rows(count, seed=0):
+    rng = random.Random(f"arkas-{seed}")
+    seen = {}
+    for _ in range(count):
+        yield (_numbered(_greek_title(rng), seen), rng.choice(ARKAS_SERIES), rng.randint(1981, 2024))
+
+
+def populate(db, total, seed=0):
+    """Fills an empty database with a collection of total rows. returns the per-table sizes."""
+    sizes = table_sizes(total)
+    with db.using_profile("bulk_load"), db.deferred_stats():
+        db.bulk_add_mickey(mickey_rows(sizes["mickey"], seed))
+        db.bulk_add_superheroes(superhero_rows(sizes["superheroes"], seed))
+        db.bulk_add_arkas(arkas_rows(sizes["arkas"], seed))
+    db.conn.execute("ANALYZE")
+    db.conn.commit()
+    return sizes
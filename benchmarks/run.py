@@ -0,0 +1,376 @@
+"""
+Benchmark suite for the database layer, filters, CSV service and table models.
+
+    python -m benchmarks.run --sizes 10k 100k --output results.json
+    python -m benchmarks.run --sizes 10k --baseline results.json
+
+Every size gets a fresh database filled by benchmarks.generator. Results are
+written as JSON (see compare.py to diff two runs for regressions).
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from database.db_manager import DBManager
+from database.instrumentation import QueryMonitor
+from services import filters
+from services.csv_edit import CSVService
+
+from . import compare, generator
+
+try:
+    from PySide6.QtCore import QCoreApplication
+    from ui.table_models import MickeyTableModel, SuperheroTableModel
+except ImportError:
+    QCoreApplication = None
+
+CRUD_OPS = 500
+BUILDER_CALLS = 10_000
+MODEL_PAGES = 10
+
+BENCHMARKS = []
+
+
+def benchmark(name, setup=None, needs_qt=False):
+    """Registers fn(ctx) as a benchmark. setup(ctx), if given, runs untimed before every run."""
+    def register(fn):
+        BENCHMARKS.append((name, fn, setup, needs_qt))
+        return fn
+    return register
+
+
+class Context:
+    def __init__(self, workdir, size, seed):
+        self.workdir = Path(workdir)
+        self.size = size
+        self.seed = seed
+        self.db_path = self.workdir / "bench.db"
+        # Slow-query EXPLAINs would be timed along with the statements, and
+        # cached results would hide the queries being measured.
+        self.db = DBManager(self.db_path, monitor=QueryMonitor(slow_threshold_ms=float("inf")), cache_size=0)
+        self.sizes = {}
+        self.run = 0
+        self.scratch = None
+
+    def path(self, name):
+        return str(self.workdir / name)
+
+    def fresh_db(self, name):
+        path = self.workdir / name
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(f"{path}{suffix}"):
+                os.remove(f"{path}{suffix}")
+        return DBManager(path, monitor=QueryMonitor(slow_threshold_ms=float("inf")), cache_size=0)
+
+    def close(self):
+        if self.scratch is not None:
+            self.scratch.close()
+        self.db.close()
+
+
+# -------------------- DBManager CRUD --------------------
+def _crud_volume(ctx):
+    # A volume number no generated row uses, different on every run.
+    return 100_000 + ctx.run
+
+
+@benchmark("crud.add_mickey")
+def bench_add_mickey(ctx):
+    vol = _crud_volume(ctx)
+    for issue in range(1, CRUD_OPS + 1):
+        ctx.db.add_mickey(issue, vol, "Benchmark", 2000)
+
+
+@benchmark("crud.update_mickey")
+def bench_update_mickey(ctx):
+    vol = _crud_volume(ctx)
+    for issue in range(1, CRUD_OPS + 1):
+        ctx.db.update_mickey(issue, vol, "Benchmark updated", 2001)
+
+
+@benchmark("crud.delete_mickey")
+def bench_delete_mickey(ctx):
+    vol = _crud_volume(ctx)
+    for issue in range(1, CRUD_OPS + 1):
+        ctx.db.delete_mickey(issue, vol)
+
+
+# -------------------- Searches --------------------
+@benchmark("search.mickey_year")
+def bench_search_mickey_year(ctx):
+    ctx.db.advanced_search_mickey(year=1990)
+
+
+@benchmark("search.mickey_text")
+def bench_search_mickey_text(ctx):
+    ctx.db.advanced_search_mickey(text="θησαυ")
+
+
+@benchmark("search.mickey_first_page_sorted")
+def bench_search_mickey_page(ctx):
+    ctx.db.advanced_search_mickey(order_by="year", descending=True, limit=200)
+
+
+def _deep_page_cursor(ctx):
+    # Position (and keyset cursor) of a page 90% of the way down the year-sorted list.
+    ctx.deep_offset = ctx.sizes["mickey"] * 9 // 10
+    last = ctx.db.advanced_search_mickey(order_by="year", descending=True, limit=1, offset=ctx.deep_offset - 1)[0]
+    ctx.deep_after = (last["year"], last["issue_num"], last["vol_num"])
+
+
+@benchmark("search.mickey_deep_page_offset", setup=_deep_page_cursor)
+def bench_search_mickey_deep_offset(ctx):
+    ctx.db.advanced_search_mickey(order_by="year", descending=True, limit=200, offset=ctx.deep_offset)
+
+
+@benchmark("search.mickey_deep_page_keyset", setup=_deep_page_cursor)
+def bench_search_mickey_deep_keyset(ctx):
+    ctx.db.advanced_search_mickey(order_by="year", descending=True, limit=200, after=ctx.deep_after)
+
+
+@benchmark("search.superheroes_category")
+def bench_search_superheroes_category(ctx):
+    ctx.db.advanced_search_superheroes(category="Marvel")
+
+
+@benchmark("search.superheroes_writer_year_range")
+def bench_search_superheroes_writer(ctx):
+    ctx.db.advanced_search_superheroes(writer="Alan Moore", year_range=(1980, 2000))
+
+
+@benchmark("search.superheroes_by_category")
+def bench_search_by_category(ctx):
+    ctx.db.search_superheroes_by_category(publisher="Panini")
+
+
+@benchmark("search.arkas_series")
+def bench_search_arkas(ctx):
+    ctx.db.advanced_search_arkas(series_name="Κόκκορας")
+
+
+@benchmark("search.fulltext")
+def bench_fulltext(ctx):
+    ctx.db.fulltext_search("φάντομ")
+
+
+def _warm_cache(ctx):
+    if ctx.scratch is not None:
+        ctx.scratch.close()
+    ctx.scratch = DBManager(ctx.db_path, monitor=QueryMonitor(slow_threshold_ms=float("inf")))
+    ctx.scratch.advanced_search_superheroes(category="Marvel")
+
+
+@benchmark("search.superheroes_category_cached", setup=_warm_cache)
+def bench_search_cached(ctx):
+    ctx.scratch.advanced_search_superheroes(category="Marvel")
+
+
+@benchmark("stats.summary")
+def bench_stats(ctx):
+    ctx.db.stats()
+
+
+# -------------------- Missing issues --------------------
+@benchmark("missing.find_missing_issues")
+def bench_find_missing(ctx):
+    ctx.db.find_missing_issues(1, generator.ISSUES_PER_VOLUME, vol_num=1)
+
+
+@benchmark("missing.by_volume")
+def bench_find_missing_by_volume(ctx):
+    ctx.db.find_missing_issues_by_volume(1, generator.ISSUES_PER_VOLUME)
+
+
+# -------------------- Filter builders --------------------
+@benchmark("filters.build_mickey")
+def bench_build_mickey(ctx):
+    for _ in range(BUILDER_CALLS):
+        filters.build_mickey_filters(vol_num=1, year_range=(1970, 1980), text="φάντομ")
+
+
+@benchmark("filters.build_superheroes")
+def bench_build_superheroes(ctx):
+    for _ in range(BUILDER_CALLS):
+        filters.build_superheroes_filters(
+            category="Marvel", writer="Alan Moore", year_range=(1980, 2000), event=True
+        )
+
+
+@benchmark("filters.build_arkas")
+def bench_build_arkas(ctx):
+    for _ in range(BUILDER_CALLS):
+        filters.build_arkas_filters(series_name="Κόκκορας", year_range=(1990, 2000))
+
+
+@benchmark("filters.compile_spec")
+def bench_compile_spec(ctx):
+    spec = ("and", [
+        ("category", "eq", "Marvel"),
+        ("or", [("writer", "in", ["Alan Moore", "Hickman"]), ("title", "prefix", "Σπά")]),
+        ("story_year", "not_range", (1990, 1995)),
+    ])
+    for _ in range(BUILDER_CALLS):
+        filters.compile_filters("superheroes", spec)
+
+
+# -------------------- CSV --------------------
+@benchmark("csv.export_mickey")
+def bench_export_mickey(ctx):
+    CSVService(ctx.db).export_mickey(ctx.path("export_mickey.csv"))
+
+
+@benchmark("csv.export_superheroes_category")
+def bench_export_superheroes(ctx):
+    CSVService(ctx.db).export_superheroes_category(ctx.path("export_superheroes.csv"), "Marvel")
+
+
+def _prepare_import(export, csv_name):
+    """Setup exporting the benchmark data once, then opening an empty database to import into."""
+    def setup(ctx):
+        if not os.path.exists(ctx.path(csv_name)):
+            export(CSVService(ctx.db), ctx.path(csv_name))
+        if ctx.scratch is not None:
+            ctx.scratch.close()
+        ctx.scratch = ctx.fresh_db("import.db")
+    return setup
+
+
+@benchmark("csv.import_mickey", setup=_prepare_import(CSVService.export_mickey, "export_mickey.csv"))
+def bench_import_mickey(ctx):
+    CSVService(ctx.scratch).import_mickey(ctx.path("export_mickey.csv"))
+
+
+@benchmark(
+    "csv.import_superheroes",
+    setup=_prepare_import(
+        lambda service, path: service.export_superheroes_category(path, None), "export_superheroes_all.csv"
+    ),
+)
+def bench_import_superheroes(ctx):
+    CSVService(ctx.scratch).import_superheroes(ctx.path("export_superheroes_all.csv"))
+
+
+@benchmark("csv.import_arkas", setup=_prepare_import(CSVService.export_arkas, "export_arkas.csv"))
+def bench_import_arkas(ctx):
+    CSVService(ctx.scratch).import_arkas(ctx.path("export_arkas.csv"))
+
+
+# -------------------- Table models --------------------
+def _fill_model(model, **filters):
+    model.set_filters(**filters)
+    for _ in range(MODEL_PAGES - 1):
+        if not model.canFetchMore():
+            break
+        model.fetchMore()
+
+
+@benchmark("model.mickey_pages", needs_qt=True)
+def bench_model_mickey(ctx):
+    _fill_model(MickeyTableModel(ctx.db))
+
+
+@benchmark("model.superheroes_sorted_pages", needs_qt=True)
+def bench_model_superheroes(ctx):
+    model = SuperheroTableModel(ctx.db, "Marvel")
+    model.order_by = "story_year"
+    _fill_model(model)
+
+
+# -------------------- Runner --------------------
+def _time(ctx, fn, setup, repeat):
+    timings = []
+    for run in range(repeat):
+        ctx.run = run
+        if setup is not None:
+            setup(ctx)
+        started = time.perf_counter()
+        fn(ctx)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.fmean(timings),
+    }
+
+
+def run_size(size, seed, repeat, only=None, log=print):
+    """Populates a fresh database with size rows and runs every selected benchmark."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="comic-bench-") as workdir:
+        ctx = Context(workdir, size, seed)
+        try:
+            started = time.perf_counter()
+            ctx.sizes = generator.populate(ctx.db, size, seed)
+            elapsed = (time.perf_counter() - started) * 1000
+            results["populate"] = {"runs": 1, "min_ms": elapsed, "median_ms": elapsed, "mean_ms": elapsed}
+            log(f"  {'populate':40} {elapsed:10.1f} ms")
+
+            for name, fn, setup, needs_qt in BENCHMARKS:
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                if needs_qt and QCoreApplication is None:
+                    log(f"  {name:40} skipped (PySide6 not available)")
+                    continue
+                results[name] = _time(ctx, fn, setup, repeat)
+                log(f"  {name:40} {results[name]['median_ms']:10.2f} ms")
+        finally:
+            ctx.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ComicAnalytics benchmarks.")
+    parser.add_argument("--sizes", nargs="+", default=["10k"], help="collection sizes: 10k, 100k, 1m or a row count")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (default 5)")
+    parser.add_argument("--seed", type=int, default=0, help="generator seed (default 0)")
+    parser.add_argument("--only", nargs="+", help="run only benchmarks whose name starts with one of these")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="compare against an earlier JSON results file")
+    parser.add_argument("--threshold", type=float, default=compare.DEFAULT_THRESHOLD,
+                        help="relative slowdown reported as a regression (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    if QCoreApplication is not None and QCoreApplication.instance() is None:
+        app = QCoreApplication([])  # noqa: F841 (kept alive for the models)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    for label in args.sizes:
+        size = generator.parse_size(label)
+        print(f"size {size}")
+        report["results"][str(size)] = run_size(size, args.seed, args.repeat, args.only)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare.print_comparison(baseline, report, args.threshold)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
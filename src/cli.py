@@ -0,0 +1,234 @@
+"""
+Headless entry point for scripted jobs. Nothing here imports Qt.
+
+    python -m src.cli import vendor.csv
+    python -m src.cli import vendor.csv --on-conflict merge
+    python -m src.cli export superheroes marvel.csv --category Marvel -f year_range=2000-2010
+    python -m src.cli search mickey -f year=1990 --format csv
+    python -m src.cli missing 1 2500 -f vol_num=1
+    python -m src.cli stats
+    python -m src.cli backup nightly.db.gz
+    python -m src.cli snapshot backups/ --keep 14
+
+Results are printed as JSON (search can also print CSV); errors go to stderr
+with exit status 1.
+"""
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+if getattr(sys, 'frozen', False):
+    base_path = Path(sys._MEIPASS)
+else:
+    base_path = Path(__file__).parent
+
+sys.path.append(str(base_path))
+
+from database import models
+from database.db_manager import DBManager, DB_FILE, BULK_CHUNK_SIZE
+from services import backup, filters
+from services.csv_edit import CSVService
+
+TABLES = ("mickey", "superheroes", "arkas")
+INT_FILTERS = {"issue_num", "vol_num", "year", "story_year"}
+BOOL_FILTERS = {"event"}
+
+
+class CLIError(Exception):
+    pass
+
+
+def parse_filter(text):
+    """key=value from the command line, converted to what the filter builders expect."""
+    key, sep, value = text.partition("=")
+    key = key.strip()
+    if not sep or not key:
+        raise CLIError(f"filter must look like key=value: {text}")
+    value = value.strip()
+    try:
+        if key.endswith("_range"):
+            start, _, end = value.partition("-")
+            return key, (int(start), int(end))
+        if key in INT_FILTERS:
+            return key, int(value)
+    except ValueError:
+        raise CLIError(f"filter {key} needs a number{' range like 1-10' if key.endswith('_range') else ''}: {value}")
+    if key in BOOL_FILTERS:
+        return key, value.lower() in ("yes", "true", "1")
+    return key, value
+
+
+def filter_kwargs(args):
+    return dict(parse_filter(text) for text in args.filter or [])
+
+
+def write_json(data, out):
+    json.dump(data, out, ensure_ascii=False, indent=2, default=str)
+    out.write("\n")
+
+
+def write_rows(rows, fmt, out):
+    rows = [dict(row) for row in rows]
+    if fmt == "csv":
+        if rows:
+            writer = csv.DictWriter(out, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        write_json(rows, out)
+
+
+# -------------------- Commands --------------------
+def cmd_import(db, args, out):
+    service = CSVService(db)
+    table = args.table or service.detect_csv_type(args.file)
+    if table is None:
+        raise CLIError(f"could not detect the table from the headers of {args.file}")
+    report = getattr(service, f"import_{table}")(args.file, chunk_size=args.chunk_size, conflict=args.on_conflict)
+    write_json({
+        "table": table,
+        "imported": report.imported,
+        "skipped": report.skipped,
+        "failed": report.failed,
+        "errors": [{"line": line, "message": message} for line, message in report.errors],
+    }, out)
+    return 1 if args.strict and report.failed else 0
+
+
+def cmd_export(db, args, out):
+    service = CSVService(db)
+    kwargs = filter_kwargs(args)
+    kwargs.update(order_by=args.order_by, descending=args.desc)
+    if args.table == "superheroes":
+        written = service.export_superheroes_category(args.file, args.category, **kwargs)
+    elif args.category is not None:
+        raise CLIError("--category only applies to superheroes")
+    else:
+        written = getattr(service, f"export_{args.table}")(args.file, **kwargs)
+    write_json({"table": args.table, "file": args.file, "written": written}, out)
+    return 0
+
+
+def cmd_search(db, args, out):
+    kwargs = filter_kwargs(args)
+    search = getattr(db, f"advanced_search_{args.table}")
+    rows = search(order_by=args.order_by, descending=args.desc, limit=args.limit, **kwargs)
+    write_rows(rows, args.format, out)
+    return 0
+
+
+def cmd_missing(db, args, out):
+    kwargs = filter_kwargs(args)
+    if args.per_volume:
+        result = {
+            vol: {"ranges": gaps, "count": filters.count_in_ranges(gaps)}
+            for vol, gaps in db.find_missing_issues_by_volume(args.start, args.end, **kwargs).items()
+        }
+    else:
+        gaps = db.find_missing_issues(args.start, args.end, **kwargs)
+        result = {"ranges": gaps, "count": filters.count_in_ranges(gaps)}
+    write_json(result, out)
+    return 0
+
+
+def cmd_stats(db, args, out):
+    write_json(db.stats(), out)
+    return 0
+
+
+def cmd_backup(db, args, out):
+    target = backup.backup_to(db, args.target, compress=args.compress or None)
+    write_json({"source": str(db.db_path), "target": str(target)}, out)
+    return 0
+
+
+def cmd_snapshot(db, args, out):
+    path = backup.take_snapshot(db, args.directory, keep=args.keep, compress=not args.no_compress)
+    snapshots = backup.list_snapshots(args.directory, db.db_path)
+    write_json({"snapshot": str(path), "kept": [str(p) for p in snapshots]}, out)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="comic-analytics", description="ComicAnalytics without the GUI.")
+    parser.add_argument("--db", default=str(DB_FILE), help="database file (default: the app's data.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_filters(sub):
+        sub.add_argument("-f", "--filter", action="append", metavar="KEY=VALUE",
+                         help="search filter, repeatable (e.g. year=1990, year_range=1980-1990, text=φάντομ)")
+
+    def add_sort(sub):
+        sub.add_argument("--order-by", help="column to sort by")
+        sub.add_argument("--desc", action="store_true", help="sort descending")
+
+    sub = commands.add_parser("import", help="import a CSV file")
+    sub.add_argument("file")
+    sub.add_argument("--table", choices=TABLES, help="target table (default: detected from the headers)")
+    sub.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    sub.add_argument("--on-conflict", choices=models.CONFLICT_POLICIES, default="error",
+                     help="rows already stored: report them (default), skip, overwrite, or merge non-empty values")
+    sub.add_argument("--strict", action="store_true", help="exit with status 1 if any row failed")
+    sub.set_defaults(func=cmd_import)
+
+    sub = commands.add_parser("export", help="export a table to CSV")
+    sub.add_argument("table", choices=TABLES)
+    sub.add_argument("file")
+    sub.add_argument("--category", help="superheroes category (default: all)")
+    add_filters(sub)
+    add_sort(sub)
+    sub.set_defaults(func=cmd_export)
+
+    sub = commands.add_parser("search", help="print matching rows")
+    sub.add_argument("table", choices=TABLES)
+    sub.add_argument("--format", choices=("json", "csv"), default="json")
+    sub.add_argument("--limit", type=int)
+    add_filters(sub)
+    add_sort(sub)
+    sub.set_defaults(func=cmd_search)
+
+    sub = commands.add_parser("missing", help="missing mickey issues between start and end")
+    sub.add_argument("start", type=int)
+    sub.add_argument("end", type=int)
+    sub.add_argument("--per-volume", action="store_true", help="report gaps for every volume")
+    add_filters(sub)
+    sub.set_defaults(func=cmd_missing)
+
+    sub = commands.add_parser("stats", help="collection statistics")
+    sub.set_defaults(func=cmd_stats)
+
+    sub = commands.add_parser("backup", help="copy the database to a file (gzipped if it ends in .gz)")
+    sub.add_argument("target")
+    sub.add_argument("--compress", action="store_true", help="gzip the copy whatever its name")
+    sub.set_defaults(func=cmd_backup)
+
+    sub = commands.add_parser("snapshot", help="timestamped, rotated backup into a folder")
+    sub.add_argument("directory")
+    sub.add_argument("--keep", type=int, default=backup.SNAPSHOT_KEEP, help="snapshots to keep (default %(default)s)")
+    sub.add_argument("--no-compress", action="store_true")
+    sub.set_defaults(func=cmd_snapshot)
+    return parser
+
+
+def main(argv=None, out=None):
+    out = out or sys.stdout
+    args = build_parser().parse_args(argv)
+    try:
+        db = DBManager(args.db)
+    except sqlite3.Error as e:
+        print(f"error: cannot open {args.db}: {e}", file=sys.stderr)
+        return 1
+    try:
+        return args.func(db, args, out)
+    except (CLIError, ValueError, TypeError, OSError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# database/cache.py
+import re
+from collections import OrderedDict
+
+_SPACE = re.compile(r"\s+")
+
+
+class QueryCache:
+    """
+    LRU cache of query results keyed by (normalized SQL, params).
+
+    Every entry remembers the write generation of the tables it read.
+    invalidate(table) bumps that table's generation, so stale entries
+    are dropped on their next lookup instead of being searched for.
+    Size is bounded both by entry count and by the total cached rows.
+    """
+
+    def __init__(self, capacity=256, max_rows=200_000):
+        self.capacity = capacity
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._rows = 0
+        self._data_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(sql, params=()):
+        return _SPACE.sub(" ", sql).strip(), tuple(params)
+
+    def generation(self, table):
+        return self._generations.get(table, 0)
+
+    def _snapshot(self, tables):
+        return tuple(self.generation(table) for table in tables)
+
+    def get(self, key, tables):
+        """returns the cached rows, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == self._snapshot(tables):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            self._drop(key)
+        self.misses += 1
+        return None
+
+    def put(self, key, tables, rows):
+        if self.capacity <= 0 or len(rows) > self.max_rows:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (self._snapshot(tables), rows)
+        self._rows += len(rows)
+        while len(self._entries) > self.capacity or self._rows > self.max_rows:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key):
+        _, rows = self._entries.pop(key)
+        self._rows -= len(rows)
+
+    def invalidate(self, *tables):
+        for table in tables:
+            self._generations[table] = self.generation(table) + 1
+
+    def clear(self):
+        """Drops every entry; used when the writer is unknown (ad-hoc SQL, other connections)."""
+        self._entries.clear()
+        self._rows = 0
+
+    def observe_data_version(self, version):
+        """
+        Clears the cache when PRAGMA data_version moved, i.e. another
+        connection (a worker thread, the CLI) committed since the last look.
+        """
+        if self._data_version is not None and version != self._data_version:
+            self.clear()
+        self._data_version = version
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "rows": self._rows,
+            "capacity": self.capacity,
+            "max_rows": self.max_rows,
+        }
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
@@ -1,7 +1,12 @@
 import sqlite3
 import sys
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from . import models
+from . import instrumentation, migrations, models
+from .cache import QueryCache
+from .text import normalize
+from .profiles import PROFILES, DEFAULT_PROFILE, REPORTED_PRAGMAS
 from services import filters
 
 if getattr(sys, 'frozen', False):
@@ -9,154 +14,797 @@ if getattr(sys, 'frozen', False):
 else:
     BASE_DIR = Path(__file__).parent
 DB_FILE = BASE_DIR / "data.db"
+BULK_CHUNK_SIZE = 1000
+# A bulk insert drops the table's secondary and full-text indexes and rebuilds
+# them before committing once it has added this many rows and at least a
+# quarter of what the table held; smaller batches into a large table keep them.
+REINDEX_MIN_ROWS = BULK_CHUNK_SIZE
+FETCH_CHUNK_SIZE = 1000
+SUGGEST_LIMIT = 10
+
+def is_interrupted(error):
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code == sqlite3.SQLITE_INTERRUPT
+    return isinstance(error, sqlite3.OperationalError) and "interrupted" in str(error)
+
 
 class DBManager:
-    def __init__(self, db_path=DB_FILE):
+    def __init__(self, db_path=DB_FILE, profile=DEFAULT_PROFILE, monitor=None, cache_size=256):
         self.db_path = db_path
+        self.monitor = monitor or instrumentation.default_monitor
+        self.cache = QueryCache(capacity=cache_size)
+        self._is_cancelled = None
+        self._cancel_every = 0
+        self._subscribers = []
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
+        # Used by write statements for the normalized copies, and by migration 3 to fill them.
+        self.conn.create_function("normalize", 1, normalize, deterministic=True)
+        self.profile = None
         self._create_tables()
+        self.apply_profile(profile)
 
-    def _create_tables(self):
-        cur = self.conn.cursor()
-        cur.execute(models.CREATE_MICKEY_TABLE)
-        cur.execute(models.CREATE_SUPERHEROES_TABLE)
-        cur.execute(models.CREATE_ARKAS_TABLE)
+    def apply_profile(self, name):
+        if name not in PROFILES:
+            raise ValueError(f"Unknown connection profile: {name}")
+        if self.conn.in_transaction:
+            self.conn.commit()
+        for pragma, value in PROFILES[name]:
+            self.conn.execute(f"PRAGMA {pragma} = {value}")
+        self.profile = name
+
+    @contextmanager
+    def using_profile(self, name):
+        previous = self.profile
+        self.apply_profile(name)
+        try:
+            yield self
+        finally:
+            self.apply_profile(previous)
+
+    def profile_info(self):
+        info = {"profile": self.profile}
+        for pragma in REPORTED_PRAGMAS:
+            # Some pragmas return no row, e.g. mmap_size where memory mapping is unavailable.
+            row = self.conn.execute(f"PRAGMA {pragma}").fetchone()
+            info[pragma] = row[0] if row else None
+        return info
+
+    def checkpoint(self):
         self.conn.commit()
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _create_tables(self):
+        migrations.migrate(self.conn)
+
+    def schema_version(self):
+        return migrations.current_version(self.conn)
 
     def add_mickey(self, issue_num, vol_num, mainstory, year):
-        cur = self.conn.cursor()
-        cur.execute(
-            "INSERT INTO mickey (issue_num, vol_num, mainstory, year) VALUES (?, ?, ?, ?)",
-            (issue_num, vol_num, mainstory, year),
-        )
+        self._execute(models.insert_statement("mickey"), (issue_num, vol_num, mainstory, year))
         self.conn.commit()
+        self.cache.invalidate("mickey")
+        self._notify("mickey", "insert", [(issue_num, vol_num)])
+
+    def bulk_add_mickey(self, rows, chunk_size=BULK_CHUNK_SIZE, progress=None, conflict="error"):
+        return self._bulk_insert("mickey", self._insert_statement("mickey", conflict), rows, chunk_size, progress)
 
     def delete_mickey(self, issue_num, vol_num):
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM mickey WHERE issue_num = ? AND vol_num = ?", (issue_num, vol_num))
+        self._execute("DELETE FROM mickey WHERE issue_num = ? AND vol_num = ?", (issue_num, vol_num))
         self.conn.commit()
+        self.cache.invalidate("mickey")
+        self._notify("mickey", "delete", [(issue_num, vol_num)])
+
+    def delete_many_mickey(self, keys):
+        """keys are (issue_num, vol_num) pairs. returns the number of rows deleted."""
+        return self._delete_many("mickey", keys)
+
+    def update_many_mickey(self, keys, **changes):
+        """Sets the same column values on every (issue_num, vol_num) in keys. returns the rows updated."""
+        return self._update_many("mickey", keys, changes)
 
     def search_mickey(self, **filters_kwargs):
-        query = "SELECT * FROM mickey"
+        query = f"SELECT {', '.join(models.ROW_COLUMNS['mickey'])} FROM mickey"
         conditions, values = [], []
         for key, val in filters_kwargs.items():
             conditions.append(f"{key} = ?")
             values.append(val)
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
-        cur = self.conn.cursor()
-        cur.execute(query, values)
-        return cur.fetchall()
+        return self._cached_query(("mickey",), query, values)
     
-    def advanced_search_mickey(self, **kwargs):
-        query, values, exclude_range = filters.build_mickey_filters(**kwargs)
-        print("QUERY:", query)
-        print("VALUES:", values)
-        cur = self.conn.cursor()
-        cur.execute(query, values)
-        return cur.fetchall()
+    def advanced_search_mickey(self, order_by=None, descending=False, limit=None, offset=0, after=None, keys=None,
+                               spec=None, **kwargs):
+        """
+        after continues from a row: its values of filters.sort_columns(order_by,
+        models.KEY_COLUMNS["mickey"]). keys limits the search to those rows.
+        spec is a filters.compile_filters() spec, ANDed with the keyword filters.
+        """
+        query, values = filters.filter_query("mickey", spec, **kwargs)
+        if keys is not None:
+            query, values = filters.restrict_to_keys(query, values, models.KEY_COLUMNS["mickey"], keys)
+        query, values = filters.paginate(
+            query, values, order_by, descending, limit, offset, after, models.KEY_COLUMNS["mickey"]
+        )
+        return self._cached_query(("mickey",), query, values)
 
-    def find_missing_issues(self, start, end, **kwargs):
-        query, values, _ = filters.build_mickey_filters(**kwargs)
-        print("QUERY (missing):", query)
-        print("VALUES (missing):", values)
-        cur = self.conn.cursor()
-        cur.execute(query, values)
-        existing = {row["issue_num"] for row in cur.fetchall()}
-        return [num for num in range(start, end + 1) if num not in existing]
+    def iter_mickey(self, order_by=None, descending=False, chunk_size=FETCH_CHUNK_SIZE, spec=None, **kwargs):
+        query, values = filters.filter_query("mickey", spec, **kwargs)
+        query, values = filters.paginate(query, values, order_by, descending, key_columns=models.KEY_COLUMNS["mickey"])
+        return self._iter_query(query, values, chunk_size)
 
+    def find_missing_issues(self, start, end, **kwargs):
+        """
+        Gaps in issue_num between start and end (inclusive) among the rows
+        matching the mickey filters, computed in SQLite with LEAD().
+        returns [(gap_start, gap_end)], empty when start > end.
+        """
+        if start > end:
+            return []
+        query, values = filters.filter_query("mickey", **kwargs)
+        rows = self._cached_query(("mickey",),
+            f"""
+            WITH present AS (
+                SELECT DISTINCT issue_num FROM ({query}) WHERE issue_num BETWEEN ? AND ?
+            ),
+            bounds AS (
+                SELECT issue_num FROM present
+                UNION ALL SELECT ? - 1
+                UNION ALL SELECT ? + 1
+            ),
+            steps AS (
+                SELECT issue_num, LEAD(issue_num) OVER (ORDER BY issue_num) AS next_num
+                FROM bounds
+            )
+            SELECT issue_num + 1 AS gap_start, next_num - 1 AS gap_end
+            FROM steps
+            WHERE next_num - issue_num > 1
+            ORDER BY gap_start
+            """,
+            [*values, start, end, start, end],
+        )
+        return [(row["gap_start"], row["gap_end"]) for row in rows]
 
+    def find_missing_issues_by_volume(self, start, end, **kwargs):
+        """
+        Same as find_missing_issues but per vol_num, for every volume that has
+        rows matching the filters. returns {vol_num: [(gap_start, gap_end)]},
+        empty when start > end.
+        """
+        if start > end:
+            return {}
+        query, values = filters.filter_query("mickey", **kwargs)
+        rows = self._cached_query(("mickey",),
+            f"""
+            WITH filtered AS ({query}),
+            present AS (
+                SELECT DISTINCT vol_num, issue_num FROM filtered WHERE issue_num BETWEEN ? AND ?
+            ),
+            vols AS (SELECT DISTINCT vol_num FROM filtered),
+            bounds AS (
+                SELECT vol_num, issue_num FROM present
+                UNION ALL SELECT vol_num, ? - 1 FROM vols
+                UNION ALL SELECT vol_num, ? + 1 FROM vols
+            ),
+            steps AS (
+                SELECT vol_num, issue_num,
+                       LEAD(issue_num) OVER (PARTITION BY vol_num ORDER BY issue_num) AS next_num
+                FROM bounds
+            )
+            SELECT vol_num, issue_num + 1 AS gap_start, next_num - 1 AS gap_end
+            FROM steps
+            WHERE next_num - issue_num > 1
+            ORDER BY vol_num, gap_start
+            """,
+            [*values, start, end, start, end],
+        )
+        gaps = {}
+        for row in rows:
+            gaps.setdefault(row["vol_num"], []).append((row["gap_start"], row["gap_end"]))
+        return gaps
 
     def add_superhero(self, title, writer, artist, collection, publisher, issues, main_character, event, story_year, category):
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO superheroes 
-            (title, writer, artist, collection, publisher, issues, main_character, event, story_year, category)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        """
+        raises sqlite3.IntegrityError if a row with the same title, publisher
+        and issues is stored (models.NATURAL_KEYS), unless a NULL is among them.
+        """
+        cur = self._execute(
+            models.insert_statement("superheroes"),
             (title, writer, artist, collection, publisher, issues, main_character, event, story_year, category),
         )
         self.conn.commit()
+        self.cache.invalidate("superheroes")
+        self._notify("superheroes", "insert", [(cur.lastrowid,)])
+
+    def bulk_add_superheroes(self, rows, chunk_size=BULK_CHUNK_SIZE, progress=None, conflict="error"):
+        return self._bulk_insert(
+            "superheroes", self._insert_statement("superheroes", conflict), rows, chunk_size, progress
+        )
 
     def delete_superhero(self, id):
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM superheroes WHERE id = ?", (id,))
+        self._execute("DELETE FROM superheroes WHERE id = ?", (id,))
         self.conn.commit()
+        self.cache.invalidate("superheroes")
+        self._notify("superheroes", "delete", [(id,)])
+
+    def delete_many_superheroes(self, ids):
+        return self._delete_many("superheroes", [(id,) for id in ids])
+
+    def update_many_superheroes(self, ids, **changes):
+        return self._update_many("superheroes", [(id,) for id in ids], changes)
 
     def search_superheroes(self, **kwargs):
-        query = "SELECT * FROM superheroes"
+        query = f"SELECT {', '.join(models.ROW_COLUMNS['superheroes'])} FROM superheroes"
         conditions, values = [], []
         for key, val in kwargs.items():
             conditions.append(f"{key} = ?")
             values.append(val)
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
-        cur = self.conn.cursor()
-        cur.execute(query, values)
-        return cur.fetchall()
+        return self._cached_query(("superheroes",), query, values)
     
-    def advanced_search_superheroes(self, **kwargs):
-        query, values = filters.build_superheroes_filters(**kwargs)
-        print("QUERY:", query)
-        print("VALUES:", values)
-        cur = self.conn.cursor()
-        cur.execute(query, values)
-        return cur.fetchall()
+    def advanced_search_superheroes(self, order_by=None, descending=False, limit=None, offset=0, after=None, keys=None,
+                                    spec=None, **kwargs):
+        query, values = filters.filter_query("superheroes", spec, **kwargs)
+        if keys is not None:
+            query, values = filters.restrict_to_keys(query, values, models.KEY_COLUMNS["superheroes"], keys)
+        query, values = filters.paginate(
+            query, values, order_by, descending, limit, offset, after, models.KEY_COLUMNS["superheroes"]
+        )
+        return self._cached_query(("superheroes",), query, values)
+
+    def iter_superheroes(self, order_by=None, descending=False, chunk_size=FETCH_CHUNK_SIZE, spec=None, **kwargs):
+        query, values = filters.filter_query("superheroes", spec, **kwargs)
+        query, values = filters.paginate(query, values, order_by, descending, key_columns=models.KEY_COLUMNS["superheroes"])
+        return self._iter_query(query, values, chunk_size)
+
+    def search_superheroes_by_category(self, order_by=None, descending=False, orders=None, **kwargs):
+        """
+        Runs the filtered search once and splits the result by category
+        in a single pass. Rows are sorted by order_by, or by the
+        (order_by, descending) that orders maps their category to; each
+        distinct order there costs one more query. returns {category: [rows]}.
+        """
+        orders = orders or {}
+        default = (order_by, descending)
+        partitions = {}
+        for order in dict.fromkeys([default] + list(orders.values())):
+            for row in self.advanced_search_superheroes(order_by=order[0], descending=order[1], **kwargs):
+                if orders.get(row["category"], default) == order:
+                    partitions.setdefault(row["category"], []).append(row)
+        return partitions
 
     def update_mickey(self, issue_num, vol_num, mainstory, year):
-        cur = self.conn.cursor()
-        cur.execute("""
-            UPDATE mickey
-            SET mainstory = ?, year = ?
-            WHERE issue_num = ? AND vol_num = ?
-        """, (mainstory, year, issue_num, vol_num))
+        assignments, values = self._assignments("mickey", {"mainstory": mainstory, "year": year})
+        self._execute(
+            f"UPDATE mickey SET {assignments} WHERE issue_num = ? AND vol_num = ?", [*values, issue_num, vol_num]
+        )
         self.conn.commit()
+        self.cache.invalidate("mickey")
+        self._notify("mickey", "update", [(issue_num, vol_num)])
 
     def update_superhero(self, id, title, writer, artist, collection,publisher, issues, main_character, event, story_year, category):
-        cur = self.conn.cursor()
-        cur.execute("""
-            UPDATE superheroes
-            SET title=?, writer=?, artist=?, collection=?, publisher=?,
-                issues=?, main_character=?, event=?, story_year=?, category=? 
-            WHERE id = ?
-        """, (title, writer, artist, collection, publisher,
-            issues, main_character, event, story_year, category, id))
+        assignments, values = self._assignments("superheroes", {
+            "title": title, "writer": writer, "artist": artist, "collection": collection,
+            "publisher": publisher, "issues": issues, "main_character": main_character,
+            "event": event, "story_year": story_year, "category": category,
+        })
+        self._execute(f"UPDATE superheroes SET {assignments} WHERE id = ?", [*values, id])
         self.conn.commit()
+        self.cache.invalidate("superheroes")
+        self._notify("superheroes", "update", [(id,)])
+
+    def suggest(self, table, column, prefix, limit=SUGGEST_LIMIT):
+        """
+        Up to limit distinct values of table.column that start with prefix,
+        ignoring accents and case, in order. A range scan on the index of the
+        column's normalized copy that stops after limit values.
+        """
+        if column not in models.SUGGEST_COLUMNS.get(table, ()):
+            raise ValueError(f"No suggestions for {table}.{column}")
+        copy = models.normalized_column(column)
+        condition, params = filters.prefix_condition(copy, normalize(prefix))
+        rows = self._cached_query(
+            (table,),
+            f"""SELECT MIN({column}) AS value FROM {table} WHERE {condition}
+                GROUP BY {copy} ORDER BY {copy} LIMIT ?""",
+            [*params, limit],
+        )
+        return [row["value"] for row in rows if row["value"]]
 
     def get_superhero_categories(self):
-        cur = self.conn.cursor()
-        cur.execute("SELECT DISTINCT category FROM superheroes")
-        rows = cur.fetchall()
+        rows = self._cached_query(("superheroes",), "SELECT DISTINCT category FROM superheroes")
         return [row["category"] for row in rows]
 
     def add_arkas(self, story_name, series_name, year):
-        cur = self.conn.cursor()
-        cur.execute( "INSERT INTO arkas (story_name, series_name, year) VALUES (?, ?, ?)", (story_name, series_name, year)) 
+        """
+        raises sqlite3.IntegrityError if a row with the same story_name and
+        series_name is stored (models.NATURAL_KEYS), unless either is NULL.
+        """
+        cur = self._execute(models.insert_statement("arkas"), (story_name, series_name, year))
         self.conn.commit()
+        self.cache.invalidate("arkas")
+        self._notify("arkas", "insert", [(cur.lastrowid,)])
+
+    def bulk_add_arkas(self, rows, chunk_size=BULK_CHUNK_SIZE, progress=None, conflict="error"):
+        return self._bulk_insert("arkas", self._insert_statement("arkas", conflict), rows, chunk_size, progress)
     
     def delete_arkas(self, id):
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM arkas WHERE id = ?", (id,))
+        self._execute("DELETE FROM arkas WHERE id = ?", (id,))
         self.conn.commit()
+        self.cache.invalidate("arkas")
+        self._notify("arkas", "delete", [(id,)])
     
+    def delete_many_arkas(self, ids):
+        return self._delete_many("arkas", [(id,) for id in ids])
+
+    def update_many_arkas(self, ids, **changes):
+        return self._update_many("arkas", [(id,) for id in ids], changes)
+
     def search_arkas(self, **kwargs):
-        query = "SELECT * FROM arkas"
+        query = f"SELECT {', '.join(models.ROW_COLUMNS['arkas'])} FROM arkas"
         conditions, values = [], []
         for key, val in kwargs.items():
             conditions.append(f"{key} = ?")
             values.append(val)
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
-        cur = self.conn.cursor()
-        cur.execute(query, values)
-        return cur.fetchall()
+        return self._cached_query(("arkas",), query, values)
+
+    def advanced_search_arkas(self, order_by=None, descending=False, limit=None, offset=0, after=None, keys=None,
+                              spec=None, **kwargs):
+        query, values = filters.filter_query("arkas", spec, **kwargs)
+        if keys is not None:
+            query, values = filters.restrict_to_keys(query, values, models.KEY_COLUMNS["arkas"], keys)
+        query, values = filters.paginate(
+            query, values, order_by, descending, limit, offset, after, models.KEY_COLUMNS["arkas"]
+        )
+        return self._cached_query(("arkas",), query, values)
+
+    def iter_arkas(self, order_by=None, descending=False, chunk_size=FETCH_CHUNK_SIZE, spec=None, **kwargs):
+        query, values = filters.filter_query("arkas", spec, **kwargs)
+        query, values = filters.paginate(query, values, order_by, descending, key_columns=models.KEY_COLUMNS["arkas"])
+        return self._iter_query(query, values, chunk_size)
 
     def update_arkas(self, id, story_name, series_name, year):
-        cur = self.conn.cursor()
-        cur.execute("""UPDATE arkas SET story_name=?, series_name=?, year=? WHERE id=? """, (story_name, series_name, year, id))
+        assignments, values = self._assignments(
+            "arkas", {"story_name": story_name, "series_name": series_name, "year": year}
+        )
+        self._execute(f"UPDATE arkas SET {assignments} WHERE id = ?", [*values, id])
         self.conn.commit()
+        self.cache.invalidate("arkas")
+        self._notify("arkas", "update", [(id,)])
     
+    def _assignments(self, table, changes):
+        """SET clause and values for changes, including the normalized copies (models.NORMALIZED_COPIES)."""
+        changes = models.with_normalized(table, changes)
+        return ", ".join(f"{column} = ?" for column in changes), list(changes.values())
+
+    def _key_condition(self, table):
+        return " AND ".join(f"{column} = ?" for column in models.KEY_COLUMNS[table])
+
+    def _delete_many(self, table, keys):
+        keys = [tuple(key) for key in keys]
+        deleted = self._write_many(table, f"DELETE FROM {table} WHERE {self._key_condition(table)}", keys)
+        self._notify(table, "delete", keys)
+        return deleted
+
+    def _update_many(self, table, keys, changes):
+        invalid = sorted(set(changes) - models.EDITABLE_COLUMNS[table])
+        if invalid:
+            raise ValueError(f"Not editable: {', '.join(invalid)}")
+        if not changes:
+            return 0
+        assignments, values = self._assignments(table, changes)
+        keys = [tuple(key) for key in keys]
+        updated = self._write_many(
+            table, f"UPDATE {table} SET {assignments} WHERE {self._key_condition(table)}",
+            [(*values, *key) for key in keys],
+        )
+        self._notify(table, "update", keys)
+        return updated
+
+    def _write_many(self, table, query, params):
+        """One executemany in one transaction. returns the number of rows changed."""
+        self.conn.execute("BEGIN")
+        try:
+            cur = self._executemany(query, params)
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self.cache.invalidate(table)
+        return cur.rowcount
+
+    def apply_edits(self, table, edits):
+        """
+        Writes buffered cell edits in one transaction. edits maps a row key
+        (values of models.KEY_COLUMNS[table], as a tuple) to {column: value};
+        only those columns are updated. A failing row is rolled back to its
+        savepoint and reported without stopping the others.
+        returns {key: error message} for the rows that were not saved.
+        """
+        editable = models.EDITABLE_COLUMNS[table]
+        where = self._key_condition(table)
+        failures = {}
+        self.conn.execute("BEGIN")
+        try:
+            for key, changes in edits.items():
+                invalid = sorted(set(changes) - editable)
+                if invalid:
+                    failures[key] = f"Not editable: {', '.join(invalid)}"
+                    continue
+                if not changes:
+                    continue
+                assignments, values = self._assignments(table, changes)
+                self.conn.execute("SAVEPOINT edit")
+                try:
+                    cur = self._execute(f"UPDATE {table} SET {assignments} WHERE {where}", [*values, *key])
+                    if cur.rowcount == 0:
+                        failures[key] = "Row no longer exists"
+                except sqlite3.Error as e:
+                    if is_interrupted(e):
+                        raise
+                    self.conn.execute("ROLLBACK TO edit")
+                    failures[key] = str(e)
+                self.conn.execute("RELEASE edit")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self.cache.invalidate(table)
+        saved = [key for key, changes in edits.items() if changes and key not in failures]
+        if saved:
+            self._notify(table, "update", saved)
+        return failures
+
+    def _insert_statement(self, table, conflict):
+        if conflict != "error":
+            self.ensure_natural_key(table)
+        return models.insert_statement(table, conflict)
+
+    def ensure_natural_key(self, table):
+        """
+        Creates the natural key index that the migration leaves out while rows
+        share a key. raises ValueError naming those keys.
+        """
+        index = models.NATURAL_KEY_INDEXES.get(table)
+        if index is None or self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index,)
+        ).fetchone():
+            return
+        conflicts = models.create_natural_key(self.conn, table)
+        self.conn.commit()
+        if conflicts:
+            shown = "; ".join(" / ".join(map(str, key[:-1])) + f" ({key[-1]} rows)" for key in conflicts[:5])
+            raise ValueError(
+                f"{table} rows share {', '.join(models.NATURAL_KEYS[table])}: {shown}. "
+                "Merge, rename or delete them before importing with a conflict policy."
+            )
+
+    def _defer_indexes(self, table):
+        """
+        Drops the table's non-unique indexes and its full-text insert trigger
+        inside the current transaction. Every chunk savepoint journals each
+        index page it touches and makes FTS5 write a new segment, so a large
+        batch rewrites them over and over; building them once from the
+        finished table is a single pass each. Unique indexes stay, upserts
+        and conflict checks need them. New rows get keys above the current
+        maximum, so only those are added to the full-text index afterwards.
+        returns the statements that restore everything, for before commit.
+        """
+        statements = []
+        for index in self.conn.execute(f"PRAGMA index_list({table})").fetchall():
+            if index["unique"] or index["origin"] != "c":
+                continue
+            statements.append(self.conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (index["name"],)
+            ).fetchone()[0])
+            self._execute(f"DROP INDEX {index['name']}")
+        if table in models.FULLTEXT_TABLES:
+            fts, key, _ = models.FULLTEXT_TABLES[table]
+            trigger = self.conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"{table}_fts_ai",)
+            ).fetchone()
+            if trigger is not None:
+                last = self.conn.execute(f"SELECT IFNULL(MAX({key}), 0) FROM {table}").fetchone()[0]
+                self._execute(f"DROP TRIGGER {table}_fts_ai")
+                statements += [trigger[0], models.fulltext_fill_statement(table, after=last)]
+        return statements
+
+    def _bulk_insert(self, table, query, rows, chunk_size, progress=None):
+        """
+        Inserts rows with executemany in chunks, all inside one transaction.
+        A failing chunk is rolled back to its savepoint and replayed row by row,
+        so bad rows are reported without aborting the rest of the batch.
+        An interrupt (see interrupt()) rolls back the whole batch instead.
+        With an upsert query, inserted counts the rows actually inserted or
+        changed; rows skipped by the conflict policy are not counted.
+        A large batch rebuilds the indexes at the end instead (see _defer_indexes).
+        returns (inserted, failures) with failures as (row index, row, error).
+        """
+        inserted, failures = 0, []
+        rows = iter(rows)
+        offset = 0
+        restore = None
+        self.conn.execute("BEGIN")
+        try:
+            existing = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                if restore is None and offset >= REINDEX_MIN_ROWS and offset * 4 >= existing:
+                    restore = self._defer_indexes(table)
+                self.conn.execute("SAVEPOINT bulk_chunk")
+                try:
+                    inserted += self._executemany(query, chunk).rowcount
+                except sqlite3.Error as e:
+                    if is_interrupted(e):
+                        raise
+                    self.conn.execute("ROLLBACK TO bulk_chunk")
+                    for i, row in enumerate(chunk):
+                        try:
+                            inserted += self._execute(query, row).rowcount
+                        except sqlite3.Error as e:
+                            if is_interrupted(e):
+                                raise
+                            failures.append((offset + i, row, str(e)))
+                self.conn.execute("RELEASE bulk_chunk")
+                offset += len(chunk)
+                if progress is not None:
+                    progress(offset, 0)
+            for statement in restore or ():
+                self._execute(statement)
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            # Bumped once the transaction is over: results read in between, e.g. from a
+            # progress callback, may hold rows a rollback has just taken back.
+            self.cache.invalidate(table)
+        if inserted:
+            # Too many keys to be worth listing; subscribers reload instead.
+            self._notify(table, "insert", None)
+        return inserted, failures
+
+    def fulltext_search(self, text, tables=None, limit=50):
+        """
+        Ranked full-text search over story titles and names.
+        returns [(table, rank, row)] best match first (lower bm25 rank is better).
+        """
+        hits = []
+        for table in tables or list(models.FULLTEXT_TABLES):
+            fts, key, _ = models.FULLTEXT_TABLES[table]
+            rows = self._query(
+                f"""
+                SELECT {table}.*, bm25({fts}) AS rank
+                FROM {fts} JOIN {table} ON {table}.{key} = {fts}.rowid
+                WHERE {fts} MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (filters.fts_query(text), limit),
+            )
+            hits.extend((table, row["rank"], row) for row in rows)
+        hits.sort(key=lambda hit: hit[1])
+        return hits[:limit]
+
+    def execute_sql(self, query):
+        """Runs an ad-hoc statement and commits. returns (headers, rows)."""
+        cur = self.conn.cursor()
+        with self.monitor.timed(self, query, ()) as timing:
+            cur.execute(query)
+            rows = cur.fetchall()
+            timing.rows = len(rows) if cur.description else cur.rowcount
+        headers = [desc[0] for desc in cur.description] if cur.description else []
+        self.conn.commit()
+        if not query.lstrip().upper().startswith("SELECT"):
+            # Ad-hoc statements may touch any table.
+            self.cache.clear()
+        return headers, rows
+
+    # -------------------- Instrumented execution --------------------
+    def _execute(self, query, params=()):
+        cur = self.conn.cursor()
+        with self.monitor.timed(self, query, params) as timing:
+            cur.execute(query, params)
+            timing.rows = cur.rowcount
+        return cur
+
+    def _executemany(self, query, seq_of_params):
+        cur = self.conn.cursor()
+        with self.monitor.timed(self, query, ()) as timing:
+            cur.executemany(query, seq_of_params)
+            timing.rows = cur.rowcount
+        return cur
+
+    def _query(self, query, params=()):
+        cur = self.conn.cursor()
+        with self.monitor.timed(self, query, params) as timing:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+            timing.rows = len(rows)
+        return rows
+
+    def stats(self):
+        """
+        Collection statistics read from the trigger-maintained collection_stats
+        table: per-table totals and counts per value of every STATS_DIMENSIONS
+        column. No base table is scanned.
+        """
+        rows = self._cached_query(
+            tuple(models.STATS_DIMENSIONS),
+            "SELECT source, dimension, value, count FROM collection_stats ORDER BY source, dimension, value",
+        )
+        stats = {}
+        for table, dimensions in models.STATS_DIMENSIONS.items():
+            stats[table] = {"total": 0}
+            stats[table].update((key, {}) for _, key in dimensions)
+        keys = {
+            (table, column): key
+            for table, dimensions in models.STATS_DIMENSIONS.items() for column, key in dimensions
+        }
+        for source, dimension, value, count in rows:
+            if dimension == "total":
+                stats[source]["total"] = count
+            else:
+                stats[source][keys[source, dimension]][None if value == "" else value] = count
+
+        years = [year for year in stats["mickey"]["by_year"] if year is not None]
+        stats["mickey"]["volumes"] = len(stats["mickey"]["by_volume"])
+        stats["mickey"]["first_year"] = min(years, default=None)
+        stats["mickey"]["last_year"] = max(years, default=None)
+        stats["deferred"] = self.stats_deferred()
+        return stats
+
+    def stats_deferred(self):
+        return self.conn.execute("SELECT 1 FROM collection_stats_deferred LIMIT 1").fetchone() is not None
+
+    def refresh_stats(self, *tables):
+        """
+        Rebuilds collection_stats for the tables (default all) from the base
+        tables and re-enables their triggers.
+        """
+        tables = tables or tuple(models.STATS_DIMENSIONS)
+        self.conn.execute("BEGIN")
+        try:
+            for statement in models.refresh_stats_statements(tables):
+                self._execute(statement)
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self.cache.invalidate(*tables)
+
+    @contextmanager
+    def deferred_stats(self, *tables):
+        """
+        Skips the per-row statistics triggers of the tables (default all) for
+        the duration, on every connection, and rebuilds their counts once at
+        the end. For bulk loads.
+        """
+        tables = tables or tuple(models.STATS_DIMENSIONS)
+        self._executemany("INSERT OR IGNORE INTO collection_stats_deferred (source) VALUES (?)", [(t,) for t in tables])
+        self.conn.commit()
+        try:
+            yield self
+        finally:
+            # A cancelled load leaves its cancel check returning True, which
+            # would interrupt the rebuild too; suspend it until the end.
+            is_cancelled, every = self._is_cancelled, self._cancel_every
+            self.set_cancel_check(None)
+            try:
+                self.refresh_stats(*tables)
+            finally:
+                try:
+                    # Already done if the rebuild succeeded; if it failed, the
+                    # triggers still go back on rather than stay paused for good.
+                    self._executemany("DELETE FROM collection_stats_deferred WHERE source = ?", [(t,) for t in tables])
+                    self.conn.commit()
+                finally:
+                    self.set_cancel_check(is_cancelled, every)
+
+    def backup(self, target_path, pages=-1, progress=None):
+        """
+        Copies the database with the SQLite online backup API, pages at a time
+        (-1 copies everything in one step), so writers on other connections are
+        only paused between steps. progress(done, total) is called per step;
+        a cancel check set with set_cancel_check() aborts the copy.
+        """
+        self.conn.commit()
+
+        def step(status, remaining, total):
+            if self._is_cancelled is not None and self._is_cancelled():
+                raise sqlite3.OperationalError("interrupted")
+            if progress is not None:
+                progress(total - remaining, total)
+
+        target = sqlite3.connect(target_path)
+        try:
+            with self.monitor.timed(self, "BACKUP", ()):
+                self.conn.backup(target, pages=pages, progress=step)
+        finally:
+            target.close()
+
+    def _iter_query(self, query, params=(), chunk_size=FETCH_CHUNK_SIZE):
+        """
+        Yields rows from one cursor, fetchmany(chunk_size) at a time, so at
+        most one chunk is held in memory. Timed over the whole iteration.
+        """
+        cur = self.conn.cursor()
+        with self.monitor.timed(self, query, params) as timing:
+            cur.execute(query, params)
+            timing.rows = 0
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                timing.rows += len(rows)
+                yield from rows
+
+    def _cached_query(self, tables, query, params=()):
+        """_query through the result cache; tables are the ones the query reads."""
+        self.cache.observe_data_version(self.data_version())
+        key = QueryCache.key(query, params)
+        rows = self.cache.get(key, tables)
+        if rows is None:
+            rows = self._query(query, params)
+            self.cache.put(key, tables, rows)
+        return list(rows)
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    def data_version(self):
+        """Changes whenever another connection commits to the database file."""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def subscribe(self, callback):
+        """
+        callback(table, operation, keys) runs after every committed change made
+        through this DBManager. operation is "insert", "update" or "delete"; keys
+        are the changed rows' models.KEY_COLUMNS values as tuples, or None when
+        too many rows changed to list (bulk inserts).
+        """
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _notify(self, table, operation, keys):
+        for callback in list(self._subscribers):
+            callback(table, operation, keys)
+
+    def explain(self, query, params=()):
+        rows = self.conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        return [row["detail"] for row in rows]
+
+    def query_stats(self):
+        return self.monitor.stats()
+
+    def slow_queries(self):
+        return self.monitor.slow_queries()
+
+    def set_cancel_check(self, is_cancelled, every=1000):
+        """Aborts running statements (and backups) once is_cancelled() returns True."""
+        self._is_cancelled = is_cancelled
+        self._cancel_every = every
+        if is_cancelled is None:
+            self.conn.set_progress_handler(None, 0)
+        else:
+            self.conn.set_progress_handler(lambda: 1 if is_cancelled() else 0, every)
+
+    def interrupt(self):
+        # Safe to call from another thread than the one using the connection.
+        self.conn.interrupt()
+
     def close(self):
         self.conn.close()
@@ -0,0 +1,127 @@
+# database/instrumentation.py
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+logger = logging.getLogger("comicanalytics.slow_queries")
+
+QueryRecord = namedtuple("QueryRecord", "fingerprint sql elapsed_ms rows timestamp error")
+SlowQuery = namedtuple("SlowQuery", "fingerprint sql params elapsed_ms rows plan timestamp error")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBERED_PARAM = re.compile(r"\?\d+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Normalizes a statement so calls differing only in literals group together."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBERED_PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACE.sub(" ", sql).strip()
+    return _IN_LIST.sub("(?+)", sql)
+
+
+class _Timing:
+    rows = -1
+
+
+class QueryMonitor:
+    """
+    Records wall time and row count of every statement DBManager runs into a
+    ring buffer. Statements slower than slow_threshold_ms are also kept with
+    their EXPLAIN QUERY PLAN and written to the slow-query log.
+    """
+
+    def __init__(self, capacity=1000, slow_threshold_ms=100.0):
+        self.records = deque(maxlen=capacity)
+        self.slow = deque(maxlen=100)
+        self.slow_threshold_ms = slow_threshold_ms
+        self._lock = threading.Lock()
+        self._file_handler = None
+
+    def configure(self, slow_threshold_ms=None, log_path=None, capacity=None):
+        if slow_threshold_ms is not None:
+            self.slow_threshold_ms = slow_threshold_ms
+        if capacity is not None:
+            with self._lock:
+                self.records = deque(self.records, maxlen=capacity)
+        if log_path is not None:
+            if self._file_handler is not None:
+                logger.removeHandler(self._file_handler)
+                self._file_handler.close()
+            self._file_handler = logging.FileHandler(log_path, encoding="utf-8")
+            self._file_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(self._file_handler)
+            logger.setLevel(logging.INFO)
+
+    @contextmanager
+    def timed(self, db, sql, params):
+        timing = _Timing()
+        started = time.perf_counter()
+        error = False
+        try:
+            yield timing
+        except Exception:
+            # Failed and interrupted statements are recorded too; they can be the slow ones.
+            error = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.record(db, sql, params, elapsed_ms, timing.rows, error)
+
+    def record(self, db, sql, params, elapsed_ms, rows, error=False):
+        fp = fingerprint(sql)
+        now = time.time()
+        with self._lock:
+            self.records.append(QueryRecord(fp, sql, elapsed_ms, rows, now, error))
+        if elapsed_ms < self.slow_threshold_ms:
+            return
+        try:
+            plan = db.explain(sql, params)
+        except sqlite3.Error:
+            plan = []
+        with self._lock:
+            self.slow.append(SlowQuery(fp, sql, tuple(params), elapsed_ms, rows, plan, now, error))
+        logger.info(
+            "slow %squery %.1f ms, %s rows: %s | params=%r | plan: %s",
+            "failed " if error else "", elapsed_ms, rows, _SPACE.sub(" ", sql).strip(), tuple(params), "; ".join(plan),
+        )
+
+    def stats(self):
+        """Aggregates the ring buffer per fingerprint, most total time first."""
+        with self._lock:
+            records = list(self.records)
+        grouped = {}
+        for record in records:
+            entry = grouped.setdefault(record.fingerprint, {
+                "fingerprint": record.fingerprint, "calls": 0, "total_ms": 0.0,
+                "max_ms": 0.0, "rows": 0, "errors": 0,
+            })
+            entry["calls"] += 1
+            entry["errors"] += record.error
+            entry["total_ms"] += record.elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], record.elapsed_ms)
+            entry["rows"] += max(record.rows, 0)
+        for entry in grouped.values():
+            entry["avg_ms"] = entry["total_ms"] / entry["calls"]
+        return sorted(grouped.values(), key=lambda e: e["total_ms"], reverse=True)
+
+    def slow_queries(self):
+        with self._lock:
+            return list(self.slow)
+
+    def reset(self):
+        with self._lock:
+            self.records.clear()
+            self.slow.clear()
+
+
+# Shared by every DBManager in the process, so worker connections are included.
+default_monitor = QueryMonitor()
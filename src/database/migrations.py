@@ -0,0 +1,52 @@
+# database/migrations.py
+from . import models
+
+# (version, steps) in ascending order. A step is either an SQL string or a
+# callable taking the connection. Each version runs in its own transaction
+# and bumps PRAGMA user_version, so existing databases are upgraded in place.
+MIGRATIONS = [
+    (1, [
+        models.CREATE_MICKEY_TABLE,
+        models.CREATE_SUPERHEROES_TABLE,
+        models.CREATE_ARKAS_TABLE,
+    ]),
+    (2, models.CREATE_FILTER_INDEXES + ["ANALYZE"]),
+    (3, models.CREATE_NORMALIZED_COPIES + models.CREATE_FULLTEXT),
+    (4, models.CREATE_STATS),
+    (5, models.CREATE_NATURAL_KEYS),
+    (6, models.CREATE_SORT_INDEXES + ["ANALYZE"]),
+    (7, models.CREATE_NORMALIZED_INDEXES + ["ANALYZE"]),
+    (8, models.CREATE_SUGGEST_INDEXES + ["ANALYZE"]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """
+    Applies every migration newer than the database's user_version.
+    returns the list of versions applied.
+    """
+    applied = []
+    version = current_version(conn)
+    for target, steps in MIGRATIONS:
+        if target <= version:
+            continue
+        conn.execute("BEGIN")
+        try:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {int(target)}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        applied.append(target)
+    return applied
@@ -1,4 +1,5 @@
 # database/models.py
+from .text import normalize
 
 CREATE_MICKEY_TABLE = """
 CREATE TABLE IF NOT EXISTS mickey (
@@ -34,3 +35,354 @@ CREATE TABLE IF NOT EXISTS arkas (
     year INTEGER
 );
 """
+
+# Row identity and the columns inline edits may change, per table.
+KEY_COLUMNS = {
+    "mickey": ("issue_num", "vol_num"),
+    "superheroes": ("id",),
+    "arkas": ("id",),
+}
+
+EDITABLE_COLUMNS = {
+    "mickey": {"mainstory", "year"},
+    "superheroes": {
+        "title", "writer", "artist", "collection", "publisher", "issues",
+        "main_character", "event", "story_year", "category",
+    },
+    "arkas": {"story_name", "series_name", "year"},
+}
+
+# Indexes for the filters on raw columns. Series and story names are matched
+# through their normalized copies (CREATE_NORMALIZED_INDEXES), and year filters
+# seek the sort indexes that lead with year (CREATE_SORT_INDEXES).
+CREATE_FILTER_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_superheroes_category_year ON superheroes(category, story_year);",
+    "CREATE INDEX IF NOT EXISTS idx_superheroes_publisher ON superheroes(publisher);",
+    "CREATE INDEX IF NOT EXISTS idx_superheroes_writer ON superheroes(writer);",
+]
+
+# Title/name columns with a normalize()d copy (database/text.py: accents and
+# case folded) in <column>_norm. DBManager fills the copies on every write;
+# filters, suggestions and the full-text indexes read them, so the schema
+# itself never calls normalize() and any SQLite client can still write the
+# tables (its rows are only found by those once DBManager saves them again).
+NORMALIZED_COPIES = {
+    "mickey": ("mainstory",),
+    "superheroes": ("title", "writer", "artist", "collection", "publisher", "main_character"),
+    "arkas": ("story_name", "series_name"),
+}
+
+
+def normalized_column(column):
+    return f"{column}_norm"
+
+
+def with_normalized(table, values):
+    """values ({column: value}) plus the normalized copies of the columns that have one."""
+    copies = NORMALIZED_COPIES[table]
+    return {**values, **{normalized_column(c): normalize(v) for c, v in values.items() if c in copies}}
+
+
+def normalized_copy_statements(table):
+    columns = NORMALIZED_COPIES[table]
+    return [f"ALTER TABLE {table} ADD COLUMN {normalized_column(c)} TEXT;" for c in columns] + [
+        # Run by DBManager's migration, which has normalize() registered.
+        f"UPDATE {table} SET {', '.join(f'{normalized_column(c)} = normalize({c})' for c in columns)};"
+    ]
+
+
+CREATE_NORMALIZED_COPIES = [
+    statement for table in NORMALIZED_COPIES for statement in normalized_copy_statements(table)
+]
+
+# Full-text indexes (FTS5) of the normalized copies, kept in sync by triggers:
+# unicode61 only folds Latin diacritics, so Greek tonos and final sigma are
+# folded before indexing, and filters.fts_query() folds the search words the
+# same way.
+FULLTEXT_TABLES = {
+    "mickey": ("mickey_fts", "rowid", ["mainstory"]),
+    "superheroes": ("superheroes_fts", "id", ["title", "main_character", "collection"]),
+    "arkas": ("arkas_fts", "id", ["story_name", "series_name"]),
+}
+
+
+def fulltext_statements(table):
+    fts, key, columns = FULLTEXT_TABLES[table]
+    cols = ", ".join(columns)
+    copies = ", ".join(normalized_column(c) for c in columns)
+    new_cols = ", ".join(f"new.{normalized_column(c)}" for c in columns)
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {cols}, tokenize='unicode61 remove_diacritics 2'
+        );""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.{key}, {new_cols});
+        END;""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+            DELETE FROM {fts} WHERE rowid = old.{key};
+        END;""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE OF {copies} ON {table} BEGIN
+            DELETE FROM {fts} WHERE rowid = old.{key};
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.{key}, {new_cols});
+        END;""",
+        fulltext_fill_statement(table),
+    ]
+
+
+def fulltext_fill_statement(table, after=None):
+    """Indexes the table's rows, or only those with a key above after."""
+    fts, key, columns = FULLTEXT_TABLES[table]
+    where = "" if after is None else f" WHERE {key} > {int(after)}"
+    return (
+        f"INSERT INTO {fts}(rowid, {', '.join(columns)}) "
+        f"SELECT {key}, {', '.join(normalized_column(c) for c in columns)} FROM {table}{where};"
+    )
+
+
+CREATE_FULLTEXT = [
+    statement for table in FULLTEXT_TABLES for statement in fulltext_statements(table)
+]
+
+
+# Per-value row counts maintained by triggers, so statistics never scan the
+# base tables. NULL values are counted under ''. While a table is listed in
+# collection_stats_deferred its triggers are skipped and its counts are
+# rebuilt once with refresh_stats_statements() (used around bulk loads).
+# table -> [(column, stats() key)]
+STATS_DIMENSIONS = {
+    "mickey": [("year", "by_year"), ("vol_num", "by_volume")],
+    "superheroes": [
+        ("category", "by_category"), ("publisher", "by_publisher"),
+        ("writer", "by_writer"), ("story_year", "by_year"),
+    ],
+    "arkas": [("series_name", "by_series"), ("year", "by_year")],
+}
+
+CREATE_STATS_TABLES = [
+    """CREATE TABLE IF NOT EXISTS collection_stats (
+        source TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        value NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY(source, dimension, value)
+    ) WITHOUT ROWID;""",
+    "CREATE TABLE IF NOT EXISTS collection_stats_deferred (source TEXT PRIMARY KEY) WITHOUT ROWID;",
+]
+
+
+def stats_statements(table):
+    dimensions = [column for column, _ in STATS_DIMENSIONS[table]]
+    when = f"WHEN NOT EXISTS (SELECT 1 FROM collection_stats_deferred WHERE source = '{table}')"
+
+    def add(row):
+        values = ", ".join(
+            [f"('{table}', 'total', '', 1)"]
+            + [f"('{table}', '{column}', IFNULL({row}.{column}, ''), 1)" for column in dimensions]
+        )
+        return f"""INSERT INTO collection_stats (source, dimension, value, count) VALUES {values}
+            ON CONFLICT(source, dimension, value) DO UPDATE SET count = count + 1;"""
+
+    def remove(row):
+        keys = " OR ".join(
+            ["(dimension = 'total' AND value = '')"]
+            + [f"(dimension = '{column}' AND value = IFNULL({row}.{column}, ''))" for column in dimensions]
+        )
+        return f"""UPDATE collection_stats SET count = count - 1 WHERE source = '{table}' AND ({keys});
+            DELETE FROM collection_stats WHERE source = '{table}' AND count <= 0 AND ({keys});"""
+
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_stats_ai AFTER INSERT ON {table} {when} BEGIN
+            {add("new")}
+        END;""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_stats_ad AFTER DELETE ON {table} {when} BEGIN
+            {remove("old")}
+        END;""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_stats_au AFTER UPDATE OF {", ".join(dimensions)} ON {table} {when} BEGIN
+            {remove("old")}
+            {add("new")}
+        END;""",
+    ]
+
+
+def refresh_stats_statements(tables=None):
+    """Recounts the tables (default all) and re-enables their triggers."""
+    statements = []
+    for table in tables or STATS_DIMENSIONS:
+        statements += [
+            f"DELETE FROM collection_stats WHERE source = '{table}';",
+            f"""INSERT INTO collection_stats
+            SELECT '{table}', 'total', '', n FROM (SELECT COUNT(*) AS n FROM {table}) WHERE n > 0;""",
+        ]
+        for column, _ in STATS_DIMENSIONS[table]:
+            statements.append(
+                f"""INSERT INTO collection_stats
+                SELECT '{table}', '{column}', IFNULL({column}, ''), COUNT(*) FROM {table} GROUP BY 1, 2, 3;"""
+            )
+        statements.append(f"DELETE FROM collection_stats_deferred WHERE source = '{table}';")
+    return statements
+
+
+REFRESH_STATS = refresh_stats_statements()
+
+CREATE_STATS = (
+    CREATE_STATS_TABLES
+    + [statement for table in STATS_DIMENSIONS for statement in stats_statements(table)]
+    + REFRESH_STATS
+)
+
+# Columns written by inserts/imports, the natural key an imported row is matched
+# on, and what an import does with a row whose key is already stored:
+# error = report it, skip = keep the stored row, overwrite = take the imported
+# row, merge = take only the imported values that are not empty.
+INSERT_COLUMNS = {
+    "mickey": ("issue_num", "vol_num", "mainstory", "year"),
+    "superheroes": (
+        "title", "writer", "artist", "collection", "publisher", "issues",
+        "main_character", "event", "story_year", "category",
+    ),
+    "arkas": ("story_name", "series_name", "year"),
+}
+
+# Columns rows are read with; the normalized copies stay internal.
+ROW_COLUMNS = {
+    table: tuple(dict.fromkeys(KEY_COLUMNS[table] + columns)) for table, columns in INSERT_COLUMNS.items()
+}
+
+NATURAL_KEYS = {
+    "mickey": ("issue_num", "vol_num"),
+    "superheroes": ("title", "publisher", "issues"),
+    "arkas": ("story_name", "series_name"),
+}
+
+CONFLICT_POLICIES = ("error", "skip", "overwrite", "merge")
+
+
+def insert_statement(table, conflict="error"):
+    """INSERT of INSERT_COLUMNS[table] with an upsert clause for the conflict policy."""
+    if conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy: {conflict}")
+    columns = INSERT_COLUMNS[table]
+    # Numbered parameters, so the normalized copies reuse their column's value.
+    params = {column: f"?{i}" for i, column in enumerate(columns, 1)}
+    copies = [column for column in columns if column in NORMALIZED_COPIES[table]]
+    params.update((normalized_column(column), f"normalize({params[column]})") for column in copies)
+    query = f"INSERT INTO {table} ({', '.join(params)}) VALUES ({', '.join(params.values())})"
+    if conflict == "error":
+        return query
+    target = ", ".join(NATURAL_KEYS[table])
+    if conflict == "skip":
+        return query + f" ON CONFLICT({target}) DO NOTHING"
+    updated = [column for column in columns if column not in NATURAL_KEYS[table]]
+    if conflict == "overwrite":
+        values = {column: f"excluded.{column}" for column in updated}
+    else:
+        values = {column: f"COALESCE(NULLIF(excluded.{column}, ''), {column})" for column in updated}
+    values.update(
+        (normalized_column(column), f"normalize({values[column]})") for column in copies if column in values
+    )
+    assignments = ", ".join(f"{column} = {value}" for column, value in values.items())
+    # Rows that would not change are left alone, so re-importing a file rewrites nothing.
+    changed = " OR ".join(f"{column} IS NOT {value}" for column, value in values.items())
+    return query + f" ON CONFLICT({target}) DO UPDATE SET {assignments} WHERE {changed}"
+
+
+def natural_key_conflicts(conn, table):
+    """
+    Natural keys held by more than one row, whether or not the rows differ
+    elsewhere. A key with a NULL part never conflicts, as in the unique
+    index, so such rows are never matched by an import either.
+    returns [(key values..., row count)].
+    """
+    columns = NATURAL_KEYS[table]
+    return [tuple(row) for row in conn.execute(
+        f"""SELECT {', '.join(columns)}, COUNT(*) FROM {table}
+            WHERE {' AND '.join(f'{column} IS NOT NULL' for column in columns)}
+            GROUP BY {', '.join(columns)} HAVING COUNT(*) > 1"""
+    )]
+
+
+def create_natural_key(conn, table):
+    """
+    Enforces NATURAL_KEYS[table] with a unique index, unless rows share a
+    key: nothing is deleted, those rows are left for the user to merge and
+    the index is not created. returns the conflicting keys (see
+    natural_key_conflicts).
+    """
+    conflicts = natural_key_conflicts(conn, table)
+    if not conflicts:
+        conn.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_natural_key ON {table}({', '.join(NATURAL_KEYS[table])});"
+        )
+    return conflicts
+
+
+# mickey's natural key is its primary key.
+NATURAL_KEY_INDEXES = {"superheroes": "idx_superheroes_natural_key", "arkas": "idx_arkas_natural_key"}
+
+CREATE_NATURAL_KEYS = [
+    lambda conn, table=table: create_natural_key(conn, table) for table in NATURAL_KEY_INDEXES
+]
+
+# Columns the table views sort by that get an index ending with the table key,
+# which is how pages are ordered (see filters.paginate), so ORDER BY ... LIMIT
+# reads the first page straight off the index. superheroes are browsed one
+# category at a time, so category leads there; (category, story_year) is
+# idx_superheroes_category_year, and the yes/no event column is not worth one.
+SORT_COLUMNS = {
+    "mickey": ("vol_num", "mainstory", "year"),
+    "superheroes": (
+        "title", "writer", "artist", "collection", "publisher", "issues", "main_character",
+    ),
+    "arkas": ("story_name", "series_name", "year"),
+}
+
+
+def sort_index_statements(table):
+    prefix = ("category",) if table == "superheroes" else ()
+    statements = []
+    for column in SORT_COLUMNS[table]:
+        # rowid tables already end every index with id.
+        keys = [key for key in KEY_COLUMNS[table] if key not in ("id", column)]
+        columns = ", ".join(prefix + (column,) + tuple(keys))
+        statements.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_sort_{column} ON {table}({columns});")
+    return statements
+
+
+CREATE_SORT_INDEXES = [statement for table in SORT_COLUMNS for statement in sort_index_statements(table)]
+
+# Title/name columns that filters always match through their normalized
+# copy, ignoring accents and case; the copies' indexes keep those filters
+# index seeks.
+NORMALIZED_COLUMNS = {
+    "mickey": ("mainstory",),
+    "superheroes": ("title",),
+    "arkas": ("story_name", "series_name"),
+}
+
+CREATE_NORMALIZED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_mickey_norm_mainstory ON mickey(mainstory_norm);",
+    "CREATE INDEX IF NOT EXISTS idx_superheroes_norm_title ON superheroes(title_norm);",
+    "CREATE INDEX IF NOT EXISTS idx_arkas_norm_story_name ON arkas(story_name_norm);",
+    "CREATE INDEX IF NOT EXISTS idx_arkas_norm_series_name ON arkas(series_name_norm, year);",
+]
+
+# Filter fields the views offer completions for (DBManager.suggest). Each has
+# an indexed normalized copy, so a prefix is a range scan.
+SUGGEST_COLUMNS = NORMALIZED_COPIES
+
+CREATE_SUGGEST_INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS idx_superheroes_norm_{column} ON superheroes({normalized_column(column)});"
+    for column in ("writer", "artist", "collection", "publisher", "main_character")
+]
+
+# Columns a filter spec (services/filters.py) may name, with their type.
+# Prefix and contains filters only apply to "str" columns.
+FILTER_COLUMNS = {
+    "mickey": {"issue_num": "int", "vol_num": "int", "mainstory": "str", "year": "int"},
+    "superheroes": {
+        "id": "int", "title": "str", "writer": "str", "artist": "str", "collection": "str",
+        "publisher": "str", "issues": "str", "main_character": "str", "event": "bool",
+        "story_year": "int", "category": "str",
+    },
+    "arkas": {"id": "int", "story_name": "str", "series_name": "str", "year": "int"},
+}
@@ -0,0 +1,38 @@
+# database/profiles.py
+
+# Connection PRAGMA profiles, applied in order by DBManager.apply_profile().
+# journal_mode is persistent in the file; the others are per connection.
+PROFILES = {
+    "interactive": [
+        ("busy_timeout", 5000),
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("cache_size", -16000),
+        ("mmap_size", 64 * 1024 * 1024),
+        ("temp_store", "MEMORY"),
+        ("query_only", "OFF"),
+    ],
+    "bulk_load": [
+        ("busy_timeout", 30000),
+        ("journal_mode", "WAL"),
+        ("synchronous", "OFF"),
+        ("cache_size", -128000),
+        ("mmap_size", 256 * 1024 * 1024),
+        ("temp_store", "MEMORY"),
+        ("query_only", "OFF"),
+    ],
+    "read_only": [
+        ("busy_timeout", 5000),
+        ("cache_size", -32000),
+        ("mmap_size", 256 * 1024 * 1024),
+        ("temp_store", "MEMORY"),
+        ("query_only", "ON"),
+    ],
+}
+
+DEFAULT_PROFILE = "interactive"
+
+REPORTED_PRAGMAS = [
+    "journal_mode", "synchronous", "cache_size", "mmap_size",
+    "temp_store", "busy_timeout", "query_only",
+]
@@ -0,0 +1,25 @@
+# database/text.py
+import unicodedata
+from functools import lru_cache
+
+
+def normalize(text):
+    """
+    Accent- and case-insensitive form of text, for matching Greek (and any
+    other) titles: "Η Επιστροφή του Φάντομ" -> "η επιστροφη του φαντομ".
+    Registered on every DBManager connection as the SQL function normalize().
+    """
+    if text is None:
+        return None
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    return _fold(text)
+
+
+# SQLite calls normalize() for every index and full-text column a row write
+# touches, and writers, publishers and series repeat across rows.
+@lru_cache(maxsize=4096)
+def _fold(text):
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
@@ -0,0 +1,85 @@
+import gzip
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Pages copied per backup step; other connections can write between steps.
+BACKUP_PAGES = 1024
+SNAPSHOT_KEEP = 7
+COMPRESSED_SUFFIX = ".gz"
+
+
+def backup_to(db, target_path, compress=None, pages=BACKUP_PAGES, progress=None):
+    """
+    Writes a consistent copy of db to target_path with the online backup API.
+    compress=None gzips when target_path ends in .gz. The copy is built in a
+    temporary file first, so target_path never holds a partial backup.
+    returns the target path.
+    """
+    target_path = Path(target_path)
+    if compress is None:
+        compress = target_path.suffix == COMPRESSED_SUFFIX
+    fd, temp_name = tempfile.mkstemp(prefix=f".{target_path.name}.", suffix=".tmp", dir=target_path.parent)
+    os.close(fd)
+    try:
+        if compress:
+            raw_name = temp_name + ".db"
+            try:
+                db.backup(raw_name, pages=pages, progress=progress)
+                with open(raw_name, "rb") as src, gzip.open(temp_name, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            finally:
+                if os.path.exists(raw_name):
+                    os.remove(raw_name)
+        else:
+            db.backup(temp_name, pages=pages, progress=progress)
+        # mkstemp creates the file owner-only; give the backup the database's permissions.
+        shutil.copymode(db.db_path, temp_name)
+        os.replace(temp_name, target_path)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+    return target_path
+
+
+def restore_from(backup_path, target_path):
+    """Unpacks a (possibly gzipped) backup to target_path."""
+    opener = gzip.open if str(backup_path).endswith(COMPRESSED_SUFFIX) else open
+    with opener(backup_path, "rb") as src, open(target_path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+
+
+def snapshot_prefix(db_path):
+    return f"{Path(db_path).stem}-snapshot-"
+
+
+def list_snapshots(directory, db_path):
+    """Snapshots of db_path in directory, oldest first (names sort by timestamp)."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    prefix = snapshot_prefix(db_path)
+    return sorted(path for path in directory.iterdir() if path.name.startswith(prefix))
+
+
+def rotate_snapshots(directory, db_path, keep=SNAPSHOT_KEEP):
+    """Deletes all but the newest keep snapshots. returns the removed paths."""
+    snapshots = list_snapshots(directory, db_path)
+    removed = snapshots[:-keep] if keep > 0 else snapshots
+    for path in removed:
+        path.unlink()
+    return removed
+
+
+def take_snapshot(db, directory, keep=SNAPSHOT_KEEP, compress=True, pages=BACKUP_PAGES, progress=None):
+    """Backs db up to a timestamped file in directory and rotates old ones. returns the new path."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = directory / f"{snapshot_prefix(db.db_path)}{stamp}.db{COMPRESSED_SUFFIX if compress else ''}"
+    backup_to(db, path, compress=compress, pages=pages, progress=progress)
+    rotate_snapshots(directory, db.db_path, keep)
+    return path
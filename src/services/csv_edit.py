@@ -1,5 +1,33 @@
 import csv
-from database.db_manager import DBManager
+from database.db_manager import DBManager, BULK_CHUNK_SIZE
+
+EXPORT_PROGRESS_EVERY = 1000
+
+
+class ImportReport:
+    def __init__(self, table):
+        self.table = table
+        self.imported = 0
+        # Rows left as they were by the conflict policy (already stored, nothing new).
+        self.skipped = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def summary(self, max_errors=20):
+        skipped = f", {self.skipped} unchanged" if self.skipped else ""
+        text = f"Imported {self.imported} {self.table} rows{skipped}, {self.failed} failed."
+        if self.errors:
+            lines = [f"line {line}: {message}" for line, message in self.errors[:max_errors]]
+            if self.failed > max_errors:
+                lines.append(f"... and {self.failed - max_errors} more")
+            text += "\n\n" + "\n".join(lines)
+        return text
 
 
 class CSVService:
@@ -23,107 +51,141 @@ class CSVService:
             return "arkas"
         return None
 
-    def import_mickey(self, csv_file):
-        with open(csv_file, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
+    def _import(self, csv_file, table, parse, label, bulk_add, chunk_size, progress=None, conflict="error"):
+        """conflict is one of models.CONFLICT_POLICIES, applied to rows whose natural key is already stored."""
+        report = ImportReport(table)
+        lines = []
+
+        def parsed_rows(reader):
             for row in reader:
                 try:
-                    self.db.add_mickey(
-                        int(row["Issue num"]),
-                        int(row["Vol num"]),
-                        row["Main Story"],
-                        int(row["Year"]),
-                    )
-                except Exception as e:
-                    print(f"⚠️ Error for {row['Issue num']} - {row['Vol num']}: {e}")
-
-    def export_mickey(self, csv_file,rows=None):
-        if rows is None:
-            rows= self.db.search_mickey()
+                    values = parse(row)
+                except (KeyError, ValueError, TypeError, AttributeError) as e:
+                    report.add_error(reader.line_num, f"{label(row)}: {e}")
+                    continue
+                lines.append(reader.line_num)
+                yield values
 
-        with open(csv_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(
-                f, fieldnames=["Issue num", "Vol num", "Main Story", "Year"]
-            )
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(
-                    {
-                        "Issue num": row["issue_num"],
-                        "Vol num": row["vol_num"],
-                        "Main Story": row["mainstory"],
-                        "Year": row["year"],
-                    }
-                )
-
-    def import_superheroes(self, csv_file):
-        with open(csv_file, newline="", encoding="utf-8") as f:
+        with open(csv_file, newline="", encoding="utf-8") as f, \
+                self.db.using_profile("bulk_load"), self.db.deferred_stats(table):
             reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    self.db.add_superhero(
-                        row["Title"],
-                        row["Writer"],
-                        row["Artist"],
-                        row["Collection"],
-                        row["Publisher"],
-                        row["Issues"],
-                        row["Main Character"],
-                        True if row["Event"].lower() in ("true", "yes", "1") else False,
-                        int(row["Story Year"]),
-                        row["Category"],
-                    )
-                except Exception as e:
-                    print(f"⚠️ Error for {row['Title']}: {e}")
-    
-    def export_superheroes_category(self, csv_file, category: str, rows=None):
-        if rows is None :
-            rows = self.db.advanced_search_superheroes(category=category)
+            report.imported, failures = bulk_add(parsed_rows(reader), chunk_size, progress, conflict)
+        report.skipped = len(lines) - report.imported - len(failures)
+
+        for index, values, error in failures:
+            report.add_error(lines[index], f"{label(values)}: {error}")
+        report.errors.sort()
+        return report
+
+    def import_mickey(self, csv_file, chunk_size=BULK_CHUNK_SIZE, progress=None, conflict="error"):
+        def parse(row):
+            return (
+                int(row["Issue num"]),
+                int(row["Vol num"]),
+                row["Main Story"],
+                int(row["Year"]),
+            )
+
+        def label(row):
+            if isinstance(row, dict):
+                return f"{row.get('Issue num')} - {row.get('Vol num')}"
+            return f"{row[0]} - {row[1]}"
+
+        return self._import(csv_file, "mickey", parse, label, self.db.bulk_add_mickey, chunk_size, progress, conflict)
+
+    def _export(self, csv_file, fieldnames, rows, to_csv, progress=None):
+        """Writes rows as they arrive, so a streamed cursor is never fully loaded."""
         with open(csv_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(
-                f,
-                fieldnames=["Title", "Writer", "Artist", "Collection","Publisher", "Issues", "Main Character", "Event","Story Year", "Category"])
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
+            written = 0
             for row in rows:
-                writer.writerow({
-                    "Title": row["title"],
-                    "Writer": row["writer"],
-                    "Artist": row["artist"],
-                    "Collection": row["collection"],
-                    "Publisher": row["publisher"],
-                    "Issues": row["issues"],
-                    "Main Character": row["main_character"],
-                    "Event": "true" if row["event"] else "false",
-                    "Story Year": row["story_year"],
-                    "Category": row["category"],
-                })
-
-
-
-    def import_arkas(self, csv_file):
-        with open(csv_file, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    self.db.add_arkas(
-                        row["Story Name"],
-                        row["Series Name"],
-                        int(row["Year"])
-                    )
-                except Exception as e:
-                    print(f"⚠️ Error for {row['Story Name']}: {e}")
+                writer.writerow(to_csv(row))
+                written += 1
+                if progress is not None and written % EXPORT_PROGRESS_EVERY == 0:
+                    progress(written, 0)
+        return written
+
+    def export_mickey(self, csv_file, rows=None, progress=None, **filters):
+        if rows is None:
+            rows = self.db.iter_mickey(**filters)
+
+        def to_csv(row):
+            return {
+                "Issue num": row["issue_num"],
+                "Vol num": row["vol_num"],
+                "Main Story": row["mainstory"],
+                "Year": row["year"],
+            }
+
+        return self._export(csv_file, ["Issue num", "Vol num", "Main Story", "Year"], rows, to_csv, progress)
+
+    def import_superheroes(self, csv_file, chunk_size=BULK_CHUNK_SIZE, progress=None, conflict="error"):
+        def parse(row):
+            return (
+                row["Title"],
+                row["Writer"],
+                row["Artist"],
+                row["Collection"],
+                row["Publisher"],
+                row["Issues"],
+                row["Main Character"],
+                True if row["Event"].lower() in ("true", "yes", "1") else False,
+                int(row["Story Year"]),
+                row["Category"],
+            )
+
+        def label(row):
+            return row.get("Title") if isinstance(row, dict) else row[0]
+
+        return self._import(csv_file, "superheroes", parse, label, self.db.bulk_add_superheroes, chunk_size, progress, conflict)
     
-    def export_arkas(self, csv_file, rows=None):
-        if rows is None :
-            rows = self.db.search_arkas()
-        with open(csv_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(
-                f, fieldnames=["Story Name", "Series Name", "Year"]
+    def export_superheroes_category(self, csv_file, category: str, rows=None, progress=None, **filters):
+        if rows is None:
+            rows = self.db.iter_superheroes(category=category, **filters)
+
+        def to_csv(row):
+            return {
+                "Title": row["title"],
+                "Writer": row["writer"],
+                "Artist": row["artist"],
+                "Collection": row["collection"],
+                "Publisher": row["publisher"],
+                "Issues": row["issues"],
+                "Main Character": row["main_character"],
+                "Event": "true" if row["event"] else "false",
+                "Story Year": row["story_year"],
+                "Category": row["category"],
+            }
+
+        return self._export(
+            csv_file,
+            ["Title", "Writer", "Artist", "Collection", "Publisher", "Issues", "Main Character", "Event", "Story Year", "Category"],
+            rows, to_csv, progress,
+        )
+
+    def import_arkas(self, csv_file, chunk_size=BULK_CHUNK_SIZE, progress=None, conflict="error"):
+        def parse(row):
+            return (
+                row["Story Name"],
+                row["Series Name"],
+                int(row["Year"])
             )
-            writer.writeheader()
-            for row in rows:
-                writer.writerow({
-                    "Story Name": row["story_name"],
-                    "Series Name": row["series_name"],
-                    "Year": row["year"],
-                })
+
+        def label(row):
+            return row.get("Story Name") if isinstance(row, dict) else row[0]
+
+        return self._import(csv_file, "arkas", parse, label, self.db.bulk_add_arkas, chunk_size, progress, conflict)
+    
+    def export_arkas(self, csv_file, rows=None, progress=None, **filters):
+        if rows is None:
+            rows = self.db.iter_arkas(**filters)
+
+        def to_csv(row):
+            return {
+                "Story Name": row["story_name"],
+                "Series Name": row["series_name"],
+                "Year": row["year"],
+            }
+
+        return self._export(csv_file, ["Story Name", "Series Name", "Year"], rows, to_csv, progress)
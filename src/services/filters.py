@@ -1,107 +1,365 @@
+from functools import lru_cache
 from typing import List, Tuple, Optional
+from database import models
+from database.text import normalize
 
-def build_mickey_filters(
-    issue_num: Optional[int] = None,
-    vol_num: Optional[int] = None,
-    mainstory: Optional[str] = None,
-    year: Optional[int] = None,
-    year_range: Optional[Tuple[int, int]] = None,
-    issue_range: Optional[Tuple[int, int]] = None,
-    exclude_issue_range: Optional[Tuple[int, int]] = None
-) -> Tuple[str, List, Optional[Tuple[int, int]]]:
+FULLTEXT_INDEX = {
+    "mickey": "mickey_fts",
+    "superheroes": "superheroes_fts",
+    "arkas": "arkas_fts",
+}
+
+
+def fts_query(text: str, columns: Optional[List[str]] = None) -> str:
     """
-    SQL query for table mickey
-    returns (query, values, exclude_range).
+    Turns free user text into an FTS5 MATCH expression: every word is
+    normalized like the indexed text, quoted (so operators in the input are
+    literal) and matched as a prefix.
     """
-    conditions = []
-    values = []
+    terms = ['"' + word.replace('"', '""') + '"*' for word in normalize(text).split()]
+    if not terms:
+        raise ValueError("Empty full-text search")
+    expression = " ".join(terms)
+    if columns:
+        expression = "{" + " ".join(columns) + "} : (" + expression + ")"
+    return expression
 
-    if issue_num is not None:
-        conditions.append("issue_num = ?")
-        values.append(issue_num)
-
-    if vol_num is not None:
-        conditions.append("vol_num = ?")
-        values.append(vol_num)
-
-    if mainstory is not None:
-        conditions.append("mainstory = ?")
-        values.append(mainstory)
-
-    if year is not None:
-        conditions.append("year = ?")
-        values.append(year)
-
-    if year_range is not None:
-        start, end = year_range
-        conditions.append("year BETWEEN ? AND ?")
-        values.extend([start, end])
-
-    if issue_range is not None:
-        start, end = issue_range
-        conditions.append("issue_num BETWEEN ? AND ?")
-        values.extend([start, end])
-
-    query = "SELECT * FROM mickey"
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-
-    return query, values, exclude_issue_range
-
-def build_superheroes_filters(
-    title: Optional[str] = None,
-    writer: Optional[str] = None,
-    artist: Optional[str] = None,
-    collection: Optional[str] = None,
-    publisher: Optional[str] = None,
-    issues: Optional[str] = None,
-    main_character: Optional[str] = None,
-    event: Optional[bool] = None,
-    story_year: Optional[int] = None,
-    year_range: Optional[Tuple[int, int]] = None,
-    category: Optional[str] = None
-) -> Tuple[str, List]:
-    conditions = []
+
+def fulltext_condition(table: str, text: str, columns: Optional[List[str]] = None) -> Tuple[str, List]:
+    return _fulltext_sql(table), [fts_query(text, columns)]
+
+
+def _fulltext_sql(table: str) -> str:
+    fts = FULLTEXT_INDEX[table]
+    return f"rowid IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)"
+
+
+# A filter spec is a predicate (column, operator, value) or a group
+# ("and" | "or", [specs]). The column FULLTEXT stands for the table's whole
+# full-text index.
+FULLTEXT = "*"
+OPERATORS = ("eq", "in", "range", "not_range", "prefix", "contains", "null")
+GROUPS = ("and", "or")
+
+# Keyword filters (build_*_filters, DBManager.advanced_search_*) as
+# (column, operator), in the order their conditions are written.
+KEYWORD_FILTERS = {
+    "mickey": {
+        "issue_num": ("issue_num", "eq"),
+        "vol_num": ("vol_num", "eq"),
+        "mainstory": ("mainstory", "eq"),
+        "year": ("year", "eq"),
+        "year_range": ("year", "range"),
+        "issue_range": ("issue_num", "range"),
+        "exclude_issue_range": ("issue_num", "not_range"),
+        "text": (FULLTEXT, "contains"),
+    },
+    "superheroes": {
+        **{column: (column, "eq") for column in (
+            "title", "writer", "artist", "collection", "publisher", "issues",
+            "main_character", "event", "story_year", "category",
+        )},
+        "year_range": ("story_year", "range"),
+        "text": (FULLTEXT, "contains"),
+        "title_text": ("title", "contains"),
+    },
+    "arkas": {
+        "story_name": ("story_name", "eq"),
+        "series_name": ("series_name", "eq"),
+        "year": ("year", "eq"),
+        "year_range": ("year", "range"),
+        "text": (FULLTEXT, "contains"),
+    },
+}
+
+
+def _normalized(table: str, column: str, operator: str) -> bool:
+    # Title/name columns always match ignoring accents and case; prefix and
+    # contains do for every text column.
+    return operator in ("prefix", "contains") or column in models.NORMALIZED_COLUMNS[table]
+
+
+@lru_cache(maxsize=None)
+def _param_builder(table: str, column: str, operator: str):
+    """Checks a predicate once and returns value -> parameters for it."""
+    if operator not in OPERATORS:
+        raise ValueError(f"Unknown filter operator: {operator}")
+    if column == FULLTEXT:
+        if operator != "contains":
+            raise ValueError("The full-text index only supports contains")
+        return lambda value: [fts_query(value)]
+    kind = models.FILTER_COLUMNS[table].get(column)
+    if kind is None:
+        raise ValueError(f"Unknown {table} filter column: {column}")
+    if operator in ("prefix", "contains") and kind != "str":
+        raise ValueError(f"{operator} needs a text column, not {column}")
+
+    if not _normalized(table, column, operator):
+        if operator == "eq":
+            return lambda value: [value]
+        if operator in ("range", "not_range"):
+            return lambda value: [value[0], value[1]]
+        if operator == "in":
+            return list
+    convert = lambda v: normalize(v) if isinstance(v, str) else v
+
+    if operator == "eq":
+        return lambda value: [convert(value)]
+    if operator == "in":
+        return lambda value: [convert(v) for v in value]
+    if operator in ("range", "not_range"):
+        return lambda value: [convert(value[0]), convert(value[1])]
+    if operator == "prefix":
+        return lambda value: prefix_condition(column, convert(value))[1]
+    if operator == "contains":
+        if column in models.FULLTEXT_TABLES[table][2]:
+            return lambda value: [fts_query(value, [column])]
+        return lambda value: [convert(value)]
+    return lambda value: []
+
+
+def _shape(table: str, spec, values: List) -> Tuple:
+    """The parts of spec that decide its SQL; appends the parameters to values."""
+    if spec is None:
+        return "and", ()
+    if spec[0] in GROUPS:
+        group, parts = spec
+        return group, tuple(_shape(table, part, values) for part in parts)
+    column, operator, value = spec
+    params = _param_builder(table, column, operator)(value)
+    values.extend(params)
+    if operator in ("in", "prefix"):
+        return column, operator, len(params)
+    if operator == "null":
+        return column, operator, bool(value)
+    return column, operator, None
+
+
+@lru_cache(maxsize=256)
+def _condition(table: str, shape: Tuple, top: bool = False) -> str:
+    if shape[0] in GROUPS:
+        group, parts = shape
+        if not parts:
+            return "1" if group == "and" else "0"
+        conditions = [_condition(table, part) for part in parts]
+        if len(conditions) == 1:
+            return conditions[0]
+        joined = f" {group.upper()} ".join(conditions)
+        # A top-level AND stays bare so more conditions can be appended to it.
+        return joined if top and group == "and" else f"({joined})"
+    column, operator, detail = shape
+    if column == FULLTEXT:
+        return _fulltext_sql(table)
+    expression = column
+    if _normalized(table, column, operator):
+        if column in models.NORMALIZED_COPIES[table]:
+            expression = models.normalized_column(column)
+        else:
+            expression = f"normalize({column})"
+    if operator == "eq":
+        return f"{expression} = ?"
+    if operator == "in":
+        return f"{expression} IN ({', '.join('?' * detail)})" if detail else "0"
+    if operator == "range":
+        return f"{expression} BETWEEN ? AND ?"
+    if operator == "not_range":
+        return f"{expression} NOT BETWEEN ? AND ?"
+    if operator == "prefix":
+        return ("1", f"{expression} >= ?", f"{expression} >= ? AND {expression} < ?")[detail]
+    if operator == "contains":
+        if column in models.FULLTEXT_TABLES[table][2]:
+            return _fulltext_sql(table)
+        return f"instr({expression}, ?) > 0"
+    return f"{column} IS NULL" if detail else f"{column} IS NOT NULL"
+
+
+def compile_filters(table: str, spec=None) -> Tuple[str, List]:
+    """
+    SELECT query for the rows of table matching spec, and its parameters.
+    The SQL only depends on the spec's shape (columns, operators, groups and
+    the number of IN values), so it is built once per shape and cached.
+    Contains on a full-text column matches word prefixes like the search
+    box; on other text columns it is a substring match.
+    """
+    if table not in models.FILTER_COLUMNS:
+        raise ValueError(f"Unknown table: {table}")
     values = []
+    return _select(table, _condition(table, _shape(table, spec, values), True)), values
+
+
+def _select(table: str, condition: str) -> str:
+    columns = ", ".join(models.ROW_COLUMNS[table])
+    return f"SELECT {columns} FROM {table}" + (f" WHERE {condition}" if condition != "1" else "")
+
+
+def _check_keywords(table: str, keys) -> None:
+    unknown = sorted(set(keys) - set(KEYWORD_FILTERS[table]))
+    if unknown:
+        raise TypeError(f"unexpected {table} filter: {', '.join(unknown)}")
+
+
+def keyword_spec(table: str, **kwargs) -> Tuple[str, List]:
+    """The spec for keyword filters; None and "" mean no filter."""
+    _check_keywords(table, kwargs)
+    return "and", [
+        (column, operator, kwargs[key]) for key, (column, operator) in KEYWORD_FILTERS[table].items()
+        if kwargs.get(key) is not None and kwargs.get(key) != ""
+    ]
+
 
-    if title: conditions.append("title = ?"); values.append(title)
-    if writer: conditions.append("writer = ?"); values.append(writer)
-    if artist: conditions.append("artist = ?"); values.append(artist)
-    if collection: conditions.append("collection = ?"); values.append(collection)
-    if publisher: conditions.append("publisher = ?"); values.append(publisher)
-    if issues: conditions.append("issues = ?"); values.append(issues)
-    if main_character: conditions.append("main_character = ?"); values.append(main_character)
-    if event is not None: conditions.append("event = ?"); values.append(event)
-    if story_year is not None: conditions.append("story_year = ?"); values.append(story_year)
-    if category: conditions.append("category = ?"); values.append(category)
-    if year_range:
-        start, end = year_range
-        conditions.append("story_year BETWEEN ? AND ?")
-        values.extend([start, end])
-
-    query = "SELECT * FROM superheroes"
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
+@lru_cache(maxsize=256)
+def _keyword_plan(table: str, keys: Tuple[str, ...]) -> Tuple[str, List]:
+    """The query for keyword filters with these keys set, and each key's parameter builder."""
+    _check_keywords(table, keys)
+    fields = [(key, column, operator) for key, (column, operator) in KEYWORD_FILTERS[table].items() if key in keys]
+    # Keyword operators have no shape detail, so one query holds for any values.
+    query = _select(table, _condition(table, ("and", tuple((column, operator, None) for _, column, operator in fields)), True))
+    return query, [(key, _param_builder(table, column, operator)) for key, column, operator in fields]
 
+
+def filter_query(table: str, spec=None, **kwargs) -> Tuple[str, List]:
+    """compile_filters() for keyword filters, ANDed with an optional spec."""
+    if spec is not None:
+        group, parts = keyword_spec(table, **kwargs)
+        return compile_filters(table, (group, parts + [spec]))
+    query, builders = _keyword_plan(table, tuple([
+        key for key, value in kwargs.items() if value is not None and value != ""
+    ]))
+    values = []
+    for key, build in builders:
+        values += build(kwargs[key])
     return query, values
 
-def build_arkas_filters(
-    story_name: Optional[str] = None,
-    series_name: Optional[str] = None,
-    year: Optional[int] = None,
-    year_range: Optional[Tuple[int,int]] = None
+
+def build_mickey_filters(**kwargs) -> Tuple[str, List, Optional[Tuple[int, int]]]:
+    """
+    SQL query for table mickey from keyword filters. returns (query, values,
+    exclude_range); exclude_range is already applied as NOT BETWEEN.
+    """
+    query, values = filter_query("mickey", **kwargs)
+    return query, values, kwargs.get("exclude_issue_range")
+
+
+def build_superheroes_filters(**kwargs) -> Tuple[str, List]:
+    return filter_query("superheroes", **kwargs)
+
+
+def build_arkas_filters(**kwargs) -> Tuple[str, List]:
+    return filter_query("arkas", **kwargs)
+
+
+def format_ranges(intervals: List[Tuple[int, int]]) -> str:
+    """[(12, 40), (57, 57)] -> "12-40, 57" """
+    return ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in intervals)
+
+
+def count_in_ranges(intervals: List[Tuple[int, int]]) -> int:
+    return sum(end - start + 1 for start, end in intervals)
+
+
+def _where(query: str, condition: str) -> str:
+    return query + (" AND " if " WHERE " in query else " WHERE ") + condition
+
+
+def prefix_condition(expression: str, prefix: str) -> Tuple[str, List]:
+    """expression starts with prefix, written as a range an index on expression can seek."""
+    if not prefix:
+        return "1", []
+    if ord(prefix[-1]) == 0x10FFFF:
+        return f"{expression} >= ?", [prefix]
+    # Every string starting with prefix sorts before prefix with its last character bumped.
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return f"{expression} >= ? AND {expression} < ?", [prefix, upper]
+
+
+def restrict_to_keys(query: str, values: List, key_columns: Tuple[str, ...], keys: List[Tuple]) -> Tuple[str, List]:
+    """Limits a query from the builders above to the rows whose key columns match one of keys."""
+    keys = [tuple(key) for key in keys]
+    if not keys:
+        condition, params = "0", []
+    elif len(key_columns) == 1:
+        condition = f"{key_columns[0]} IN ({', '.join('?' * len(keys))})"
+        params = [key[0] for key in keys]
+    else:
+        row = "(" + ", ".join("?" * len(key_columns)) + ")"
+        condition = f"({', '.join(key_columns)}) IN (VALUES {', '.join([row] * len(keys))})"
+        params = [value for key in keys for value in key]
+    return _where(query, condition), list(values) + params
+
+
+def sort_columns(order_by: Optional[str], key_columns: Tuple[str, ...] = ("rowid",)) -> List[str]:
+    """ORDER BY columns of a page query: the sort column, then the key columns that break ties."""
+    if order_by is None:
+        return list(key_columns)
+    if not order_by.isidentifier():
+        raise ValueError(f"Invalid sort column: {order_by}")
+    return [order_by] + [column for column in key_columns if column != order_by]
+
+
+def keyset_conditions(columns: List[str], after: Tuple, descending: bool = False) -> List[Tuple[str, List]]:
+    """
+    Conditions for the rows that sort after `after` (values of columns, e.g.
+    the last row of the previous page), as branches in result order. Only the
+    first column may be NULL and SQLite sorts NULL first, so the NULL rows get
+    a branch of their own: an OR would stop SQLite from seeking the index.
+    """
+    if len(after) != len(columns):
+        raise ValueError(f"after needs {len(columns)} values ({', '.join(columns)})")
+    operator = "<" if descending else ">"
+    first, rest = columns[0], columns[1:]
+    if after[0] is not None:
+        branches = [(f"({', '.join(columns)}) {operator} ({', '.join('?' * len(columns))})", list(after))]
+        if descending:
+            branches.append((f"{first} IS NULL", []))
+        return branches
+    branches = []
+    if rest:
+        branches.append((
+            f"{first} IS NULL AND ({', '.join(rest)}) {operator} ({', '.join('?' * len(rest))})", list(after[1:])
+        ))
+    if not descending:
+        branches.append((f"{first} IS NOT NULL", []))
+    return branches or [("0", [])]
+
+
+def paginate(
+    query: str,
+    values: List,
+    order_by: Optional[str] = None,
+    descending: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    after: Optional[Tuple] = None,
+    key_columns: Tuple[str, ...] = ("rowid",),
 ) -> Tuple[str, List]:
-    conditions, values = [], []
-
-    if story_name: conditions.append("story_name = ?"); values.append(story_name)
-    if series_name: conditions.append("series_name = ?"); values.append(series_name)
-    if year is not None: conditions.append("year = ?"); values.append(year)
-    if year_range:
-        start, end = year_range
-        conditions.append("year BETWEEN ? AND ?")
-        values.extend([start, end])
-
-    query = "SELECT * FROM arkas"
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
+    """
+    Adds ORDER BY / LIMIT / OFFSET to a query from the builders above.
+    key_columns (rowid unless the caller passes the table's key) always end
+    the sort so consecutive pages stay stable. after=(values of
+    sort_columns(order_by, key_columns)) starts right after that row
+    (keyset pagination), which stays as fast as the first page however
+    deep it is.
+    """
+    direction = "DESC" if descending else "ASC"
+    order = " ORDER BY " + ", ".join(f"{column} {direction}" for column in sort_columns(order_by, key_columns))
+    values = list(values)
+    if after is None:
+        query += order
+    else:
+        branches = keyset_conditions(sort_columns(order_by, key_columns), tuple(after), descending)
+        if len(branches) == 1:
+            condition, params = branches[0]
+            query = _where(query, condition) + order
+            values.extend(params)
+        else:
+            # One index seek per branch; UNION ALL returns them one after the other.
+            selects, branch_values = [], []
+            for condition, params in branches:
+                selects.append(f"SELECT * FROM ({_where(query, condition)}{order}{' LIMIT ?' if limit is not None else ''})")
+                branch_values += values + params + ([limit + offset] if limit is not None else [])
+            query, values = " UNION ALL ".join(selects), branch_values
+
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        values.extend([limit, offset])
     return query, values
@@ -1,11 +1,12 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QGroupBox, QMessageBox
+    QTableView, QHeaderView, QGroupBox, QMessageBox, QAbstractItemView
 )
-from PySide6.QtCore import Qt
 from database.db_manager import DBManager
-from ui.dialogs import AddArkasDialog
-from services import filters
+from ui.dialogs import AddArkasDialog, BulkEditDialog
+from ui.completion import SuggestionCompleter
+from ui.live_filter import LiveFilter
+from ui.table_models import ArkasTableModel, selected_rows
 
 
 class ArkasTab(QWidget):
@@ -21,7 +22,7 @@ class ArkasTab(QWidget):
         filter_layout = QHBoxLayout()
 
         self.story_input = QLineEdit()
-        self.story_input.setPlaceholderText("Story Name")
+        self.story_input.setPlaceholderText("Words from story or series")
 
         self.series_input = QLineEdit()
         self.series_input.setPlaceholderText("Series Name")
@@ -32,6 +33,9 @@ class ArkasTab(QWidget):
         self.year_range_input = QLineEdit()
         self.year_range_input.setPlaceholderText("e.g. 2000-2005")
 
+        SuggestionCompleter(self.story_input, lambda: self.db, "arkas", "story_name")
+        SuggestionCompleter(self.series_input, lambda: self.db, "arkas", "series_name")
+
         for label, widget in [
             ("Story", self.story_input),
             ("Series", self.series_input),
@@ -53,15 +57,20 @@ class ArkasTab(QWidget):
         self.filter_box.setLayout(filter_layout)
         layout.addWidget(self.filter_box)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["#", "ID", "Story Name", "Series Name", "Year"])
+        self.live = LiveFilter(self, self.live_filter)
+        self.live.watch(self.story_input, self.series_input, self.year_input, self.year_range_input)
+
+        self.model = ArkasTableModel(self.db, self)
+        self.model.error.connect(lambda msg: QMessageBox.critical(self, "Error", msg))
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.setAlternatingRowColors(True)
         self.table.setSortingEnabled(True)
         self.table.verticalHeader().setVisible(False)
-        self.table.itemChanged.connect(self.on_item_changed)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
         layout.addWidget(self.table)
 
         bottom_btn_layout = QHBoxLayout()
@@ -69,44 +78,23 @@ class ArkasTab(QWidget):
         add_btn.clicked.connect(self.add_arkas_comic)
         del_btn = QPushButton("🗑️ Delete Selected")
         del_btn.clicked.connect(self.delete_selected)
+        edit_btn = QPushButton("✏️ Edit Selected")
+        edit_btn.clicked.connect(self.edit_selected)
         bottom_btn_layout.addWidget(add_btn)
+        bottom_btn_layout.addWidget(edit_btn)
         bottom_btn_layout.addWidget(del_btn)
         layout.addLayout(bottom_btn_layout)
 
         self.refresh_table()
 
-    def refresh_positions(self):
-        for i in range(self.table.rowCount()):
-            idx_item = QTableWidgetItem()
-            idx_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            idx_item.setData(Qt.DisplayRole, i + 1)
-            self.table.setItem(i, 0, idx_item)
+    def flush_edits(self):
+        return self.model.flush()
 
     def refresh_table(self):
-        rows = self.db.search_arkas()
-        self.populate_table(rows)
-
-    def populate_table(self, rows):
-        self.table.blockSignals(True)
-        self.table.setSortingEnabled(False)
-        rows = [dict(row) for row in rows]
-        self.table.setRowCount(len(rows))
-
-        for i, row in enumerate(rows):
-            id_item = QTableWidgetItem(str(row.get("id", "")))
-            id_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            self.table.setItem(i, 1, id_item)
-
-            self.table.setItem(i, 2, QTableWidgetItem(row.get("story_name", "")))
-            self.table.setItem(i, 3, QTableWidgetItem(row.get("series_name", "")))
-            year_item = QTableWidgetItem(str(row.get("year", "")))
-            self.table.setItem(i, 4, year_item)
-
-        self.table.blockSignals(False)
-        self.refresh_positions()
+        self.live.cancel()
+        self.model.db = self.db
+        self.model.set_filters()
         self.apply_theme_to_table()
-        self.table.setSortingEnabled(True)
-        self.table.hideColumn(1)
 
     def apply_theme_to_table(self):
         if not self.main_window:
@@ -114,7 +102,7 @@ class ArkasTab(QWidget):
         dark = self.main_window.dark_mode
         if dark:
             style = """
-            QTableWidget {
+            QTableView {
                 background-color: #1e1e1e;
                 alternate-background-color: #2b2b2b;
                 color: #ffffff;
@@ -131,7 +119,7 @@ class ArkasTab(QWidget):
             """
         else:
             style = """
-            QTableWidget {
+            QTableView {
                 background-color: #ffffff;
                 alternate-background-color: #f5f5f5;
                 color: #000000;
@@ -149,64 +137,91 @@ class ArkasTab(QWidget):
         self.table.setStyleSheet(style)
 
     def add_arkas_comic(self):
-        dialog = AddArkasDialog(self.db, main_window=self.main_window)
-        if dialog.exec():
-            self.refresh_table()
+        # The new row reaches the model through DBManager's change notification.
+        AddArkasDialog(self.db, main_window=self.main_window).exec()
 
     def delete_selected(self):
-        row = self.table.currentRow()
-        if row >= 0:
-            try:
-                comic_id = int(self.table.item(row, 1).text())
-                story_name = self.table.item(row, 2).text()
-                self.db.delete_arkas(comic_id)
-                QMessageBox.information(self, "Deleted", f"'{story_name}' deleted successfully!")
-                self.refresh_table()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", str(e))
-        else:
+        rows = selected_rows(self.table)
+        if not rows:
             QMessageBox.warning(self, "No Selection", "Please select a comic to delete.")
-
-    def on_item_changed(self, item):
-        if item.column() in [0, 1]:
             return
-        row = item.row()
+        self.flush_edits()
+        ids = [row["id"] for row in rows]
         try:
-            comic_id = int(self.table.item(row, 1).text())
-            story_name = self.table.item(row, 2).text()
-            series_name = self.table.item(row, 3).text()
-            year_text = self.table.item(row, 4).text()
-            year = int(year_text) if year_text.isdigit() else None
+            self.db.delete_many_arkas(ids)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        if len(rows) == 1:
+            QMessageBox.information(self, "Deleted", f"'{rows[0]['story_name']}' deleted successfully!")
+        else:
+            QMessageBox.information(self, "Deleted", f"{len(rows)} comics deleted successfully!")
 
-            self.db.update_arkas(comic_id, story_name, series_name, year)
+    def edit_selected(self):
+        rows = selected_rows(self.table)
+        if not rows:
+            QMessageBox.warning(self, "No Selection", "Please select comics to edit.")
+            return
+        dialog = BulkEditDialog(self.model.editable_columns(), len(rows), main_window=self.main_window,
+                                coerce=self.model.coerce)
+        if not dialog.exec():
+            return
+        self.flush_edits()
+        ids = [row["id"] for row in rows]
+        changes = {dialog.column: dialog.value}
+        try:
+            self.db.update_many_arkas(ids, **changes)
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to update comic: {e}")
+            QMessageBox.critical(self, "Error", str(e))
 
-    def apply_filters(self):
+    def filter_kwargs(self):
+        """The table filters typed so far. raises ValueError with a message for the user."""
         kwargs = {}
         if self.story_input.text():
-            kwargs["story_name"] = self.story_input.text().strip()
+            kwargs["text"] = self.story_input.text().strip()
         if self.series_input.text():
             kwargs["series_name"] = self.series_input.text().strip()
         if self.year_input.text():
             try:
                 kwargs["year"] = int(self.year_input.text())
             except ValueError:
-                QMessageBox.warning(self, "Invalid Input", "Year must be a number.")
-                return
+                raise ValueError("Year must be a number.") from None
         if self.year_range_input.text():
             try:
                 start, end = map(int, self.year_range_input.text().split("-"))
-                kwargs["year_range"] = (start, end)
-            except Exception:
-                QMessageBox.warning(self, "Invalid Format", "Year range must be in format: 2000-2005.")
-                return
+            except ValueError:
+                raise ValueError("Year range must be in format: 2000-2005.") from None
+            kwargs["year_range"] = (start, end)
+        return kwargs
+
+    def apply_filters(self):
+        try:
+            kwargs = self.filter_kwargs()
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Input", str(e))
+            return
+        self.run_filters(kwargs, live=False)
 
-        query, values = filters.build_arkas_filters(**kwargs)
-        cur = self.db.conn.cursor()
-        cur.execute(query, values)
-        rows = cur.fetchall()
-        self.populate_table(rows)
+    def live_filter(self):
+        try:
+            kwargs = self.filter_kwargs()
+        except ValueError:
+            # Half-typed input ("2000-") keeps the rows of the last complete filters.
+            return
+        self.run_filters(kwargs, live=True)
+
+    def run_filters(self, kwargs, live):
+        # The page is read on the reader connection, so pending edits must be written first.
+        self.flush_edits()
+        on_error = None
+        if not live:
+            on_error = lambda msg: QMessageBox.critical(self, "Error", f"Filtering failed: {msg}")
+        self.live.submit(
+            self.db.db_path,
+            self.model.page_job(**kwargs),
+            on_result=lambda page: self.model.show_page(page, **kwargs),
+            on_error=on_error,
+        )
 
     def clear_filters(self):
         self.story_input.clear()
@@ -214,12 +229,3 @@ class ArkasTab(QWidget):
         self.year_input.clear()
         self.year_range_input.clear()
         self.refresh_table()
-
-    def get_visible_rows(self):
-        rows = []
-        for i in range(self.table.rowCount()):
-            story = self.table.item(i, 2).text()
-            series = self.table.item(i, 3).text()
-            year = int(self.table.item(i, 4).text()) if self.table.item(i, 4).text().isdigit() else None
-            rows.append({"story_name": story, "series_name": series, "year": year})
-        return rows
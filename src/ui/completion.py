@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from PySide6.QtCore import Qt, QStringListModel, QTimer
+from PySide6.QtWidgets import QCompleter
+from database.db_manager import SUGGEST_LIMIT
+from database.text import normalize
+
+
+class SuggestionCompleter(QCompleter):
+    """
+    Completions for a filter QLineEdit from DBManager.suggest(). The lookup
+    waits until typing has paused for delay_ms, and the answers for the last
+    cache_size prefixes of the column are kept until the table changes. A
+    longer prefix is answered from a shorter one whose list was complete.
+    """
+    delay_ms = 150
+    cache_size = 64
+
+    def __init__(self, line_edit, db_source, table, column, limit=SUGGEST_LIMIT):
+        super().__init__(line_edit)
+        # db_source() returns the tab's current DBManager (it changes on Reset/Open).
+        self.db_source = db_source
+        self.table = table
+        self.column = column
+        self.limit = limit
+        self._cache = OrderedDict()
+        self._state = None
+        self.setModel(QStringListModel(self))
+        # suggest() already matched ignoring accents; Qt's own filter would not.
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.setCaseSensitivity(Qt.CaseInsensitive)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.refresh)
+        line_edit.setCompleter(self)
+        line_edit.textEdited.connect(lambda _: self._timer.start(self.delay_ms))
+
+    def refresh(self):
+        prefix = self.widget().text().strip()
+        values = self.lookup(prefix) if prefix else []
+        self.model().setStringList(values)
+        if values and self.widget().hasFocus():
+            self.complete()
+
+    def lookup(self, prefix):
+        db = self.db_source()
+        # Writes through this connection bump the table's cache generation;
+        # data_version moves when another connection (an import) commits.
+        state = (id(db), db.cache.generation(self.table), db.data_version())
+        if state != self._state:
+            self._cache.clear()
+            self._state = state
+        key = normalize(prefix)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        for known, values in self._cache.items():
+            if key.startswith(known) and len(values) < self.limit:
+                result = [value for value in values if normalize(value).startswith(key)]
+                break
+        else:
+            result = db.suggest(self.table, self.column, prefix, self.limit)
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
@@ -1,7 +1,9 @@
 from PySide6.QtWidgets import (
-    QDialog, QFormLayout, QLineEdit, QPushButton, QVBoxLayout, QLabel,
-    QMessageBox, QCheckBox, QPlainTextEdit, QTableWidget, QTableWidgetItem
+    QDialog, QFormLayout, QLineEdit, QPushButton, QVBoxLayout, QHBoxLayout, QLabel,
+    QMessageBox, QCheckBox, QPlainTextEdit, QTableWidget, QTableWidgetItem, QComboBox
 )
+from ui.workers import run_in_background
+from ui.snapshots import SnapshotSettings
 
 class ThemedDialog(QDialog):
     def __init__(self, main_window=None):
@@ -203,6 +205,48 @@ class AddArkasDialog(ThemedDialog):
             QMessageBox.critical(self, "Error", f"Failed to add comic: {e}")
 
 
+class BulkEditDialog(ThemedDialog):
+    """
+    Asks for one column and the value to set on every selected row.
+    coerce(key, text), if given, converts the text to the stored value; a
+    ValueError is shown and keeps the dialog open.
+    """
+
+    def __init__(self, columns, count, main_window=None, coerce=None):
+        super().__init__(main_window)
+        self.coerce = coerce
+        self.setWindowTitle(f"Edit {count} Comics")
+        self.setMinimumWidth(400)
+        self.column = None
+        self.value = None
+
+        layout = QFormLayout()
+        self.column_combo = QComboBox()
+        for header, key in columns:
+            self.column_combo.addItem(header, key)
+        self.value_input = QLineEdit()
+        layout.addRow("Column:", self.column_combo)
+        layout.addRow("New value:", self.value_input)
+
+        self.submit_btn = QPushButton("Apply")
+        self.submit_btn.clicked.connect(self.apply)
+        v_layout = QVBoxLayout()
+        v_layout.addLayout(layout)
+        v_layout.addWidget(self.submit_btn)
+        self.setLayout(v_layout)
+
+    def apply(self):
+        column, value = self.column_combo.currentData(), self.value_input.text()
+        if self.coerce is not None:
+            try:
+                value = self.coerce(column, value)
+            except ValueError as e:
+                QMessageBox.warning(self, "Invalid Value", f"{self.column_combo.currentText()}: {e}")
+                return
+        self.column, self.value = column, value
+        self.accept()
+
+
 class SearchDialog(ThemedDialog):
     def __init__(self, db_manager, main_window=None):
         super().__init__(main_window)
@@ -248,9 +292,16 @@ class SearchDialog(ThemedDialog):
         self.query_input.setMaximumHeight(100)
         layout.addWidget(self.query_input)
 
+        btn_layout = QHBoxLayout()
         self.run_btn = QPushButton("Run Query")
         self.run_btn.clicked.connect(self.run_query)
-        layout.addWidget(self.run_btn)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_query)
+        btn_layout.addWidget(self.run_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        layout.addLayout(btn_layout)
+        self.task = None
 
         layout.addWidget(QLabel("Results:"))
         self.results_table = QTableWidget()
@@ -263,22 +314,166 @@ class SearchDialog(ThemedDialog):
         if not query:
             QMessageBox.warning(self, "Warning", "Please enter a query!")
             return
+        self.run_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.task = run_in_background(
+            self.db.db_path,
+            lambda db, progress: db.execute_sql(query),
+            on_result=self.show_results,
+            on_error=lambda msg: QMessageBox.critical(self, "Error", f"Query failed:\n{msg}"),
+        )
+        self.task.signals.finished.connect(self.query_finished)
+
+    def cancel_query(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    def query_finished(self):
+        self.task = None
+        self.run_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+
+    def show_results(self, result):
+        headers, rows = result
+        self.results_table.setUpdatesEnabled(False)
+        self.results_table.clear()
+        self.results_table.setColumnCount(len(headers))
+        self.results_table.setRowCount(len(rows))
+        self.results_table.setHorizontalHeaderLabels(headers)
+
+        for r_idx, row in enumerate(rows):
+            for c_idx, col in enumerate(headers):
+                self.results_table.setItem(r_idx, c_idx, QTableWidgetItem(str(row[c_idx])))
+
+        self.results_table.setUpdatesEnabled(True)
+
+    def done(self, result):
+        self.cancel_query()
+        super().done(result)
+
+
+class DiagnosticsDialog(ThemedDialog):
+    def __init__(self, db_manager, main_window=None):
+        super().__init__(main_window)
+        self.db = db_manager
+        self.setWindowTitle("Query Diagnostics")
+        self.setMinimumSize(800, 500)
+
+        layout = QVBoxLayout()
+        self.threshold_input = QLineEdit(str(self.db.monitor.slow_threshold_ms))
+        threshold_layout = QFormLayout()
+        threshold_layout.addRow("Slow query threshold (ms):", self.threshold_input)
+        layout.addLayout(threshold_layout)
+
+        self.cache_label = QLabel()
+        layout.addWidget(self.cache_label)
+
+        layout.addWidget(QLabel("Recent queries by total time:"))
+        self.stats_table = QTableWidget()
+        layout.addWidget(self.stats_table)
+
+        layout.addWidget(QLabel("Slow queries:"))
+        self.slow_display = QPlainTextEdit()
+        self.slow_display.setReadOnly(True)
+        layout.addWidget(self.slow_display)
+
+        btn_layout = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        btn_layout.addWidget(refresh_btn)
+        btn_layout.addWidget(reset_btn)
+        layout.addLayout(btn_layout)
+
+        self.setLayout(layout)
+        self.refresh()
+
+    def refresh(self):
         try:
-            cur = self.db.conn.cursor()
-            cur.execute(query)
-            rows = cur.fetchall()
-            headers = [desc[0] for desc in cur.description] if cur.description else []
-
-            self.results_table.setUpdatesEnabled(False)
-            self.results_table.clear()
-            self.results_table.setColumnCount(len(headers))
-            self.results_table.setRowCount(len(rows))
-            self.results_table.setHorizontalHeaderLabels(headers)
-
-            for r_idx, row in enumerate(rows):
-                for c_idx, col in enumerate(headers):
-                    self.results_table.setItem(r_idx, c_idx, QTableWidgetItem(str(row[col])))
-
-            self.results_table.setUpdatesEnabled(True)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Query failed:\n{e}")
+            self.db.monitor.configure(slow_threshold_ms=float(self.threshold_input.text()))
+        except ValueError:
+            QMessageBox.warning(self, "Warning", "Threshold must be a number.")
+
+        cache = self.db.cache_stats()
+        self.cache_label.setText(
+            f"Result cache: {cache['hits']} hits, {cache['misses']} misses "
+            f"({cache['hit_rate']:.0%}), {cache['entries']}/{cache['capacity']} entries, "
+            f"{cache['rows']} rows, {cache['evictions']} evictions"
+        )
+
+        headers = ["Statement", "Calls", "Total ms", "Avg ms", "Max ms", "Rows", "Errors"]
+        stats = self.db.query_stats()
+        self.stats_table.clear()
+        self.stats_table.setColumnCount(len(headers))
+        self.stats_table.setRowCount(len(stats))
+        self.stats_table.setHorizontalHeaderLabels(headers)
+        for r_idx, entry in enumerate(stats):
+            values = [
+                entry["fingerprint"], entry["calls"], f"{entry['total_ms']:.1f}",
+                f"{entry['avg_ms']:.2f}", f"{entry['max_ms']:.1f}", entry["rows"], entry["errors"],
+            ]
+            for c_idx, value in enumerate(values):
+                self.stats_table.setItem(r_idx, c_idx, QTableWidgetItem(str(value)))
+
+        lines = []
+        for slow in reversed(self.db.slow_queries()):
+            failed = "failed, " if slow.error else ""
+            lines.append(f"{slow.elapsed_ms:.1f} ms, {failed}{slow.rows} rows: {slow.fingerprint}")
+            lines.extend(f"    {step}" for step in slow.plan)
+        self.slow_display.setPlainText("\n".join(lines) if lines else "No slow queries recorded.")
+
+    def reset(self):
+        self.db.monitor.reset()
+        self.db.cache.reset_stats()
+        self.refresh()
+
+
+class SnapshotSettingsDialog(ThemedDialog):
+    def __init__(self, settings, default_directory, main_window=None):
+        super().__init__(main_window)
+        self.setWindowTitle("Automatic Snapshots")
+        self.setMinimumWidth(450)
+        self.settings = settings
+
+        layout = QFormLayout()
+        self.enabled_check = QCheckBox("Take snapshots automatically")
+        self.enabled_check.setChecked(settings.enabled)
+        self.directory_input = QLineEdit(settings.directory)
+        self.directory_input.setPlaceholderText(str(default_directory))
+        self.interval_input = QLineEdit(f"{settings.interval_hours:g}")
+        self.keep_input = QLineEdit(str(settings.keep))
+        self.compress_check = QCheckBox("Compress snapshots (gzip)")
+        self.compress_check.setChecked(settings.compress)
+
+        layout.addRow(self.enabled_check)
+        layout.addRow("Folder:", self.directory_input)
+        layout.addRow("Every (hours):", self.interval_input)
+        layout.addRow("Keep last:", self.keep_input)
+        layout.addRow(self.compress_check)
+
+        self.submit_btn = QPushButton("Save")
+        self.submit_btn.clicked.connect(self.save)
+        v_layout = QVBoxLayout()
+        v_layout.addLayout(layout)
+        v_layout.addWidget(self.submit_btn)
+        self.setLayout(v_layout)
+
+    def save(self):
+        try:
+            interval = float(self.interval_input.text())
+            keep = int(self.keep_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Warning", "Interval and keep must be numbers.")
+            return
+        if interval <= 0 or keep < 1:
+            QMessageBox.warning(self, "Warning", "Interval must be positive and at least one snapshot kept.")
+            return
+        self.settings = SnapshotSettings(
+            enabled=self.enabled_check.isChecked(),
+            directory=self.directory_input.text().strip(),
+            interval_hours=interval,
+            keep=keep,
+            compress=self.compress_check.isChecked(),
+        )
+        self.accept()
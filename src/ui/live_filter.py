@@ -0,0 +1,40 @@
+from PySide6.QtCore import QObject, QTimer
+from ui.workers import ReaderConnection
+
+
+class LiveFilter(QObject):
+    """
+    Re-runs a tab's filters as its inputs are edited. apply() is called once
+    typing has paused for delay_ms; the query it submits runs on the tab's
+    own reader connection, so a newer edit interrupts the one in flight and
+    a stale result is never shown.
+    """
+    delay_ms = 300
+
+    def __init__(self, parent, apply):
+        super().__init__(parent)
+        self.apply = apply
+        self.reader = ReaderConnection()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.apply)
+
+    def watch(self, *line_edits):
+        for line_edit in line_edits:
+            line_edit.textEdited.connect(self.schedule)
+
+    def schedule(self, *_):
+        self._timer.start(self.delay_ms)
+
+    def submit(self, db_path, job, on_result=None, on_error=None):
+        # An explicit apply (button, Enter) replaces a scheduled one.
+        self._timer.stop()
+        return self.reader.submit(db_path, job, on_result, on_error)
+
+    def cancel(self):
+        self._timer.stop()
+        self.reader.cancel()
+
+    def close(self):
+        self._timer.stop()
+        self.reader.close()
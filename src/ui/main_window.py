@@ -1,18 +1,30 @@
 from PySide6.QtWidgets import (
     QMainWindow, QTabWidget, QFileDialog, QApplication, QDialog,
-    QVBoxLayout, QLabel, QPushButton, QScrollArea, QWidget, QTextEdit
+    QVBoxLayout, QLabel, QPushButton, QScrollArea, QWidget, QTextEdit,
+    QProgressDialog, QInputDialog
 )
 from PySide6.QtGui import QAction, QKeySequence, QDesktopServices
 from PySide6.QtCore import Qt, QUrl
-import shutil
 from pathlib import Path
 
 from ui.mickey_tab import MickeyTab
 from ui.superheroes_tab import SuperheroesTab
 from ui.arkas_tab import ArkasTab
+from ui.stats_tab import StatsTab
 from database.db_manager import DBManager
 from services.csv_edit import CSVService
-from ui.dialogs import SearchDialog
+from ui.dialogs import SearchDialog, DiagnosticsDialog, SnapshotSettingsDialog
+from ui.snapshots import SnapshotScheduler
+from ui.workers import run_in_background
+from services import backup
+
+# Import dialog label -> models.CONFLICT_POLICIES entry
+CONFLICT_CHOICES = {
+    "Report as errors": "error",
+    "Skip (keep what is stored)": "skip",
+    "Overwrite with the file's values": "overwrite",
+    "Merge (fill in non-empty values)": "merge",
+}
 
 
 class MainWindow(QMainWindow):
@@ -31,13 +43,45 @@ class MainWindow(QMainWindow):
         self.mickey_tab = MickeyTab(self.db, main_window=self)
         self.superheroes_tab = SuperheroesTab(self.db, main_window=self)
         self.arkas_tab = ArkasTab(self.db, main_window=self)
+        self.stats_tab = StatsTab(self.db, main_window=self)
 
         self.tabs.addTab(self.mickey_tab, "Mickey Comics")
         self.tabs.addTab(self.superheroes_tab, "Superhero Comics")
         self.tabs.addTab(self.arkas_tab, "Arkas Comics")
+        self.tabs.addTab(self.stats_tab, "Statistics")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
 
         self.setMenuBar(self.create_menu_bar())
 
+        self.snapshots = SnapshotScheduler(self)
+        self.snapshots.snapshot_taken.connect(
+            lambda path: self.statusBar().showMessage(f"Snapshot saved to {path}", 10000)
+        )
+        self.snapshots.failed.connect(
+            lambda msg: self.statusBar().showMessage(f"Automatic snapshot failed: {msg}", 10000)
+        )
+        self.snapshots.start()
+
+    def flush_edits(self):
+        """Writes every tab's buffered cell edits."""
+        for tab in [self.mickey_tab, self.superheroes_tab, self.arkas_tab]:
+            tab.flush_edits()
+
+    def close_readers(self):
+        """Stops the tabs' live filter threads, which hold connections of their own."""
+        for tab in [self.mickey_tab, self.superheroes_tab, self.arkas_tab]:
+            tab.live.close()
+
+    def closeEvent(self, event):
+        self.flush_edits()
+        self.close_readers()
+        super().closeEvent(event)
+
+    def on_tab_changed(self, index):
+        self.flush_edits()
+        if self.tabs.widget(index) is self.stats_tab:
+            self.stats_tab.refresh_table()
+
     # -------------------- Theme-aware dialogs --------------------
     def show_user_guide_dialog(self):
         dlg = QDialog(self)
@@ -146,11 +190,13 @@ class MainWindow(QMainWindow):
             if reply != QMessageBox.Yes:
                 return
             db_path = self.db.db_path
+            self.flush_edits()
+            self.close_readers()
             self.db.close()
             if Path(db_path).exists():
                 Path(db_path).unlink()
             self.db = DBManager(db_path)
-            for tab in [self.mickey_tab, self.superheroes_tab, self.arkas_tab]:
+            for tab in [self.mickey_tab, self.superheroes_tab, self.arkas_tab, self.stats_tab]:
                 tab.db = self.db
                 if hasattr(tab, "refresh_table"):
                     tab.refresh_table()
@@ -163,16 +209,13 @@ class MainWindow(QMainWindow):
         # Backup DB
         backup_db_action = QAction("Backup Database", self)
         backup_db_action.setShortcut("Ctrl+B")
-        def backup_db():
-            target_file, _ = QFileDialog.getSaveFileName(self, "Backup Database As", "", "SQLite DB (*.db)")
-            if not target_file:
-                return
-            self.db.conn.commit()
-            shutil.copy(self.db.db_path, target_file)
-            QMessageBox.information(self, "Backup", f"Database backed up to:\n{target_file}")
-        backup_db_action.triggered.connect(backup_db)
+        backup_db_action.triggered.connect(self.backup_database)
         file_menu.addAction(backup_db_action)
 
+        snapshots_action = QAction("Automatic Snapshots...", self)
+        snapshots_action.triggered.connect(self.configure_snapshots)
+        file_menu.addAction(snapshots_action)
+
         # Open DB
         open_db_action = QAction("Open Database", self)
         open_db_action.setShortcut("Ctrl+D")
@@ -180,9 +223,10 @@ class MainWindow(QMainWindow):
             new_path, _ = QFileDialog.getOpenFileName(self, "Open Database", "", "SQLite DB (*.db)")
             if not new_path:
                 return
+            self.flush_edits()
             self.db.close()
             self.db = DBManager(new_path)
-            for tab in [self.mickey_tab, self.superheroes_tab, self.arkas_tab]:
+            for tab in [self.mickey_tab, self.superheroes_tab, self.arkas_tab, self.stats_tab]:
                 tab.db = self.db
                 if hasattr(tab, "refresh_table"):
                     tab.refresh_table()
@@ -220,6 +264,10 @@ class MainWindow(QMainWindow):
         user_guide_action.triggered.connect(self.show_user_guide_dialog)
         help_menu.addAction(user_guide_action)
 
+        diagnostics_action = QAction("Query Diagnostics", self)
+        diagnostics_action.triggered.connect(lambda: DiagnosticsDialog(self.db, main_window=self).exec())
+        help_menu.addAction(diagnostics_action)
+
         report_bug_action = QAction("Report Bug", self)
         report_bug_action.triggered.connect(lambda: QDesktopServices.openUrl(QUrl("https://github.com/Miltos-Chalaidopoulos/ComicAnalitics/issues")))
         help_menu.addAction(report_bug_action)
@@ -271,28 +319,106 @@ class MainWindow(QMainWindow):
         for cat_table in self.superheroes_tab.category_tables.values():
             cat_table.apply_theme_to_table()
 
+    # -------------------- Background tasks --------------------
+    def run_with_progress(self, title, job, on_result, on_error=None, on_cancelled=None, unit="rows"):
+        """Runs job(db, progress) off the GUI thread behind a cancellable progress dialog."""
+        # The job uses its own connection and must see the edits still buffered here.
+        self.flush_edits()
+        dialog = QProgressDialog(title, "Cancel", 0, 0, self)
+        dialog.setWindowTitle(title)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(300)
+
+        def progress(done, total):
+            dialog.setMaximum(total)
+            dialog.setLabelText(f"{title}\n{done} {unit}")
+            if total:
+                dialog.setValue(done)
+
+        task = run_in_background(
+            self.db.db_path, job,
+            on_result=on_result,
+            on_error=on_error or (lambda msg: self.show_task_error(title, msg)),
+            on_progress=progress,
+            on_cancelled=on_cancelled,
+        )
+        dialog.canceled.connect(task.cancel)
+        task.signals.finished.connect(dialog.reset)
+        dialog.setValue(0)
+        return task
+
+    def show_task_error(self, title, message):
+        from PySide6.QtWidgets import QMessageBox
+        QMessageBox.critical(self, "Error", f"{title} failed: {message}")
+
+    # -------------------- Backup --------------------
+    def backup_database(self):
+        target_file, chosen_filter = QFileDialog.getSaveFileName(
+            self, "Backup Database As", "", "SQLite DB (*.db);;Compressed SQLite DB (*.db.gz)"
+        )
+        if not target_file:
+            return
+        if "*.db.gz" in chosen_filter and not target_file.endswith(".gz"):
+            target_file += ".db.gz" if not target_file.endswith(".db") else ".gz"
+
+        def job(db, progress):
+            return str(backup.backup_to(db, target_file, progress=progress))
+
+        def done(path):
+            from PySide6.QtWidgets import QMessageBox
+            QMessageBox.information(self, "Backup", f"Database backed up to:\n{path}")
+
+        self.run_with_progress("Backing up database", job, done, unit="pages")
+
+    def configure_snapshots(self):
+        dlg = SnapshotSettingsDialog(self.snapshots.settings, self.snapshots.directory(), main_window=self)
+        if dlg.exec():
+            self.snapshots.apply(dlg.settings)
+
     # -------------------- CSV / Search Methods --------------------
     def import_csv(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Select CSV", "", "CSV Files (*.csv)")
         if not file_path:
             return
-        table_type = self.csv_service.detect_csv_type(file_path)
+        from PySide6.QtWidgets import QMessageBox
         try:
+            table_type = self.csv_service.detect_csv_type(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Import failed: {e}")
+            return
+        if table_type is None:
+            QMessageBox.warning(self, "Error", "Unknown CSV format!")
+            return
+        choice, ok = QInputDialog.getItem(
+            self, "Import CSV", "Rows that are already in the collection:", list(CONFLICT_CHOICES), 0, False
+        )
+        if not ok:
+            return
+        conflict = CONFLICT_CHOICES[choice]
+
+        def job(db, progress):
+            service = CSVService(db)
+            return getattr(service, f"import_{table_type}")(file_path, progress=progress, conflict=conflict)
+
+        def done(report):
+            # The import committed on the worker's connection, so no change
+            # notification reached self.db; re-page the target from the top.
             if table_type == "mickey":
-                self.csv_service.import_mickey(file_path)
                 self.mickey_tab.refresh_table()
             elif table_type == "superheroes":
-                self.csv_service.import_superheroes(file_path)
-                self.superheroes_tab.refresh_categories()
-            elif table_type == "arkas":
-                self.csv_service.import_arkas(file_path)
+                self.superheroes_tab.sync_categories()
+                self.superheroes_tab.invalidate_categories()
+            else:
                 self.arkas_tab.refresh_table()
+            if report.errors:
+                QMessageBox.warning(self, "Import finished with errors", report.summary())
             else:
-                from PySide6.QtWidgets import QMessageBox
-                QMessageBox.warning(self, "Error", "Unknown CSV format!")
-        except Exception as e:
-            from PySide6.QtWidgets import QMessageBox
-            QMessageBox.critical(self, "Error", f"Import failed: {e}")
+                QMessageBox.information(self, "Import", report.summary())
+
+        self.run_with_progress(
+            "Importing CSV", job, done,
+            on_cancelled=lambda: QMessageBox.information(self, "Import", "Import cancelled, nothing was imported."),
+        )
 
     def export_csv(self):
         current_tab = self.tabs.currentWidget()
@@ -305,23 +431,35 @@ class MainWindow(QMainWindow):
             return
         if not file_name.lower().endswith(".csv"):
             file_name += ".csv"
-        try:
-            if current_tab == self.mickey_tab:
-                rows = self.mickey_tab.get_visible_rows()
-                self.csv_service.export_mickey(file_name, rows)
-            elif current_tab == self.superheroes_tab:
-                current_cat_widget = current_tab.tabs.currentWidget()
-                category = current_tab.tabs.tabText(current_tab.tabs.currentIndex())
-                rows = current_cat_widget.get_visible_rows()
-                self.csv_service.export_superheroes_category(file_name, category, rows)
-            elif current_tab == self.arkas_tab:
-                rows = self.arkas_tab.get_visible_rows()
-                self.csv_service.export_arkas(file_name, rows)
-        except Exception as e:
-            from PySide6.QtWidgets import QMessageBox
-            QMessageBox.critical(self, "Error", f"Export failed: {e}")
+
+        if current_tab == self.mickey_tab:
+            filters = self.export_filters(self.mickey_tab.model)
+            def job(db, progress):
+                return CSVService(db).export_mickey(file_name, progress=progress, **filters)
+        elif current_tab == self.superheroes_tab:
+            current_cat_widget = current_tab.tabs.currentWidget()
+            if current_cat_widget is None:
+                return
+            category = current_cat_widget.category
+            filters = self.export_filters(current_cat_widget.model)
+            def job(db, progress):
+                return CSVService(db).export_superheroes_category(file_name, category, progress=progress, **filters)
+        elif current_tab == self.arkas_tab:
+            filters = self.export_filters(self.arkas_tab.model)
+            def job(db, progress):
+                return CSVService(db).export_arkas(file_name, progress=progress, **filters)
+        else:
+            return
+
+        self.run_with_progress(f"Exporting {current_title}", job, lambda written: None)
+
+    @staticmethod
+    def export_filters(model):
+        """The tab's current filters and sort order, as a spec for the streamed export."""
+        return dict(model.filters, order_by=model.order_by, descending=model.descending)
 
     def open_search_dialog(self):
+        self.flush_edits()
         dlg = SearchDialog(self.db, main_window=self)
         dlg.exec()
 
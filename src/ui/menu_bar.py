@@ -1,7 +1,6 @@
 from PySide6.QtWidgets import QMenuBar, QMessageBox, QFileDialog, QApplication
 from PySide6.QtGui import QAction, QKeySequence, QDesktopServices
 from PySide6.QtCore import QUrl
-import shutil
 from pathlib import Path
 from database.db_manager import DBManager
 
@@ -63,14 +62,7 @@ class MenuBarFactory:
 
         backup_db_action = QAction("Backup Database", main_window)
         backup_db_action.setShortcut("Ctrl+B")
-        def backup_db():
-            target_file, _ = QFileDialog.getSaveFileName(main_window, "Backup Database As", "", "SQLite DB (*.db)")
-            if not target_file:
-                return
-            main_window.db.conn.commit()
-            shutil.copy(main_window.db.db_path, target_file)
-            QMessageBox.information(main_window, "Backup", f"Database backed up to:\n{target_file}")
-        backup_db_action.triggered.connect(backup_db)
+        backup_db_action.triggered.connect(main_window.backup_database)
         file_menu.addAction(backup_db_action)
 
         open_db_action = QAction("Open Database", main_window)
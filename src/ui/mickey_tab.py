@@ -1,11 +1,15 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QGroupBox, QMessageBox,
-    QDialog, QScrollArea, QTextEdit, QHeaderView
+    QTableView, QGroupBox, QMessageBox,
+    QDialog, QScrollArea, QTextEdit, QHeaderView, QCheckBox, QAbstractItemView
 )
-from PySide6.QtCore import Qt
 from database.db_manager import DBManager
-from ui.dialogs import AddMickeyDialog
+from ui.dialogs import AddMickeyDialog, BulkEditDialog
+from ui.completion import SuggestionCompleter
+from ui.live_filter import LiveFilter
+from ui.table_models import MickeyTableModel, selected_rows
+from ui.workers import run_in_background
+from services import filters
 
 
 class MickeyTab(QWidget):
@@ -24,8 +28,9 @@ class MickeyTab(QWidget):
 
         self.issue_input = QLineEdit(); self.issue_input.setPlaceholderText("Issue #")
         self.vol_input = QLineEdit(); self.vol_input.setPlaceholderText("Vol #")
-        self.mainstory_input = QLineEdit(); self.mainstory_input.setPlaceholderText("Main Story")
+        self.mainstory_input = QLineEdit(); self.mainstory_input.setPlaceholderText("Words from main story")
         self.year_input = QLineEdit(); self.year_input.setPlaceholderText("Year")
+        SuggestionCompleter(self.mainstory_input, lambda: self.db, "mickey", "mainstory")
 
         for lbl_text, le in [("Issue", self.issue_input), ("Vol", self.vol_input),
                              ("Story", self.mainstory_input), ("Year", self.year_input)]:
@@ -41,6 +46,8 @@ class MickeyTab(QWidget):
                              ("Missing Issues (range)", self.exclude_range_input)]:
             bottom_row.addWidget(QLabel(lbl_text))
             bottom_row.addWidget(le)
+        self.per_volume_check = QCheckBox("Per volume")
+        bottom_row.addWidget(self.per_volume_check)
 
         filter_layout.addLayout(top_row)
         filter_layout.addLayout(bottom_row)
@@ -58,15 +65,22 @@ class MickeyTab(QWidget):
         self.filter_box.setLayout(filter_layout)
         layout.addWidget(self.filter_box)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["#", "Issue num", "Vol num", "Main Story", "Year"])
+        # The missing issues range opens a report, so it still waits for Apply.
+        self.live = LiveFilter(self, self.live_filter)
+        self.live.watch(self.issue_input, self.vol_input, self.mainstory_input, self.year_input,
+                        self.year_range_input, self.issue_range_input)
+
+        self.model = MickeyTableModel(self.db, self)
+        self.model.error.connect(lambda msg: QMessageBox.critical(self, "Error", msg))
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.setAlternatingRowColors(True)
         self.table.setSortingEnabled(True)
         self.table.verticalHeader().setVisible(False)
-        self.table.itemChanged.connect(self.on_item_changed)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
         layout.addWidget(self.table)
 
         bottom_btn_layout = QHBoxLayout()
@@ -74,47 +88,23 @@ class MickeyTab(QWidget):
         add_btn.clicked.connect(self.add_mickey_comic)
         del_btn = QPushButton("🗑️ Delete Selected")
         del_btn.clicked.connect(self.delete_selected)
+        edit_btn = QPushButton("✏️ Edit Selected")
+        edit_btn.clicked.connect(self.edit_selected)
         bottom_btn_layout.addWidget(add_btn)
+        bottom_btn_layout.addWidget(edit_btn)
         bottom_btn_layout.addWidget(del_btn)
         layout.addLayout(bottom_btn_layout)
 
         self.refresh_table()
 
-    def refresh_positions(self):
-        for i in range(self.table.rowCount()):
-            idx_item = QTableWidgetItem()
-            idx_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            idx_item.setData(Qt.DisplayRole, i + 1)
-            self.table.setItem(i, 0, idx_item)
+    def flush_edits(self):
+        return self.model.flush()
 
     def refresh_table(self):
-        rows = self.db.search_mickey()
-        self.populate_table(rows)
-
-    def populate_table(self, rows):
-        self.table.blockSignals(True)
-        self.table.setSortingEnabled(False)
-        self.table.setRowCount(len(rows))
-
-        for i, row in enumerate(rows):
-            issue_item = QTableWidgetItem()
-            issue_item.setData(Qt.DisplayRole, int(row["issue_num"]))
-            self.table.setItem(i, 1, issue_item)
-
-            vol_item = QTableWidgetItem()
-            vol_item.setData(Qt.DisplayRole, int(row["vol_num"]))
-            self.table.setItem(i, 2, vol_item)
-
-            self.table.setItem(i, 3, QTableWidgetItem(row["mainstory"]))
-
-            year_item = QTableWidgetItem()
-            year_item.setData(Qt.DisplayRole, int(row["year"]))
-            self.table.setItem(i, 4, year_item)
-
-        self.table.blockSignals(False)
-        self.refresh_positions()
+        self.live.cancel()
+        self.model.db = self.db
+        self.model.set_filters()
         self.apply_theme_to_table()
-        self.table.setSortingEnabled(True)
 
     def apply_theme_to_table(self):
         if not self.main_window:
@@ -122,7 +112,7 @@ class MickeyTab(QWidget):
         dark = self.main_window.dark_mode
         if dark:
             style = """
-            QTableWidget {
+            QTableView {
                 background-color: #1e1e1e;
                 alternate-background-color: #2b2b2b;
                 color: #ffffff;
@@ -139,7 +129,7 @@ class MickeyTab(QWidget):
             """
         else:
             style = """
-            QTableWidget {
+            QTableView {
                 background-color: #ffffff;
                 alternate-background-color: #f5f5f5;
                 color: #000000;
@@ -157,68 +147,111 @@ class MickeyTab(QWidget):
         self.table.setStyleSheet(style)
 
     def add_mickey_comic(self):
-        dialog = AddMickeyDialog(self.db, main_window=self.main_window)
-        if dialog.exec():
-            self.refresh_table()
+        # The new row reaches the model through DBManager's change notification.
+        AddMickeyDialog(self.db, main_window=self.main_window).exec()
 
     def delete_selected(self):
-        row = self.table.currentRow()
-        if row >= 0:
-            issue_num = int(self.table.item(row, 1).text())
-            vol_num = int(self.table.item(row, 2).text())
-            self.db.delete_mickey(issue_num, vol_num)
-            QMessageBox.information(self, "Deleted", "Comic deleted successfully!")
-            self.refresh_table()
+        rows = selected_rows(self.table)
+        if not rows:
+            QMessageBox.warning(self, "No Selection", "Please select comics to delete.")
+            return
+        self.flush_edits()
+        keys = [self.model.row_key(row) for row in rows]
+        try:
+            self.db.delete_many_mickey(keys)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to delete comics: {e}")
+            return
+        QMessageBox.information(self, "Deleted", f"{len(keys)} comic(s) deleted successfully!")
 
-    def on_item_changed(self, item):
-        if item.column() == 0:
+    def edit_selected(self):
+        rows = selected_rows(self.table)
+        if not rows:
+            QMessageBox.warning(self, "No Selection", "Please select comics to edit.")
+            return
+        dialog = BulkEditDialog(self.model.editable_columns(), len(rows), main_window=self.main_window,
+                                coerce=self.model.coerce)
+        if not dialog.exec():
             return
-        row = item.row()
+        self.flush_edits()
+        keys = [self.model.row_key(row) for row in rows]
+        changes = {dialog.column: dialog.value}
         try:
-            issue_num = int(self.table.item(row, 1).text())
-            vol_num = int(self.table.item(row, 2).text())
-            mainstory = self.table.item(row, 3).text()
-            year = int(self.table.item(row, 4).text())
-            self.db.update_mickey(issue_num, vol_num, mainstory, year)
+            self.db.update_many_mickey(keys, **changes)
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to update comic: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to update comics: {e}")
 
-    def apply_filters(self):
+    @staticmethod
+    def parse_range(line_edit, message):
+        try:
+            start, end = map(int, line_edit.text().split("-"))
+        except ValueError:
+            raise ValueError(message) from None
+        return start, end
+
+    def filter_kwargs(self):
+        """The table filters typed so far. raises ValueError with a message for the user."""
         kwargs = {}
-        if self.issue_input.text():
-            kwargs["issue_num"] = int(self.issue_input.text())
-        if self.vol_input.text():
-            kwargs["vol_num"] = int(self.vol_input.text())
+        try:
+            if self.issue_input.text():
+                kwargs["issue_num"] = int(self.issue_input.text())
+            if self.vol_input.text():
+                kwargs["vol_num"] = int(self.vol_input.text())
+            if self.year_input.text():
+                kwargs["year"] = int(self.year_input.text())
+        except ValueError:
+            raise ValueError("Issue, volume and year must be numbers") from None
         if self.mainstory_input.text():
-            kwargs["mainstory"] = self.mainstory_input.text()
-        if self.year_input.text():
-            kwargs["year"] = int(self.year_input.text())
+            kwargs["text"] = self.mainstory_input.text()
         if self.year_range_input.text():
-            try:
-                start, end = map(int, self.year_range_input.text().split("-"))
-                kwargs["year_range"] = (start, end)
-            except:
-                QMessageBox.warning(self, "Error", "Invalid year range format (use start-end)")
-                return
+            kwargs["year_range"] = self.parse_range(self.year_range_input, "Invalid year range format (use start-end)")
         if self.issue_range_input.text():
-            try:
-                start, end = map(int, self.issue_range_input.text().split("-"))
-                kwargs["issue_range"] = (start, end)
-            except:
-                QMessageBox.warning(self, "Error", "Invalid issue range format (use start-end)")
-                return
+            kwargs["issue_range"] = self.parse_range(self.issue_range_input, "Invalid issue range format (use start-end)")
+        return kwargs
+
+    def apply_filters(self):
+        try:
+            kwargs = self.filter_kwargs()
+            if self.exclude_range_input.text():
+                start, end = self.parse_range(self.exclude_range_input, "Invalid missing issues format (use start-end)")
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
         if self.exclude_range_input.text():
-            try:
-                start, end = map(int, self.exclude_range_input.text().split("-"))
-                missing = self.db.find_missing_issues(start, end, **kwargs)
-                self.show_missing_dialog(missing)
-                return
-            except:
-                QMessageBox.warning(self, "Error", "Invalid missing issues format (use start-end)")
-                return
+            self.flush_edits()
+            if self.per_volume_check.isChecked():
+                job = lambda db, progress: db.find_missing_issues_by_volume(start, end, **kwargs)
+            else:
+                job = lambda db, progress: db.find_missing_issues(start, end, **kwargs)
+            run_in_background(
+                self.db.db_path,
+                job,
+                on_result=self.show_missing_dialog,
+                on_error=lambda msg: QMessageBox.critical(self, "Error", f"Failed to find missing issues: {msg}"),
+            )
+            return
+        self.run_filters(kwargs, live=False)
 
-        results = self.db.advanced_search_mickey(**kwargs)
-        self.populate_table(results)
+    def live_filter(self):
+        try:
+            kwargs = self.filter_kwargs()
+        except ValueError:
+            # Half-typed input ("2000-") keeps the rows of the last complete filters.
+            return
+        self.run_filters(kwargs, live=True)
+
+    def run_filters(self, kwargs, live):
+        # The page is read on the reader connection, so pending edits must be written first.
+        self.flush_edits()
+        on_error = None
+        if not live:
+            on_error = lambda msg: QMessageBox.critical(self, "Error", f"Filtering failed: {msg}")
+        self.live.submit(
+            self.db.db_path,
+            self.model.page_job(**kwargs),
+            on_result=lambda page: self.model.show_page(page, **kwargs),
+            on_error=on_error,
+        )
 
     def show_missing_dialog(self, missing):
         dlg = QDialog(self)
@@ -232,7 +265,7 @@ class MickeyTab(QWidget):
         scroll_layout = QVBoxLayout()
         text = QTextEdit()
         text.setReadOnly(True)
-        text.setPlainText(", ".join(map(str, missing)) if missing else "No missing issues found.")
+        text.setPlainText(self.format_missing(missing))
         scroll_layout.addWidget(text)
         content.setLayout(scroll_layout)
         scroll.setWidget(content)
@@ -241,6 +274,18 @@ class MickeyTab(QWidget):
         dlg.setLayout(layout)
         dlg.exec()
 
+    @staticmethod
+    def format_missing(missing):
+        if not missing:
+            return "No missing issues found."
+        if isinstance(missing, dict):
+            total = sum(filters.count_in_ranges(gaps) for gaps in missing.values())
+            lines = [f"Vol {vol}: {filters.format_ranges(gaps)}" for vol, gaps in missing.items()]
+        else:
+            total = filters.count_in_ranges(missing)
+            lines = [filters.format_ranges(missing)]
+        return f"{total} missing issues\n\n" + "\n".join(lines)
+
     def clear_filters(self):
         self.issue_input.clear()
         self.vol_input.clear()
@@ -249,15 +294,5 @@ class MickeyTab(QWidget):
         self.year_range_input.clear()
         self.issue_range_input.clear()
         self.exclude_range_input.clear()
+        self.per_volume_check.setChecked(False)
         self.refresh_table()
-
-    def get_visible_rows(self):
-        rows = []
-        for i in range(self.table.rowCount()):
-            rows.append({
-                "issue_num": int(self.table.item(i, 1).text()),
-                "vol_num": int(self.table.item(i, 2).text()),
-                "mainstory": self.table.item(i, 3).text(),
-                "year": int(self.table.item(i, 4).text())
-            })
-        return rows
@@ -0,0 +1,94 @@
+import time
+from pathlib import Path
+from PySide6.QtCore import QObject, QSettings, QTimer, Signal
+from services import backup
+from ui.workers import run_in_background
+
+# Delay before the catch-up snapshot taken at startup when the last one is overdue.
+STARTUP_DELAY_MS = 5000
+
+
+class SnapshotSettings:
+    """Automatic snapshot options, persisted with QSettings."""
+
+    def __init__(self, enabled=False, directory="", interval_hours=24, keep=backup.SNAPSHOT_KEEP, compress=True):
+        self.enabled = enabled
+        self.directory = directory
+        self.interval_hours = interval_hours
+        self.keep = keep
+        self.compress = compress
+
+    @classmethod
+    def load(cls, settings=None):
+        settings = settings or QSettings("ComicAnalytics", "ComicAnalytics")
+        return cls(
+            enabled=settings.value("snapshots/enabled", False, type=bool),
+            directory=settings.value("snapshots/directory", "", type=str),
+            interval_hours=settings.value("snapshots/interval_hours", 24, type=float),
+            keep=settings.value("snapshots/keep", backup.SNAPSHOT_KEEP, type=int),
+            compress=settings.value("snapshots/compress", True, type=bool),
+        )
+
+    def save(self, settings=None):
+        settings = settings or QSettings("ComicAnalytics", "ComicAnalytics")
+        settings.setValue("snapshots/enabled", self.enabled)
+        settings.setValue("snapshots/directory", self.directory)
+        settings.setValue("snapshots/interval_hours", self.interval_hours)
+        settings.setValue("snapshots/keep", self.keep)
+        settings.setValue("snapshots/compress", self.compress)
+
+
+class SnapshotScheduler(QObject):
+    """
+    Takes rotating snapshots of the main window's current database every
+    interval_hours on a worker thread. A snapshot that is already overdue
+    when the scheduler starts is taken shortly after startup.
+    """
+    snapshot_taken = Signal(str)
+    failed = Signal(str)
+
+    def __init__(self, main_window, settings=None):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.settings = settings or SnapshotSettings.load()
+        self.task = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.take_snapshot)
+
+    def directory(self):
+        if self.settings.directory:
+            return Path(self.settings.directory)
+        return Path(self.main_window.db.db_path).parent / "snapshots"
+
+    def apply(self, settings):
+        settings.save()
+        self.settings = settings
+        self.start()
+
+    def start(self):
+        self.timer.stop()
+        if not self.settings.enabled:
+            return
+        interval_ms = int(self.settings.interval_hours * 3600 * 1000)
+        self.timer.start(max(interval_ms, 60_000))
+        snapshots = backup.list_snapshots(self.directory(), self.main_window.db.db_path)
+        newest = snapshots[-1].stat().st_mtime if snapshots else 0
+        if time.time() - newest >= self.settings.interval_hours * 3600:
+            QTimer.singleShot(STARTUP_DELAY_MS, self.take_snapshot)
+
+    def take_snapshot(self):
+        if self.task is not None:
+            return
+        directory, keep, compress = self.directory(), self.settings.keep, self.settings.compress
+
+        def job(db, progress):
+            return str(backup.take_snapshot(db, directory, keep=keep, compress=compress, progress=progress))
+
+        def finished():
+            self.task = None
+
+        self.task = run_in_background(
+            self.main_window.db.db_path, job,
+            on_result=self.snapshot_taken.emit, on_error=self.failed.emit,
+        )
+        self.task.signals.finished.connect(finished)
@@ -0,0 +1,113 @@
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox
+)
+from PySide6.QtCore import Qt
+from database.db_manager import DBManager
+from ui.workers import run_in_background
+
+# (label, table, stats key)
+BREAKDOWNS = [
+    ("Mickey per year", "mickey", "by_year"),
+    ("Mickey per volume", "mickey", "by_volume"),
+    ("Superheroes per category", "superheroes", "by_category"),
+    ("Superheroes per publisher", "superheroes", "by_publisher"),
+    ("Superheroes per writer", "superheroes", "by_writer"),
+    ("Superheroes per story year", "superheroes", "by_year"),
+    ("Arkas per series", "arkas", "by_series"),
+    ("Arkas per year", "arkas", "by_year"),
+]
+
+
+class CountItem(QTableWidgetItem):
+    """Sorts numerically instead of by text."""
+
+    def __init__(self, count):
+        super().__init__(str(count))
+        self.setData(Qt.UserRole, count)
+
+    def __lt__(self, other):
+        return self.data(Qt.UserRole) < other.data(Qt.UserRole)
+
+
+class StatsTab(QWidget):
+    """Collection statistics, read from the summary tables DBManager keeps up to date."""
+
+    def __init__(self, db: DBManager, main_window=None):
+        super().__init__()
+        self.db = db
+        self.main_window = main_window
+        self.stats = None
+
+        layout = QVBoxLayout(self)
+        self.setLayout(layout)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        top_layout = QHBoxLayout()
+        top_layout.addWidget(QLabel("Breakdown"))
+        self.breakdown_combo = QComboBox()
+        for label, _, _ in BREAKDOWNS:
+            self.breakdown_combo.addItem(label)
+        self.breakdown_combo.currentIndexChanged.connect(self.show_breakdown)
+        top_layout.addWidget(self.breakdown_combo, 1)
+
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh_table)
+        self.rebuild_btn = QPushButton("Rebuild")
+        self.rebuild_btn.setToolTip("Recount everything from the collection tables")
+        self.rebuild_btn.clicked.connect(self.rebuild)
+        top_layout.addWidget(refresh_btn)
+        top_layout.addWidget(self.rebuild_btn)
+        layout.addLayout(top_layout)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(2)
+        self.table.setHorizontalHeaderLabels(["Value", "Count"])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setSortingEnabled(True)
+        layout.addWidget(self.table)
+
+    def refresh_table(self):
+        self.stats = self.db.stats()
+        mickey = self.stats["mickey"]
+        years = ""
+        if mickey["first_year"] is not None:
+            years = f", {mickey['first_year']}-{mickey['last_year']}"
+        text = (
+            f"Mickey: {mickey['total']} issues in {mickey['volumes']} volumes{years}    "
+            f"Superheroes: {self.stats['superheroes']['total']}    "
+            f"Arkas: {self.stats['arkas']['total']}"
+        )
+        if self.stats["deferred"]:
+            text += "\n(counts are paused while a bulk import runs)"
+        self.summary_label.setText(text)
+        self.show_breakdown()
+
+    def show_breakdown(self):
+        if self.stats is None:
+            return
+        _, table, key = BREAKDOWNS[self.breakdown_combo.currentIndex()]
+        counts = self.stats[table][key]
+        self.table.setSortingEnabled(False)
+        self.table.clearContents()
+        self.table.setRowCount(len(counts))
+        for r_idx, (value, count) in enumerate(counts.items()):
+            self.table.setItem(r_idx, 0, QTableWidgetItem("(none)" if value is None else str(value)))
+            self.table.setItem(r_idx, 1, CountItem(count))
+        self.table.setSortingEnabled(True)
+
+    def rebuild(self):
+        self.rebuild_btn.setEnabled(False)
+
+        def done(_):
+            self.rebuild_btn.setEnabled(True)
+            self.refresh_table()
+
+        def failed(message):
+            self.rebuild_btn.setEnabled(True)
+            QMessageBox.critical(self, "Error", f"Failed to rebuild statistics: {message}")
+
+        run_in_background(self.db.db_path, lambda db, progress: db.refresh_stats(), done, failed)
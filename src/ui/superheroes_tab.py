@@ -1,10 +1,14 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QTabWidget, QTableWidget, QTableWidgetItem,
-    QHBoxLayout, QPushButton, QLabel, QLineEdit, QGroupBox, QMessageBox, QHeaderView
+    QWidget, QVBoxLayout, QTabWidget, QTableView,
+    QHBoxLayout, QPushButton, QLabel, QLineEdit, QGroupBox, QMessageBox, QHeaderView,
+    QAbstractItemView
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QTimer
 from database.db_manager import DBManager
-from ui.dialogs import AddSuperheroesDialog
+from ui.dialogs import AddSuperheroesDialog, BulkEditDialog
+from ui.completion import SuggestionCompleter
+from ui.table_models import SuperheroTableModel, selected_rows
+from ui.live_filter import LiveFilter
 
 
 class CategoryTable(QWidget):
@@ -17,21 +21,22 @@ class CategoryTable(QWidget):
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([
-            "#", "Title", "Writer", "Artist", "Collection", "Publisher",
-            "Issues", "Main Character", "Event", "Story Year"
-        ])
+        self.model = SuperheroTableModel(self.db, self.category, self)
+        self.model.error.connect(lambda msg: QMessageBox.critical(self, "Error", msg))
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.table.setAlternatingRowColors(True)
         self.table.setSortingEnabled(True)
         self.table.verticalHeader().setVisible(False)
-        self.table.itemChanged.connect(self.on_item_changed)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.layout.addWidget(self.table)
 
-        self.refresh_table()
+        # Created as a placeholder: nothing is queried until the tab is first shown.
+        self.filters = {}
+        self.stale = True
 
     def apply_theme_to_table(self):
         if not self.main_window:
@@ -39,7 +44,7 @@ class CategoryTable(QWidget):
         dark = getattr(self.main_window, "dark_mode", False)
         if dark:
             style = """
-            QTableWidget {
+            QTableView {
                 background-color: #1e1e1e;
                 alternate-background-color: #2b2b2b;
                 color: #ffffff;
@@ -56,7 +61,7 @@ class CategoryTable(QWidget):
             """
         else:
             style = """
-            QTableWidget {
+            QTableView {
                 background-color: #ffffff;
                 alternate-background-color: #f5f5f5;
                 color: #000000;
@@ -73,115 +78,60 @@ class CategoryTable(QWidget):
             """
         self.table.setStyleSheet(style)
 
-    def populate_table(self, rows):
-        self.table.blockSignals(True)
-        self.table.setSortingEnabled(False)
-        self.table.setRowCount(len(rows))
-
-        for i, row in enumerate(rows):
-            idx_item = QTableWidgetItem()
-            idx_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            idx_item.setData(Qt.DisplayRole, i + 1)
-            self.table.setItem(i, 0, idx_item)
-
-            columns = ["title", "writer", "artist", "collection", "publisher", "issues", "main_character"]
-            for col, key in enumerate(columns, start=1):
-                item = QTableWidgetItem(row[key] if row[key] is not None else "")
-                # Βάζουμε το id στο πρώτο editable κελί (title)
-                if col == 1:
-                    item.setData(Qt.UserRole, row["id"])
-                self.table.setItem(i, col, item)
-
-            event_item = QTableWidgetItem("Yes" if row["event"] else "No")
-            self.table.setItem(i, 8, event_item)
-
-            year_item = QTableWidgetItem()
-            year_item.setData(Qt.DisplayRole, row["story_year"] if row["story_year"] else 0)
-            self.table.setItem(i, 9, year_item)
-
-        self.table.blockSignals(False)
-        self.apply_theme_to_table()
-        self.table.setSortingEnabled(True)
-
     def refresh_table(self, filters: dict = None):
-        if filters is None:
-            filters = {}
-        filters["category"] = self.category
-        rows = self.db.advanced_search_superheroes(**filters)
-        self.populate_table(rows)
-
-    def on_item_changed(self, item):
-        if item.column() == 0:
-            return
-        row = item.row()
+        if filters is not None:
+            self.filters = dict(filters)
+        self.model.db = self.db
+        self.model.set_filters(**self.filters)
+        self.stale = False
+        self.apply_theme_to_table()
 
-        try:
-            comic_id = self.table.item(row, 1).data(Qt.UserRole)
-            if not comic_id:
-                return
-
-            title = self.table.item(row, 1).text()
-            writer = self.table.item(row, 2).text()
-            artist = self.table.item(row, 3).text()
-            collection = self.table.item(row, 4).text()
-            publisher = self.table.item(row, 5).text()
-            issues = self.table.item(row, 6).text()
-            main_character = self.table.item(row, 7).text()
-            event_text = self.table.item(row, 8).text().lower()
-            story_year_text = self.table.item(row, 9).text()
-
-            event_bool = event_text in ("yes", "true", "1")
-            story_year = int(story_year_text) if story_year_text.isdigit() else None
-            self.db.update_superhero(
-                comic_id, title, writer, artist, collection, publisher,
-                issues, main_character, event_bool, story_year, self.category
-            )
+    def invalidate(self, filters: dict = None):
+        if filters is not None:
+            self.filters = dict(filters)
+        self.stale = True
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to update comic: {e}")
-            print("Update error:", e)
+    def ensure_loaded(self):
+        if self.stale:
+            self.refresh_table()
 
     def add_superhero_comic(self):
-        dialog = AddSuperheroesDialog(self.db, main_window=self.main_window)
-        if dialog.exec():
-            self.parent_tab.refresh_categories()
-            self.parent_tab.select_category_tab(self.category)
+        # The new row reaches the models through DBManager's change notification;
+        # a new category gets its tab from SuperheroesTab.on_db_change.
+        AddSuperheroesDialog(self.db, main_window=self.main_window).exec()
 
     def delete_selected(self):
-        row = self.table.currentRow()
-        if row >= 0:
-            comic_id = self.table.item(row, 1).data(Qt.UserRole)
-            if not comic_id:
-                return
-            self.db.delete_superhero(comic_id)
-            QMessageBox.information(self, "Deleted", "Comic deleted successfully!")
-            self.refresh_table()
+        rows = selected_rows(self.table)
+        if not rows:
+            return
+        self.model.flush()
+        ids = [row["id"] for row in rows]
+        try:
+            self.db.delete_many_superheroes(ids)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to delete comics: {e}")
+            return
+        QMessageBox.information(self, "Deleted", f"{len(ids)} comic(s) deleted successfully!")
+
+    def edit_selected(self):
+        rows = selected_rows(self.table)
+        if not rows:
+            QMessageBox.warning(self, "No Selection", "Please select comics to edit.")
+            return
+        def coerce(key, value):
+            return value.strip() if key == "category" else self.model.coerce(key, value)
 
-    def get_visible_rows(self):
-        rows = []
-        for i in range(self.table.rowCount()):
-            title = self.table.item(i, 1).text()
-            writer = self.table.item(i, 2).text()
-            artist = self.table.item(i, 3).text()
-            collection = self.table.item(i, 4).text()
-            publisher = self.table.item(i, 5).text()
-            issues = self.table.item(i, 6).text()
-            main_character = self.table.item(i, 7).text()
-            event = self.table.item(i, 8).text().lower() in ("yes", "true", "1")
-            story_year = int(self.table.item(i, 9).text())
-            rows.append({
-                "title": title,
-                "writer": writer,
-                "artist": artist,
-                "collection": collection,
-                "publisher": publisher,
-                "issues": issues,
-                "main_character": main_character,
-                "event": event,
-                "story_year": story_year,
-                "category": self.category
-            })
-        return rows
+        dialog = BulkEditDialog(self.model.editable_columns() + [("Category", "category")], len(rows),
+                                main_window=self.main_window, coerce=coerce)
+        if not dialog.exec():
+            return
+        self.model.flush()
+        ids = [row["id"] for row in rows]
+        changes = {dialog.column: dialog.value}
+        try:
+            self.db.update_many_superheroes(ids, **changes)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to update comics: {e}")
 
 class SuperheroesTab(QWidget):
     def __init__(self, db: DBManager, main_window=None):
@@ -224,6 +174,8 @@ class SuperheroesTab(QWidget):
 
         filter_layout.addLayout(top_row_layout)
         filter_layout.addLayout(bottom_row_layout)
+        for key in ("title", "writer", "artist", "collection", "publisher", "main_character"):
+            SuggestionCompleter(self.filter_inputs[key], lambda: self.db, "superheroes", key)
 
         btn_layout = QHBoxLayout()
         apply_btn = QPushButton("Apply Filters"); apply_btn.clicked.connect(self.apply_filters)
@@ -236,24 +188,89 @@ class SuperheroesTab(QWidget):
         layout.addWidget(self.filter_box)
 
         self.tabs = QTabWidget()
+        self.tabs.currentChanged.connect(self.on_category_changed)
         layout.addWidget(self.tabs)
         self.category_tables = {}
+        self.filters = {}
+        self._subscribed = None
+        self.prefetch_neighbours = True
+        self.live = LiveFilter(self, self.live_filter)
+        self.live.watch(*self.filter_inputs.values())
         self.refresh_categories()
 
         bottom_btn_layout = QHBoxLayout()
         add_btn = QPushButton("➕ Add Superhero Comic"); add_btn.clicked.connect(self.add_comic_current_tab)
+        edit_btn = QPushButton("✏️ Edit Selected"); edit_btn.clicked.connect(self.edit_current_tab)
         del_btn = QPushButton("🗑️ Delete Selected"); del_btn.clicked.connect(self.delete_current_tab)
-        bottom_btn_layout.addWidget(add_btn); bottom_btn_layout.addWidget(del_btn)
+        bottom_btn_layout.addWidget(add_btn); bottom_btn_layout.addWidget(edit_btn); bottom_btn_layout.addWidget(del_btn)
         layout.addLayout(bottom_btn_layout)
 
+    def flush_edits(self):
+        failures = {}
+        for cat_table in self.category_tables.values():
+            failures.update(cat_table.model.flush())
+        return failures
+
     def refresh_categories(self):
+        self.live.cancel()
+        self.flush_edits()
+        if self._subscribed is not self.db:
+            if self._subscribed is not None:
+                self._subscribed.unsubscribe(self.on_db_change)
+            self.db.subscribe(self.on_db_change)
+            self._subscribed = self.db
         categories = self.db.get_superhero_categories()
+        self.tabs.blockSignals(True)
         self.tabs.clear()
+        for cat_table in self.category_tables.values():
+            cat_table.model.detach()
         self.category_tables = {}
         for cat in categories:
-            table_widget = CategoryTable(self.db, category=cat, parent_tab=self, main_window=self.main_window)
-            self.category_tables[cat] = table_widget
-            self.tabs.addTab(table_widget, cat)
+            self.add_category_tab(cat)
+        self.tabs.blockSignals(False)
+        self.on_category_changed(self.tabs.currentIndex())
+
+    def add_category_tab(self, category):
+        table_widget = CategoryTable(self.db, category=category, parent_tab=self, main_window=self.main_window)
+        table_widget.invalidate(self.filters)
+        self.category_tables[category] = table_widget
+        self.tabs.addTab(table_widget, category)
+        return table_widget
+
+    def sync_categories(self):
+        """Adds tabs for categories that appeared since the tabs were built; existing tabs are kept."""
+        for cat in self.db.get_superhero_categories():
+            if cat not in self.category_tables:
+                self.add_category_tab(cat)
+
+    def on_db_change(self, table, operation, keys):
+        # Category tables update their own rows; only new categories need a tab here.
+        if table == "superheroes" and operation != "delete":
+            self.sync_categories()
+
+    def on_category_changed(self, index):
+        self.flush_edits()
+        current = self.tabs.widget(index)
+        if current is None:
+            return
+        current.ensure_loaded()
+        if self.prefetch_neighbours:
+            QTimer.singleShot(0, lambda: self.prefetch_around(index))
+
+    def prefetch_around(self, index):
+        # Runs from the event loop once the activated tab has been painted.
+        if self.tabs.currentIndex() != index:
+            return
+        for neighbour in (index + 1, index - 1):
+            widget = self.tabs.widget(neighbour)
+            if widget is not None:
+                widget.ensure_loaded()
+
+    def invalidate_categories(self):
+        """Marks every category stale and only re-queries the visible one."""
+        for cat_table in self.category_tables.values():
+            cat_table.invalidate(self.filters)
+        self.on_category_changed(self.tabs.currentIndex())
 
     def select_category_tab(self, category):
         for i in range(self.tabs.count()):
@@ -261,7 +278,8 @@ class SuperheroesTab(QWidget):
                 self.tabs.setCurrentIndex(i)
                 break
 
-    def apply_filters(self):
+    def filter_kwargs(self):
+        """The filters typed so far. raises ValueError with a message for the user."""
         filters = {}
         for key, le in self.filter_inputs.items():
             if le.text():
@@ -270,26 +288,75 @@ class SuperheroesTab(QWidget):
                 elif key == "year_range":
                     try:
                         start, end = map(int, le.text().split("-"))
-                        filters["year_range"] = (start, end)
-                    except:
-                        QMessageBox.warning(self, "Error", "Invalid year range format (start-end)")
-                        return
+                    except ValueError:
+                        raise ValueError("Invalid year range format (start-end)") from None
+                    filters["year_range"] = (start, end)
+                elif key == "title":
+                    filters["title_text"] = le.text()
                 else:
                     filters[key] = le.text()
+        return filters
+
+    def apply_filters(self):
+        try:
+            filters = self.filter_kwargs()
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        self.run_filters(filters, live=False)
+
+    def live_filter(self):
+        try:
+            filters = self.filter_kwargs()
+        except ValueError:
+            # Half-typed input ("2000-") keeps the rows of the last complete filters.
+            return
+        self.run_filters(filters, live=True)
+
+    def run_filters(self, filters, live):
+        self.filters = filters
+        # The search runs on the reader connection, so pending edits must be written first.
+        self.flush_edits()
+        if not filters:
+            self.live.cancel()
+            self.invalidate_categories()
+            return
+        # Only the visible category reads its first page, off the GUI thread; the other
+        # tabs keep the filters and page them in when they are shown.
         for cat_table in self.category_tables.values():
-            cat_table.refresh_table(filters)
+            cat_table.invalidate(filters)
+        current = self.tabs.currentWidget()
+        if current is None:
+            return
+        current.stale = False
+        on_error = None
+        if not live:
+            on_error = lambda msg: QMessageBox.critical(self, "Error", f"Filtering failed: {msg}")
+        model = current.model
+        self.live.submit(
+            self.db.db_path,
+            model.page_job(**filters),
+            on_result=lambda page: model.show_page(page, **filters),
+            on_error=on_error,
+        )
 
     def clear_filters(self):
         for le in self.filter_inputs.values():
             le.clear()
-        for cat_table in self.category_tables.values():
-            cat_table.refresh_table()
+        self.filters = {}
+        self.live.cancel()
+        self.invalidate_categories()
 
     def add_comic_current_tab(self):
         current_tab = self.tabs.currentWidget()
         if current_tab:
             current_tab.add_superhero_comic()
 
+    def edit_current_tab(self):
+        current_tab = self.tabs.currentWidget()
+        if current_tab:
+            current_tab.edit_selected()
+
     def delete_current_tab(self):
         current_tab = self.tabs.currentWidget()
         if current_tab:
@@ -0,0 +1,412 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, Signal
+from database import models
+from services import filters as search_filters
+
+
+def _to_int(text):
+    """Blank clears the value (None); anything else must be a whole number."""
+    text = str(text).strip()
+    if not text:
+        return None
+    if not text.lstrip("-").isdigit():
+        raise ValueError(f"'{text}' is not a whole number")
+    return int(text)
+
+
+def _to_bool(text):
+    return str(text).strip().lower() in ("yes", "true", "1")
+
+
+def _order_value(value):
+    """Python sort key matching SQLite's ORDER BY: NULL < numbers < text < blobs."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, bytes(value))
+
+
+def selected_rows(view):
+    """Rows of a view over a PagedTableModel that have a selected cell, in display order."""
+    model = view.model()
+    positions = sorted({index.row() for index in view.selectionModel().selectedIndexes()})
+    return [model.row_at(position) for position in positions]
+
+
+class PagedTableModel(QAbstractTableModel):
+    """
+    Table model that pulls rows from DBManager one page at a time while
+    the view scrolls (canFetchMore / fetchMore), so only the rows that
+    have been reached are ever held in memory. Header clicks re-query with
+    ORDER BY, and each page continues from the last loaded row (keyset
+    pagination) rather than an OFFSET.
+
+    Cell edits are shown immediately but buffered per row key, keeping only
+    the changed columns, and written together by flush() once editing has
+    been idle for flush_delay_ms (or before any reload).
+
+    Once loaded, the model follows DBManager change notifications: inserted,
+    updated and deleted rows are placed, patched or removed among the loaded
+    rows instead of reloading the view.
+    """
+    page_size = 200
+    flush_delay_ms = 1000
+    # Keys per query when re-reading notified rows (SQLite variable limit).
+    lookup_chunk = 500
+    table = None
+    # (header, row key, kind, editable); the "#" column has key None
+    columns = []
+
+    error = Signal(str)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.filters = {}
+        self.order_by = None
+        self.descending = False
+        self._rows = []
+        # Nothing is fetched until the first set_filters()/reload().
+        self._exhausted = True
+        # row key -> {column: value} not yet written, and the rows as loaded
+        self._pending = {}
+        self._originals = {}
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self.flush)
+        self._subscribed = None
+
+    # -------------------- Overridden per table --------------------
+    def query(self, db, **kwargs):
+        raise NotImplementedError
+
+    def row_key(self, row):
+        return tuple(row[column] for column in models.KEY_COLUMNS[self.table])
+
+    # -------------------- Loading --------------------
+    def set_filters(self, **filters):
+        self.filters = filters
+        self.reload()
+
+    def reload(self):
+        self.flush()
+        self.attach()
+        self.beginResetModel()
+        self._rows = []
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def search(self, **kwargs):
+        return self.query(self.db, **kwargs)
+
+    def page_job(self, **filters):
+        """
+        job(db) reading the first page for filters on another connection (see
+        ReaderConnection); pass its result to show_page().
+        """
+        state = (self.order_by, self.descending, self.db.cache.generation(self.table))
+        order_by, descending, limit = self.order_by, self.descending, self.page_size
+
+        def job(db):
+            return state, self.query(db, order_by=order_by, descending=descending, limit=limit, **filters)
+        return job
+
+    def show_page(self, page, **filters):
+        """Shows the first page read by page_job(); later pages are fetched as the view scrolls."""
+        state, rows = page
+        self.flush()
+        if state != (self.order_by, self.descending, self.db.cache.generation(self.table)):
+            # Re-sorted, or written through this connection, while the page was read.
+            self.set_filters(**filters)
+            return
+        self.attach()
+        self.filters = filters
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._exhausted = len(rows) < self.page_size
+        self.endResetModel()
+
+    def set_rows(self, rows, **filters):
+        """Shows rows that were already fetched elsewhere; nothing more is paged in."""
+        self.flush()
+        self.attach()
+        self.filters = filters
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._exhausted = True
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        after = self._sort_values(self._rows[-1]) if self._rows else None
+        rows = self.search(
+            order_by=self.order_by, descending=self.descending,
+            limit=self.page_size, after=after, **self.filters
+        )
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def row_at(self, row):
+        return self._rows[row]
+
+    def editable_columns(self):
+        """(header, key) of the columns that can be edited."""
+        return [(header, key) for header, key, _, editable in self.columns if editable]
+
+    def coerce(self, key, value):
+        """The column's stored form of an edited value. raises ValueError if it has none."""
+        kind = next(kind for _, column, kind, _ in self.columns if column == key)
+        if kind == "int":
+            return _to_int(value)
+        if kind == "bool":
+            return _to_bool(value)
+        return value
+
+    def remove_rows(self, keys):
+        """Drops the rows with these keys from the view without re-querying."""
+        keys = set(keys)
+        for row_key in keys:
+            self._pending.pop(row_key, None)
+            self._originals.pop(row_key, None)
+        positions = [i for i, row in enumerate(self._rows) if self.row_key(row) in keys]
+        # Remove contiguous runs from the bottom up so earlier positions stay valid.
+        while positions:
+            last = first = positions.pop()
+            while positions and positions[-1] == first - 1:
+                first = positions.pop()
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._rows[first:last + 1]
+            self.endRemoveRows()
+
+    # -------------------- Change notifications --------------------
+    def attach(self):
+        """Follows changes made through self.db (again after the tab swapped databases)."""
+        if self._subscribed is self.db:
+            return
+        self.detach()
+        self.db.subscribe(self.on_db_change)
+        self._subscribed = self.db
+
+    def detach(self):
+        if self._subscribed is not None:
+            self._subscribed.unsubscribe(self.on_db_change)
+            self._subscribed = None
+
+    def on_db_change(self, table, operation, keys):
+        if table != self.table:
+            return
+        self.flush()
+        if keys is None:
+            self.reload()
+        elif operation == "delete":
+            self.remove_rows(keys)
+        else:
+            self._merge_rows(keys)
+
+    def _merge_rows(self, keys):
+        """
+        Re-reads the rows with these keys through the current filters: rows that
+        no longer match are removed, the rest are patched in place or, if their
+        sort value changed or they are new, placed where the next page query
+        would have put them.
+        """
+        keys = list(dict.fromkeys(tuple(key) for key in keys))
+        fresh = {}
+        for start in range(0, len(keys), self.lookup_chunk):
+            for row in self.search(keys=keys[start:start + self.lookup_chunk], **self.filters):
+                fresh[self.row_key(row)] = row
+        moved = [key for key in keys if key not in fresh]
+        positions = {self.row_key(row): i for i, row in enumerate(self._rows)}
+        placing = []
+        for row_key, row in fresh.items():
+            position = positions.get(row_key)
+            if position is None:
+                placing.append(row)
+            elif self.order_by is None or self._rows[position][self.order_by] == row[self.order_by]:
+                self._rows[position] = row
+                self.dataChanged.emit(self.index(position, 0), self.index(position, len(self.columns) - 1))
+            else:
+                moved.append(row_key)
+                placing.append(row)
+        self.remove_rows(moved)
+        for row in placing:
+            position = self._position(row)
+            if position is None:
+                # Sorts after the loaded rows; fetchMore will page it in.
+                continue
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._rows.insert(position, row)
+            self.endInsertRows()
+
+    def _sort_values(self, row):
+        """The row's values of the page ORDER BY columns: sort column, then the table key."""
+        columns = search_filters.sort_columns(self.order_by, models.KEY_COLUMNS[self.table])
+        return tuple(row[column] for column in columns)
+
+    def _position(self, row):
+        """Index for row among the loaded rows, or None if it belongs to a page not fetched yet."""
+        key = tuple(map(_order_value, self._sort_values(row)))
+        low, high = 0, len(self._rows)
+        while low < high:
+            middle = (low + high) // 2
+            other = tuple(map(_order_value, self._sort_values(self._rows[middle])))
+            if (other > key) if self.descending else (other < key):
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(self._rows) and not self._exhausted:
+            return None
+        return low
+
+    # -------------------- Qt model interface --------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        if self.columns[index.column()][3]:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        _, key, kind, _ = self.columns[index.column()]
+        if key is None:
+            return index.row() + 1
+        value = self._rows[index.row()][key]
+        if kind == "bool":
+            return "Yes" if value else "No"
+        return "" if value is None else value
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        header, key, _, editable = self.columns[index.column()]
+        if not editable:
+            return False
+        try:
+            value = self.coerce(key, value)
+        except ValueError as e:
+            self.error.emit(f"{header}: {e}")
+            return False
+
+        row = dict(self._rows[index.row()])
+        if row[key] == value:
+            return True
+        row_key = self.row_key(row)
+        self._originals.setdefault(row_key, self._rows[index.row()])
+        self._pending.setdefault(row_key, {})[key] = value
+        row[key] = value
+        self._rows[index.row()] = row
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        self._flush_timer.start(self.flush_delay_ms)
+        return True
+
+    def has_pending_edits(self):
+        return bool(self._pending)
+
+    def flush(self):
+        """Writes the buffered edits in one transaction; failed rows are reverted and reported."""
+        self._flush_timer.stop()
+        if not self._pending:
+            return {}
+        pending, originals = self._pending, self._originals
+        self._pending, self._originals = {}, {}
+        try:
+            failures = self.db.apply_edits(self.table, pending)
+        except Exception as e:
+            failures = {row_key: str(e) for row_key in pending}
+        if failures:
+            self._revert(failures, originals)
+            lines = [f"{', '.join(map(str, row_key))}: {message}" for row_key, message in failures.items()]
+            self.error.emit(f"Failed to update {len(failures)} comic(s):\n" + "\n".join(lines))
+        return failures
+
+    def _revert(self, failures, originals):
+        for position, row in enumerate(self._rows):
+            row_key = self.row_key(row)
+            if row_key in failures:
+                self._rows[position] = originals[row_key]
+                self.dataChanged.emit(self.index(position, 0), self.index(position, len(self.columns) - 1))
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        key = self.columns[column][1]
+        if key is None:
+            return
+        self.order_by = key
+        self.descending = order == Qt.DescendingOrder
+        self.reload()
+
+
+class MickeyTableModel(PagedTableModel):
+    table = "mickey"
+    columns = [
+        ("#", None, "int", False),
+        ("Issue num", "issue_num", "int", False),
+        ("Vol num", "vol_num", "int", False),
+        ("Main Story", "mainstory", "str", True),
+        ("Year", "year", "int", True),
+    ]
+
+    def query(self, db, **kwargs):
+        return db.advanced_search_mickey(**kwargs)
+
+
+class SuperheroTableModel(PagedTableModel):
+    table = "superheroes"
+    columns = [
+        ("#", None, "int", False),
+        ("Title", "title", "str", True),
+        ("Writer", "writer", "str", True),
+        ("Artist", "artist", "str", True),
+        ("Collection", "collection", "str", True),
+        ("Publisher", "publisher", "str", True),
+        ("Issues", "issues", "str", True),
+        ("Main Character", "main_character", "str", True),
+        ("Event", "event", "bool", True),
+        ("Story Year", "story_year", "int", True),
+    ]
+
+    def __init__(self, db, category, parent=None):
+        super().__init__(db, parent)
+        self.category = category
+
+    def query(self, db, **kwargs):
+        return db.advanced_search_superheroes(category=self.category, **kwargs)
+
+
+class ArkasTableModel(PagedTableModel):
+    table = "arkas"
+    columns = [
+        ("#", None, "int", False),
+        ("Story Name", "story_name", "str", True),
+        ("Series Name", "series_name", "str", True),
+        ("Year", "year", "int", True),
+    ]
+
+    def query(self, db, **kwargs):
+        return db.advanced_search_arkas(**kwargs)
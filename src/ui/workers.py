@@ -0,0 +1,188 @@
+import queue
+import threading
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from database.db_manager import DBManager
+
+# Keeps running tasks (and their signal objects) alive until they finish.
+_active_tasks = set()
+
+
+class TaskSignals(QObject):
+    progress = Signal(int, int)
+    result = Signal(object)
+    error = Signal(str)
+    cancelled = Signal()
+    finished = Signal()
+
+
+class DBTask(QRunnable):
+    """
+    Runs job(db, progress) on a QThreadPool thread with its own DBManager
+    connection, so the GUI thread never waits on SQLite. progress(done, total)
+    is forwarded as a signal (total 0 means unknown). cancel() stops the
+    running statement through the connection's progress handler/interrupt.
+    """
+
+    def __init__(self, db_path, job):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.db_path = db_path
+        self.job = job
+        self.signals = TaskSignals()
+        self._cancelled = False
+        self._db = None
+        self._lock = threading.Lock()
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        self._cancelled = True
+        with self._lock:
+            if self._db is not None:
+                self._db.interrupt()
+
+    def _report_progress(self, done, total=0):
+        self.signals.progress.emit(done, total)
+
+    def run(self):
+        try:
+            if self._cancelled:
+                self.signals.cancelled.emit()
+                return
+            db = DBManager(self.db_path)
+            with self._lock:
+                self._db = db
+            db.set_cancel_check(self.is_cancelled)
+            try:
+                result = self.job(db, self._report_progress)
+            finally:
+                with self._lock:
+                    self._db = None
+                db.close()
+        except Exception as e:
+            if self._cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.error.emit(str(e))
+        else:
+            if self._cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+def run_in_background(db_path, job, on_result=None, on_error=None, on_progress=None, on_cancelled=None):
+    """Queues job(db, progress) on the global thread pool. returns the DBTask."""
+    task = DBTask(db_path, job)
+    if on_result is not None:
+        task.signals.result.connect(on_result)
+    if on_error is not None:
+        task.signals.error.connect(on_error)
+    if on_progress is not None:
+        task.signals.progress.connect(on_progress)
+    if on_cancelled is not None:
+        task.signals.cancelled.connect(on_cancelled)
+    _active_tasks.add(task)
+    task.signals.finished.connect(lambda: _active_tasks.discard(task))
+    QThreadPool.globalInstance().start(task)
+    return task
+
+
+def wait_for_tasks(msecs=-1):
+    return QThreadPool.globalInstance().waitForDone(msecs)
+
+
+class ReaderSignals(QObject):
+    result = Signal(int, object)
+    error = Signal(int, str)
+
+
+class ReaderConnection:
+    """
+    A long-lived DBManager on its own thread for queries that are re-run
+    while the user types. submit() supersedes everything submitted before
+    it: a running statement is interrupted, a queued job is dropped, and
+    only the newest job's result or error is handed to its callbacks.
+    """
+
+    def __init__(self):
+        self.signals = ReaderSignals()
+        self.signals.result.connect(self._deliver_result)
+        self.signals.error.connect(self._deliver_error)
+        self.generation = 0
+        self._handlers = (None, None)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._db = None
+        self._lock = threading.Lock()
+
+    def submit(self, db_path, job, on_result=None, on_error=None):
+        """Queues job(db) for db_path. returns the job's generation."""
+        self.cancel()
+        self._handlers = (on_result, on_error)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="reader", daemon=True)
+            self._thread.start()
+        self._queue.put((self.generation, db_path, job))
+        return self.generation
+
+    def cancel(self):
+        """Drops the pending job; its result will not be delivered."""
+        self.generation += 1
+        self._handlers = (None, None)
+        with self._lock:
+            if self._db is not None:
+                self._db.interrupt()
+
+    def close(self):
+        """Stops the thread and closes its connection; a later submit() starts a new one."""
+        self.cancel()
+        if self._thread is not None:
+            self._queue.put((self.generation, None, None))
+            self._thread.join()
+            self._thread = None
+
+    def _is_stale(self, generation):
+        return generation != self.generation
+
+    def _run(self):
+        db = None
+        while True:
+            generation, db_path, job = self._queue.get()
+            if job is None:
+                break
+            if self._is_stale(generation):
+                continue
+            try:
+                if db is None or db.db_path != db_path:
+                    if db is not None:
+                        db.close()
+                    db = DBManager(db_path)
+                    with self._lock:
+                        self._db = db
+                # interrupt() only reaches a statement that is already running;
+                # the progress handler also stops the job's later statements.
+                db.set_cancel_check(lambda: self._is_stale(generation))
+                result = job(db)
+            except Exception as e:
+                if not self._is_stale(generation):
+                    self.signals.error.emit(generation, str(e))
+            else:
+                self.signals.result.emit(generation, result)
+        with self._lock:
+            self._db = None
+        if db is not None:
+            db.close()
+
+    def _deliver_result(self, generation, result):
+        on_result = self._handlers[0]
+        if not self._is_stale(generation) and on_result is not None:
+            on_result(result)
+
+    def _deliver_error(self, generation, message):
+        on_error = self._handlers[1]
+        if not self._is_stale(generation) and on_error is not None:
+            on_error(message)
@@ -0,0 +1,63 @@
+import gzip
+import os
+import sqlite3
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from database.db_manager import DBManager
+from services import backup
+
+TEST_DB = "test_backup.db"
+
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB):
+        os.remove(TEST_DB)
+    db = DBManager(db_path=TEST_DB)
+    db.bulk_add_mickey([(i, 1, f"Story {i}", 1990) for i in range(1, 3001)])
+    yield db
+    db.close()
+    if os.path.exists(TEST_DB):
+        os.remove(TEST_DB)
+
+
+def count_mickey(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM mickey").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_backup_in_page_batches_reports_progress(db, tmp_path):
+    steps = []
+    target = backup.backup_to(db, tmp_path / "copy.db", pages=4, progress=lambda done, total: steps.append((done, total)))
+    assert count_mickey(target) == 3000
+    assert len(steps) > 1
+    assert steps[-1][0] == steps[-1][1]
+    assert [p.name for p in tmp_path.iterdir()] == ["copy.db"]
+
+
+def test_compressed_backup_restores(db, tmp_path):
+    target = backup.backup_to(db, tmp_path / "copy.db.gz")
+    with gzip.open(target, "rb") as f:
+        assert f.read(16) == b"SQLite format 3\x00"
+    backup.restore_from(target, tmp_path / "restored.db")
+    assert count_mickey(tmp_path / "restored.db") == 3000
+
+
+def test_cancelled_backup_leaves_no_file(db, tmp_path):
+    db.set_cancel_check(lambda: True)
+    with pytest.raises(sqlite3.OperationalError):
+        backup.backup_to(db, tmp_path / "copy.db", pages=1)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_snapshots_rotate(db, tmp_path):
+    paths = [backup.take_snapshot(db, tmp_path, keep=2, compress=False) for _ in range(3)]
+    assert backup.list_snapshots(tmp_path, db.db_path) == paths[1:]
+    assert count_mickey(paths[-1]) == 3000
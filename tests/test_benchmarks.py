@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from benchmarks import compare, generator
+
+
+def test_generator_is_deterministic():
+    first = list(generator.superhero_rows(50, seed=3))
+    assert first == list(generator.superhero_rows(50, seed=3))
+    assert first != list(generator.superhero_rows(50, seed=4))
+
+
+def test_mickey_rows_have_gaps_and_unique_keys():
+    rows = list(generator.mickey_rows(5000))
+    keys = {(issue, vol) for issue, vol, _, _ in rows}
+    assert len(keys) == len(rows) == 5000
+    volume_one = sorted(issue for issue, vol, _, _ in rows if vol == 1)
+    assert len(volume_one) < generator.ISSUES_PER_VOLUME
+
+
+def test_table_sizes_add_up():
+    assert sum(generator.table_sizes(10_001).values()) == 10_001
+    assert generator.parse_size("100k") == 100_000
+    assert generator.parse_size("2500") == 2500
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"10000": {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}}}}
+    current = {"results": {"10000": {"a": {"median_ms": 11.0}, "b": {"median_ms": 13.0}, "c": {"median_ms": 1.0}}}}
+    rows = compare.compare(baseline, current, threshold=0.2)
+    assert [(name, regressed) for _, name, _, _, _, regressed in rows] == [("a", False), ("b", True)]
@@ -0,0 +1,85 @@
+import os
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from database.cache import QueryCache
+from database.db_manager import DBManager
+
+TEST_DB = "test_cache.db"
+
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB):
+        os.remove(TEST_DB)
+    db = DBManager(db_path=TEST_DB)
+    yield db
+    db.close()
+    if os.path.exists(TEST_DB):
+        os.remove(TEST_DB)
+
+
+def test_repeated_search_is_served_from_cache(db):
+    db.add_mickey(1, 1, "Story", 1990)
+    db.advanced_search_mickey(year=1990)
+    results = db.advanced_search_mickey(year=1990)
+    assert len(results) == 1
+    assert db.cache_stats()["hits"] == 1
+
+
+def test_writes_invalidate_only_their_table(db):
+    db.add_arkas("Ο Κόκκορας", "Ζωo", 1990)
+    db.add_mickey(1, 1, "Story", 1990)
+    assert len(db.search_arkas()) == 1
+    assert len(db.search_mickey()) == 1
+
+    db.add_mickey(2, 1, "Story", 1991)
+    hits = db.cache_stats()["hits"]
+    assert len(db.search_mickey()) == 2
+    assert len(db.search_arkas()) == 1
+    assert db.cache_stats()["hits"] == hits + 1
+
+    db.bulk_add_arkas([("Καλημέρα", "Ζωo", 1991)])
+    assert len(db.search_arkas()) == 2
+
+
+def test_rolled_back_bulk_insert_leaves_no_stale_results(db):
+    db.add_mickey(1, 1, "Story", 1990)
+    seen = []
+
+    def progress(done, total):
+        # Reads the uncommitted rows on the writing connection, then aborts the batch.
+        seen.append(len(db.search_mickey()))
+        raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        db.bulk_add_mickey([(2, 1, "Story", 1991)], progress=progress)
+    assert seen == [2]
+    assert len(db.search_mickey()) == 1
+
+
+def test_commits_from_other_connections_clear_the_cache(db):
+    assert db.get_superhero_categories() == []
+    other = DBManager(db_path=TEST_DB)
+    other.add_superhero("Watchmen", "Alan Moore", "Dave Gibbons", "N/A", "DC", "#1-12",
+                        "Rorschach", False, 1986, "DC")
+    other.close()
+    assert db.get_superhero_categories() == ["DC"]
+
+
+def test_lru_eviction_by_entries_and_rows():
+    cache = QueryCache(capacity=2, max_rows=5)
+    cache.put(cache.key("SELECT 1"), ("t",), [1])
+    cache.put(cache.key("SELECT 2"), ("t",), [2])
+    assert cache.get(cache.key("SELECT  1"), ("t",)) == [1]
+    cache.put(cache.key("SELECT 3"), ("t",), [3])
+    assert cache.get(cache.key("SELECT 2"), ("t",)) is None
+    cache.put(cache.key("SELECT 4"), ("t",), [4, 4, 4, 4])
+    assert cache.stats()["rows"] <= 5
+    cache.put(cache.key("SELECT 5"), ("t",), list(range(6)))
+    assert cache.get(cache.key("SELECT 5"), ("t",)) is None
+    cache.invalidate("t")
+    assert cache.get(cache.key("SELECT 4"), ("t",)) is None
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import cli
+from database.db_manager import DBManager
+
+TEST_DB = "test_cli.db"
+TEST_CSV = "test_cli.csv"
+
+
+@pytest.fixture
+def db():
+    if os.path.exists(TEST_DB):
+        os.remove(TEST_DB)
+    db = DBManager(db_path=TEST_DB)
+    for issue in [1, 2, 5]:
+        db.add_mickey(issue, 1, f"Story {issue}", 1990 + issue)
+    db.add_superhero("Watchmen", "Alan Moore", "Dave Gibbons", "N/A", "DC", "#1-12",
+                     "Rorschach", False, 1986, "DC")
+    yield db
+    db.close()
+    for path in (TEST_DB, TEST_CSV):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def run(*argv):
+    out = io.StringIO()
+    code = cli.main(["--db", TEST_DB, *argv], out=out)
+    return code, out.getvalue()
+
+
+def test_search_json_and_csv(db):
+    code, text = run("search", "mickey", "-f", "year_range=1991-1992", "--order-by", "issue_num", "--desc")
+    assert code == 0
+    assert [row["issue_num"] for row in json.loads(text)] == [2, 1]
+
+    code, text = run("search", "superheroes", "-f", "writer=Alan Moore", "--format", "csv")
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert rows[0]["title"] == "Watchmen"
+
+
+def test_missing_and_stats(db):
+    assert json.loads(run("missing", "1", "6")[1]) == {"ranges": [[3, 4], [6, 6]], "count": 3}
+    stats = json.loads(run("stats")[1])
+    assert stats["mickey"]["total"] == 3
+    assert stats["superheroes"]["by_category"] == {"DC": 1}
+
+
+def test_import_strict_and_export_roundtrip(db):
+    with open(TEST_CSV, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Story Name", "Series Name", "Year"])
+        writer.writerow(["Ο Κόκκορας", "Ζωo", 1990])
+        writer.writerow(["Bad", "Ζωo", "soon"])
+    code, text = run("import", TEST_CSV, "--strict")
+    report = json.loads(text)
+    assert code == 1
+    assert (report["table"], report["imported"], report["failed"]) == ("arkas", 1, 1)
+
+    code, text = run("export", "arkas", TEST_CSV, "-f", "series_name=Ζωo")
+    assert code == 0 and json.loads(text)["written"] == 1
+
+
+def test_bad_filter_is_reported(db, capsys):
+    assert run("search", "mickey", "-f", "year=soon")[0] == 1
+    assert "year needs a number" in capsys.readouterr().err
+
+
+def test_cli_does_not_import_qt(db):
+    code = "import sys, cli; cli.main(['--db', %r, 'stats']); print('PySide6' in sys.modules)" % TEST_DB
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC.parent, capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=str(SRC)))
+    assert result.stdout.strip().endswith("False")
@@ -50,6 +50,38 @@ def test_import_export_mickey(csv_service, db):
     os.remove(export_file)
 
 
+def test_import_mickey_collects_row_errors(csv_service, db):
+    with open(TEST_MICKEY_CSV, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Issue num", "Vol num", "Main Story", "Year"])
+        writer.writerow([1, 1, "First", 1978])
+        writer.writerow(["abc", 1, "Bad issue", 1978])
+        writer.writerow([1, 1, "Duplicate", 1979])
+        writer.writerow([2, 1, "Second", 1979])
+
+    report = csv_service.import_mickey(TEST_MICKEY_CSV, chunk_size=2)
+    os.remove(TEST_MICKEY_CSV)
+
+    assert report.imported == 2
+    assert [line for line, _ in report.errors] == [3, 4]
+    assert "UNIQUE" in report.errors[1][1]
+    assert len(db.search_mickey()) == 2
+
+
+
+def test_export_mickey_streams_filtered_rows(csv_service, db):
+    db.bulk_add_mickey([(i, 1, f"Story {i}", 1990 + i % 3) for i in range(1, 2501)])
+    export_file = "export_mickey.csv"
+    written = csv_service.export_mickey(export_file, year=1990, order_by="issue_num", descending=True)
+
+    with open(export_file, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    os.remove(export_file)
+
+    assert written == len(rows) == 833
+    assert rows[0]["Issue num"] == "2499"
+    assert {row["Year"] for row in rows} == {"1990"}
+
 def test_import_export_other(csv_service, db):
     with open(TEST_OTHER_CSV, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
@@ -77,3 +109,33 @@ def test_import_export_other(csv_service, db):
 
     os.remove(TEST_OTHER_CSV)
     os.remove(export_file)
+
+
+@pytest.mark.parametrize("conflict, expected, imported, skipped", [
+    ("skip", {1: ("Stored", 1978), 2: ("", 1980)}, 1, 1),
+    ("overwrite", {1: ("", 1979), 2: ("", 1980)}, 2, 0),
+    ("merge", {1: ("Stored", 1979), 2: ("", 1980)}, 2, 0),
+])
+def test_import_conflict_policies(csv_service, db, conflict, expected, imported, skipped):
+    db.add_mickey(1, 1, "Stored", 1978)
+    with open(TEST_MICKEY_CSV, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Issue num", "Vol num", "Main Story", "Year"])
+        writer.writerow([1, 1, "", 1979])
+        writer.writerow([2, 1, "", 1980])
+
+    report = csv_service.import_mickey(TEST_MICKEY_CSV, conflict=conflict)
+    again = csv_service.import_mickey(TEST_MICKEY_CSV, conflict=conflict)
+    os.remove(TEST_MICKEY_CSV)
+
+    assert (report.imported, report.skipped, report.failed) == (imported, skipped, 0)
+    assert (again.imported, again.skipped) == (0, 2)
+    assert {row["issue_num"]: (row["mainstory"], row["year"]) for row in db.search_mickey()} == expected
+
+
+def test_reimporting_superheroes_is_idempotent(csv_service, db):
+    rows = [("T", "W", "A", "N/A", "Panini", "#1", "X", False, 2000, "Marvel")] * 2
+    assert db.bulk_add_superheroes(rows, conflict="skip") == (1, [])
+    inserted, failures = db.bulk_add_superheroes(rows)
+    assert inserted == 0 and len(failures) == 2 and "UNIQUE" in failures[0][2]
+    assert db.stats()["superheroes"]["total"] == 1
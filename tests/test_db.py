@@ -2,6 +2,7 @@ import sys
 from pathlib import Path
 import os
 import pytest
+import sqlite3
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
 
@@ -103,9 +104,12 @@ def test_advanced_search_mickey_issue_range(db):
 def test_advanced_search_mickey_exclude_range(db):
     for i in range(300, 305):
         db.add_mickey(i, 1, f"Story {i}", 2015)
-    missing = db.advanced_search_mickey(exclude_issue_range=(300, 305))
+    db.add_mickey(306, 1, "Story 306", 2015)
+    # Το εύρος αποκλείεται ολόκληρο (300-305)· μένει μόνο το 306
+    results = db.advanced_search_mickey(exclude_issue_range=(300, 305))
+    assert [row["issue_num"] for row in results] == [306]
     # Βάλαμε 300-304, λείπει το 305
-    assert 305 in missing
+    assert db.find_missing_issues(300, 305) == [(305, 305)]
 
 def test_advanced_search_other_exact(db):
     db.add_other("House Of X", "Hickman", "Larraz", "N/A", "Marvel",
@@ -129,3 +133,375 @@ def test_advanced_search_other_multiple_filters(db):
     results = db.advanced_search_other(writer="WriterX", main_character="HeroX", event=True)
     assert len(results) == 1
     assert results[0]["title"] == "TitleX"
+
+def test_bulk_add_mickey_reports_failures(db):
+    db.add_mickey(2, 1, "Existing", 1990)
+    rows = [(1, 1, "One", 1990), (2, 1, "Duplicate", 1991), (3, 1, "Three", 1992)]
+    inserted, failures = db.bulk_add_mickey(rows, chunk_size=2)
+    assert inserted == 2
+    assert len(failures) == 1
+    index, row, error = failures[0]
+    assert index == 1
+    assert row == (2, 1, "Duplicate", 1991)
+    assert "UNIQUE" in error
+    assert len(db.search_mickey()) == 3
+    assert db.search_mickey(issue_num=2)[0]["mainstory"] == "Existing"
+
+def test_bulk_add_arkas_streams_generator(db):
+    rows = ((f"Story {i}", "Series", 2000 + i % 10) for i in range(25))
+    inserted, failures = db.bulk_add_arkas(rows, chunk_size=10)
+    assert inserted == 25
+    assert failures == []
+    assert len(db.search_arkas(series_name="Series")) == 25
+
+def test_search_superheroes_by_category_partitions_one_query(db):
+    db.add_superhero("A1", "Hickman", "Artist", "Coll", "Panini", "1", "X-Men", True, 2019, "Marvel")
+    db.add_superhero("A2", "Hickman", "Artist", "Coll", "Panini", "2", "X-Men", False, 2020, "Marvel")
+    db.add_superhero("B1", "Hickman", "Artist", "Coll", "DC", "1", "Batman", False, 2010, "DC")
+    db.add_superhero("C1", "Morrison", "Artist", "Coll", "DC", "1", "Batman", False, 2010, "DC")
+    partitions = db.search_superheroes_by_category(writer="Hickman")
+    assert sorted(partitions) == ["DC", "Marvel"]
+    assert [row["title"] for row in partitions["Marvel"]] == ["A1", "A2"]
+    assert [row["title"] for row in partitions["DC"]] == ["B1"]
+
+def test_search_superheroes_by_category_sorts_each_partition(db):
+    for title, category in [("B", "Marvel"), ("A", "Marvel"), ("C", "Marvel"), ("Y", "DC"), ("Z", "DC")]:
+        db.add_superhero(title, "Hickman", "Artist", "Coll", "Panini", "1", "X", False, 2019, category)
+    partitions = db.search_superheroes_by_category(order_by="title", orders={"DC": ("title", True)})
+    assert [row["title"] for row in partitions["Marvel"]] == ["A", "B", "C"]
+    assert [row["title"] for row in partitions["DC"]] == ["Z", "Y"]
+
+def test_cancelled_bulk_add_rolls_back_whole_batch(db):
+    cancelled = []
+    def progress(done, total):
+        cancelled.append(done)
+    db.set_cancel_check(lambda: len(cancelled) > 0, every=10)
+    rows = ((i, 1, f"Story {i}", 2000) for i in range(5000))
+    with pytest.raises(sqlite3.OperationalError):
+        db.bulk_add_mickey(rows, chunk_size=100, progress=progress)
+    db.set_cancel_check(None)
+    assert db.search_mickey() == []
+
+def test_default_profile_uses_wal(db):
+    info = db.profile_info()
+    assert info["profile"] == "interactive"
+    assert info["journal_mode"] == "wal"
+    assert info["busy_timeout"] == 5000
+
+def test_profile_info_of_in_memory_database():
+    mem = DBManager(db_path=":memory:")
+    info = mem.profile_info()
+    assert info["profile"] == "interactive"
+    assert info["journal_mode"] == "memory"
+    mem.close()
+
+def test_using_profile_is_temporary(db):
+    with db.using_profile("bulk_load"):
+        assert db.profile_info()["synchronous"] == 0
+    info = db.profile_info()
+    assert info["profile"] == "interactive"
+    assert info["synchronous"] == 1
+
+def test_read_only_profile_rejects_writes(db):
+    db.add_mickey(1, 1, "Story", 1990)
+    reader = DBManager(db_path=TEST_DB, profile="read_only")
+    assert len(reader.search_mickey()) == 1
+    with pytest.raises(sqlite3.OperationalError):
+        reader.add_mickey(2, 1, "Story", 1990)
+    reader.close()
+
+def test_unknown_profile_is_rejected(db):
+    with pytest.raises(ValueError):
+        db.apply_profile("turbo")
+
+def test_fulltext_search_ranks_hits_across_tables(db):
+    db.add_mickey(636, 1, "Η Επιστροφή του Φάντομ Ντακ", 1978)
+    db.add_mickey(637, 1, "Άλλη ιστορία", 1978)
+    db.add_arkas("Φάντομ στο σχολείο", "Κόκκορας", 1990)
+    hits = db.fulltext_search("φάντομ")
+    assert {(table, row["year"]) for table, _, row in hits} == {("mickey", 1978), ("arkas", 1990)}
+    assert db.fulltext_search("φάντομ", tables=["arkas"])[0][2]["story_name"] == "Φάντομ στο σχολείο"
+
+def test_fulltext_index_follows_updates_and_deletes(db):
+    db.add_superhero("House Of X", "Hickman", "Larraz", "N/A", "Marvel",
+                     "HOX #1-6", "X-Men", True, 2019, "Marvel")
+    rec = db.search_superheroes(title="House Of X")[0]
+    db.update_superhero(rec["id"], "Powers Of X", "Hickman", "Silva", "N/A", "Marvel",
+                        "POX #1-6", "X-Men", True, 2019, "Marvel")
+    assert db.advanced_search_superheroes(title_text="house") == []
+    assert len(db.advanced_search_superheroes(title_text="pow")) == 1
+    db.delete_superhero(rec["id"])
+    assert db.fulltext_search("powers") == []
+
+def test_advanced_search_arkas_text(db):
+    db.add_arkas("Ο Κόκκορας", "Ζωo", 1990)
+    db.add_arkas("Καλημέρα", "Ζωo", 1991)
+    results = db.advanced_search_arkas(text="κόκ")
+    assert [row["story_name"] for row in results] == ["Ο Κόκκορας"]
+
+def test_find_missing_issues_returns_gap_intervals(db):
+    for issue in [1, 2, 5, 6, 9]:
+        db.add_mickey(issue, 1, f"Story {issue}", 1990)
+    db.add_mickey(3, 2, "Other volume", 1990)
+    assert db.find_missing_issues(1, 12) == [(4, 4), (7, 8), (10, 12)]
+    assert db.find_missing_issues(1, 12, vol_num=1) == [(3, 4), (7, 8), (10, 12)]
+    assert db.find_missing_issues(20, 22) == [(20, 22)]
+
+def test_find_missing_issues_by_volume(db):
+    for issue in [1, 3]:
+        db.add_mickey(issue, 1, "Story", 1990)
+    db.add_mickey(2, 2, "Story", 1990)
+    assert db.find_missing_issues_by_volume(1, 4) == {1: [(2, 2), (4, 4)], 2: [(1, 1), (3, 4)]}
+
+def test_find_missing_issues_in_reversed_range(db):
+    db.add_mickey(6, 1, "Story", 1990)
+    assert db.find_missing_issues(10, 5) == []
+    assert db.find_missing_issues_by_volume(10, 5) == {}
+    assert db.find_missing_issues(5, 5) == [(5, 5)]
+
+def test_iter_mickey_streams_filtered_rows_in_order(db):
+    db.bulk_add_mickey([(i, 1, f"Story {i}", 1990 + i % 2) for i in range(1, 26)])
+    rows = db.iter_mickey(year=1991, order_by="issue_num", descending=True, chunk_size=4)
+    assert not isinstance(rows, list)
+    assert [row["issue_num"] for row in rows] == list(range(25, 0, -2))
+
+def test_stats_follow_inserts_updates_and_deletes(db):
+    db.add_mickey(1, 1, "A", 1990)
+    db.add_mickey(2, 1, "B", 1990)
+    db.add_mickey(1, 2, "C", None)
+    db.add_arkas("Ο Κόκκορας", "Ζωo", 1990)
+    stats = db.stats()
+    assert stats["mickey"]["total"] == 3
+    assert stats["mickey"]["by_year"] == {1990: 2, None: 1}
+    assert (stats["mickey"]["volumes"], stats["mickey"]["first_year"]) == (2, 1990)
+    assert stats["arkas"]["by_series"] == {"Ζωo": 1}
+
+    db.update_mickey(2, 1, "B", 1991)
+    db.delete_mickey(1, 2)
+    stats = db.stats()
+    assert stats["mickey"]["by_year"] == {1990: 1, 1991: 1}
+    assert stats["mickey"]["by_volume"] == {1: 2}
+
+def test_deferred_stats_are_rebuilt_after_bulk_load(db):
+    db.add_superhero("Watchmen", "Alan Moore", "Dave Gibbons", "N/A", "DC", "#1-12", "Rorschach", False, 1986, "DC")
+    with db.deferred_stats():
+        db.bulk_add_superheroes([
+            (f"T{i}", "Alan Moore", "A", "N/A", "Panini", "#1", "X", False, 2000, "Marvel") for i in range(5)
+        ])
+        assert db.stats()["deferred"]
+        assert db.stats()["superheroes"]["total"] == 1
+    stats = db.stats()
+    assert not stats["deferred"]
+    assert stats["superheroes"]["by_category"] == {"DC": 1, "Marvel": 5}
+    assert stats["superheroes"]["by_writer"] == {"Alan Moore": 6}
+
+def test_deferred_stats_pause_only_the_loaded_table(db):
+    db.add_mickey(1, 1, "Story", 1990)
+    with db.deferred_stats("superheroes"):
+        db.bulk_add_superheroes([("T", "W", "A", "N/A", "P", "#1", "X", False, 2000, "Marvel")])
+        db.add_mickey(2, 1, "Story", 1991)
+        stats = db.stats()
+        assert stats["deferred"]
+        assert stats["superheroes"]["total"] == 0
+        assert stats["mickey"]["by_year"] == {1990: 1, 1991: 1}
+    stats = db.stats()
+    assert not stats["deferred"]
+    assert stats["superheroes"]["by_category"] == {"Marvel": 1}
+    assert stats["mickey"]["total"] == 2
+
+def test_cancelled_bulk_load_still_rebuilds_stats(db):
+    db.add_superhero("Watchmen", "Alan Moore", "Dave Gibbons", "N/A", "DC", "#1-12", "Rorschach", False, 1986, "DC")
+    cancelled = []
+    is_cancelled = lambda: bool(cancelled)
+    db.set_cancel_check(is_cancelled, every=1)
+
+    def rows():
+        yield ("T", "W", "A", "N/A", "P", "#1", "X", False, 2000, "Marvel")
+        cancelled.append(True)
+
+    with pytest.raises(sqlite3.OperationalError):
+        with db.deferred_stats():
+            db.bulk_add_superheroes(rows())
+    assert db._is_cancelled is is_cancelled
+    cancelled.clear()
+    stats = db.stats()
+    assert not stats["deferred"]
+    assert stats["superheroes"]["by_category"] == {"DC": 1}
+
+def test_apply_edits_updates_only_changed_columns(db):
+    db.add_mickey(1, 1, "Old", 1990)
+    db.add_mickey(2, 1, "Other", 1991)
+    db.add_arkas("Story", "Series", 1990)
+    arkas_id = db.search_arkas()[0]["id"]
+
+    failures = db.apply_edits("mickey", {(1, 1): {"mainstory": "New"}, (2, 1): {"year": 2000}})
+    assert failures == {}
+    rows = {row["issue_num"]: row for row in db.search_mickey()}
+    assert (rows[1]["mainstory"], rows[1]["year"]) == ("New", 1990)
+    assert (rows[2]["mainstory"], rows[2]["year"]) == ("Other", 2000)
+
+    failures = db.apply_edits("arkas", {(arkas_id,): {"year": 1995}, (999,): {"year": 1}, (arkas_id + 1,): {"id": 5}})
+    assert failures[(999,)] == "Row no longer exists"
+    assert "Not editable" in failures[(arkas_id + 1,)]
+    assert db.search_arkas()[0]["year"] == 1995
+
+def test_apply_edits_rolls_back_only_the_failing_row(db):
+    db.conn.execute("CREATE TRIGGER no_negative BEFORE UPDATE ON mickey WHEN new.year < 0 BEGIN SELECT RAISE(ABORT, 'negative year'); END")
+    db.add_mickey(1, 1, "A", 1990)
+    db.add_mickey(2, 1, "B", 1990)
+    failures = db.apply_edits("mickey", {(1, 1): {"mainstory": "A2", "year": -1}, (2, 1): {"mainstory": "B2"}})
+    assert list(failures) == [(1, 1)]
+    assert [row["mainstory"] for row in db.search_mickey()] == ["A", "B2"]
+
+def test_delete_and_update_many(db):
+    db.bulk_add_mickey([(i, 1, f"Story {i}", 1990) for i in range(1, 11)])
+    assert db.update_many_mickey([(1, 1), (2, 1), (3, 1)], year=2000) == 3
+    assert db.delete_many_mickey([(4, 1), (5, 1), (99, 1)]) == 2
+    assert [row["issue_num"] for row in db.advanced_search_mickey(year=2000)] == [1, 2, 3]
+    assert len(db.search_mickey()) == 8
+
+    db.bulk_add_superheroes([
+        (f"T{i}", "W", "A", "N/A", "Panini", "#1", "X", False, 2000, "Marvel") for i in range(4)
+    ])
+    ids = [row["id"] for row in db.search_superheroes()]
+    assert db.update_many_superheroes(ids[:2], category="DC") == 2
+    assert db.stats()["superheroes"]["by_category"] == {"DC": 2, "Marvel": 2}
+    with pytest.raises(ValueError):
+        db.update_many_superheroes(ids, id=1)
+
+def test_change_notifications(db):
+    events = []
+    db.subscribe(lambda table, operation, keys: events.append((table, operation, keys)))
+    db.add_mickey(1, 1, "A", 1990)
+    db.add_arkas("Story", "Series", 1990)
+    arkas_id = db.search_arkas()[0]["id"]
+    db.update_many_arkas([arkas_id], year=1991)
+    db.apply_edits("mickey", {(1, 1): {"year": 2000}, (9, 9): {"year": 1}})
+    db.delete_many_mickey([(1, 1)])
+    db.bulk_add_arkas([("Other", "Series", 1992)])
+    assert events == [
+        ("mickey", "insert", [(1, 1)]),
+        ("arkas", "insert", [(arkas_id,)]),
+        ("arkas", "update", [(arkas_id,)]),
+        ("mickey", "update", [(1, 1)]),
+        ("mickey", "delete", [(1, 1)]),
+        ("arkas", "insert", None),
+    ]
+
+def test_advanced_search_restricted_to_keys(db):
+    db.bulk_add_mickey([(i, vol, f"Story {i}", 1990 + i) for i in range(1, 6) for vol in (1, 2)])
+    rows = db.advanced_search_mickey(keys=[(2, 1), (3, 2), (99, 1)], vol_num=2)
+    assert [(row["issue_num"], row["vol_num"]) for row in rows] == [(3, 2)]
+    assert db.advanced_search_mickey(keys=[]) == []
+    db.add_arkas("Story", "Series", 1990)
+    arkas_id = db.search_arkas()[0]["id"]
+    assert [row["id"] for row in db.advanced_search_arkas(keys=[(arkas_id,)])] == [arkas_id]
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_pages_match_offset_pages(db, descending):
+    db.bulk_add_mickey([(i, vol, f"Story {i}", None if i % 4 == 0 else 1990 + i % 3) for i in range(1, 16) for vol in (1, 2)])
+    expected = [(row["issue_num"], row["vol_num"]) for row in db.advanced_search_mickey(order_by="year", descending=descending)]
+    seen, after = [], None
+    while True:
+        page = db.advanced_search_mickey(order_by="year", descending=descending, limit=4, after=after)
+        seen += [(row["issue_num"], row["vol_num"]) for row in page]
+        if len(page) < 4:
+            break
+        after = (page[-1]["year"], page[-1]["issue_num"], page[-1]["vol_num"])
+    assert seen == expected
+
+def test_name_filters_ignore_accents_and_case(db):
+    db.add_arkas("Η Επιστροφή του Φάντομ", "Ο Κόκκορας", 1990)
+    db.add_mickey(1, 1, "Ο Θησαυρός", 1990)
+    assert len(db.advanced_search_arkas(story_name="η επιστροφη του φαντομ", series_name="Ο ΚΟΚΚΟΡΑΣ")) == 1
+    assert len(db.advanced_search_mickey(mainstory="ο θησαυροσ")) == 1
+    plan = db.explain("SELECT * FROM arkas WHERE series_name_norm = ? AND year = ?", ("x", 1990))
+    assert any("idx_arkas_norm_series_name" in step for step in plan)
+
+def test_suggest_prefix_ignores_accents_and_case(db):
+    for series in ["Ο Κόκκορας", "ο κοκκορας", "Οι Ζωντανοί", "Αρκάς", "Ολα"]:
+        db.add_arkas(f"Story {series}", series, 1990)
+    assert db.suggest("arkas", "series_name", "ο") == ["Ο Κόκκορας", "Οι Ζωντανοί", "Ολα"]
+    assert db.suggest("arkas", "series_name", "ΟΙ ζ") == ["Οι Ζωντανοί"]
+    assert db.suggest("arkas", "series_name", "ο", limit=1) == ["Ο Κόκκορας"]
+    with pytest.raises(ValueError):
+        db.suggest("arkas", "year", "1")
+
+def test_advanced_search_excludes_issue_range(db):
+    for i in range(300, 306):
+        db.add_mickey(i, 1, f"Story {i}", 2015)
+    results = db.advanced_search_mickey(exclude_issue_range=(301, 304))
+    assert [row["issue_num"] for row in results] == [300, 305]
+
+def test_advanced_search_with_filter_spec(db):
+    db.add_superhero("House Of X", "Hickman", "Larraz", "N/A", "Marvel", "#1", "X-Men", True, 2019, "Marvel")
+    db.add_superhero("Powers Of X", "Hickman", "Silva", "N/A", "Marvel", "#1", "X-Men", True, 2019, "Marvel")
+    db.add_superhero("All-Star Superman", "Morrison", "Quitely", "N/A", "DC", "#1", "Superman", False, None, "DC")
+    spec = ("or", [("artist", "eq", "Larraz"), ("story_year", "null", True)])
+    assert [row["title"] for row in db.advanced_search_superheroes(spec=spec)] == ["House Of X", "All-Star Superman"]
+    assert db.advanced_search_superheroes(spec=spec, category="DC")[0]["writer"] == "Morrison"
+    assert [row["title"] for row in db.advanced_search_superheroes(spec=("writer", "contains", "ICKM"))] == [
+        "House Of X", "Powers Of X"
+    ]
+    assert [row["id"] for row in db.iter_superheroes(spec=("title", "contains", "pow"))] == [2]
+
+def test_search_boxes_ignore_greek_accents_and_case(db):
+    db.add_mickey(636, 1, "Η Επιστροφή του Φάντομ Ντακ", 1978)
+    db.add_superhero("Ο Θρύλος", "W", "A", "N/A", "P", "#1", "Ήρωας", False, 2000, "Cat")
+    db.add_arkas("Το Μυστικό", "Ο Κόκκορας", 1990)
+    assert len(db.advanced_search_mickey(text="επιστροφη")) == 1
+    assert len(db.advanced_search_mickey(text="ΕΠΙΣΤΡΟΦΗ φαντ")) == 1
+    assert len(db.advanced_search_superheroes(title_text="θρυλοσ")) == 1
+    assert len(db.advanced_search_arkas(text="ΚΟΚΚΟΡΑΣ μυστ")) == 1
+    assert [hit[0] for hit in db.fulltext_search("ηρωας")] == ["superheroes"]
+    db.update_many_arkas([db.advanced_search_arkas()[0]["id"]], story_name="Άλλη Ιστορία")
+    assert db.advanced_search_arkas(text="μυστικο") == []
+    assert len(db.advanced_search_arkas(text="αλλη")) == 1
+
+def _index_sql(db, table):
+    return db.conn.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') ORDER BY name",
+        (table,),
+    ).fetchall()
+
+def test_large_bulk_insert_rebuilds_indexes_once(db):
+    db.add_arkas("Το Μυστικό", "Ο Κόκκορας", 1990)
+    schema = _index_sql(db, "arkas")
+    rows = [(f"Ιστορία {i}", f"Σειρά {i % 7}", 1980 + i % 30) for i in range(2500)]
+    inserted, failures = db.bulk_add_arkas(rows, chunk_size=500)
+    assert (inserted, failures) == (2500, [])
+    assert _index_sql(db, "arkas") == schema
+    assert db.conn.execute("SELECT COUNT(*) FROM arkas_fts").fetchone()[0] == 2501
+    assert len(db.advanced_search_arkas(text="κοκκορας")) == 1
+    assert len(db.advanced_search_arkas(text="ιστορια 2499")) == 1
+    assert len(db.advanced_search_arkas(series_name="σειρα 3")) == len(rows[3::7])
+
+def test_failed_bulk_insert_keeps_indexes(db):
+    schema = _index_sql(db, "arkas")
+
+    def rows():
+        for i in range(2500):
+            yield (f"Ιστορία {i}", "Σειρά", 2000)
+        raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        db.bulk_add_arkas(rows(), chunk_size=500)
+    assert _index_sql(db, "arkas") == schema
+    assert db.advanced_search_arkas() == []
+
+def test_schema_does_not_need_normalize_to_write(db):
+    assert not [row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE sql LIKE '%normalize(%'")]
+    db.add_arkas("Το Μυστικό", "Ο Κόκκορας", 1990)
+    conn = sqlite3.connect(TEST_DB)
+    conn.execute("INSERT INTO mickey (issue_num, vol_num, mainstory, year) VALUES (1, 1, 'Story', 1990)")
+    conn.execute("INSERT INTO superheroes (title, category) VALUES ('Title', 'Marvel')")
+    conn.execute("UPDATE arkas SET story_name = 'Άλλο', series_name = 'Σειρά'")
+    conn.execute("DELETE FROM superheroes")
+    conn.commit()
+    conn.close()
+    # Rows written elsewhere get their normalized copies once saved through DBManager.
+    assert db.advanced_search_arkas(text="αλλο") == []
+    row = db.advanced_search_arkas()[0]
+    db.update_arkas(row["id"], row["story_name"], row["series_name"], row["year"])
+    assert len(db.advanced_search_arkas(text="αλλο")) == 1
+    assert len(db.advanced_search_arkas(series_name="ΣΕΙΡΑ")) == 1
@@ -29,7 +29,8 @@ def test_build_mickey_filters_with_issue_range():
 
 def test_build_mickey_filters_with_exclude():
     query, values, exclude = filters.build_mickey_filters(exclude_issue_range=(5, 10))
-    assert "issue_num" not in query
+    assert "issue_num NOT BETWEEN ? AND ?" in query
+    assert values == [5, 10]
     assert exclude == (5, 10)
 
 
@@ -51,3 +52,87 @@ def test_build_other_filters_with_year_range():
     query, values = filters.build_other_filters(story_year_range=(2010, 2020))
     assert "story_year BETWEEN ? AND ?" in query
     assert values == [2010, 2020]
+
+
+def test_paginate_orders_by_rowid_and_limits():
+    query, values = filters.paginate("SELECT * FROM mickey WHERE year = ?", [1990], limit=50, offset=100)
+    assert query.endswith("ORDER BY rowid ASC LIMIT ? OFFSET ?")
+    assert values == [1990, 50, 100]
+
+
+def test_paginate_rejects_invalid_sort_column():
+    with pytest.raises(ValueError):
+        filters.paginate("SELECT * FROM mickey", [], order_by="year; DROP TABLE mickey")
+
+
+def test_fts_query_quotes_words_as_prefixes():
+    assert filters.fts_query('Φάντομ "Ντακ') == '"φαντομ"* """ντακ"*'
+    assert filters.fts_query("house x", columns=["title"]) == '{title} : ("house"* "x"*)'
+
+
+def test_build_mickey_filters_with_text():
+    query, values, _ = filters.build_mickey_filters(text="επιστροφ", year=1978)
+    assert "mickey_fts MATCH ?" in query
+    assert values == [1978, '"επιστροφ"*']
+
+
+def test_format_ranges_compacts_intervals():
+    assert filters.format_ranges([(12, 40), (57, 57)]) == "12-40, 57"
+    assert filters.count_in_ranges([(12, 40), (57, 57)]) == 30
+
+
+def test_paginate_keyset_splits_null_branch():
+    query, values = filters.paginate(
+        "SELECT * FROM mickey", [], order_by="year", descending=True, limit=10,
+        after=(1990, 5, 1), key_columns=("issue_num", "vol_num"),
+    )
+    assert "(year, issue_num, vol_num) < (?, ?, ?)" in query
+    assert " UNION ALL " in query and "year IS NULL" in query
+    assert values == [1990, 5, 1, 10, 10, 10, 0]
+
+
+def test_name_filters_match_normalized_text():
+    query, values = filters.build_arkas_filters(series_name="Ο ΚΌΚΚΟΡΑΣ")
+    assert "series_name_norm = ?" in query
+    assert values == ["ο κοκκορασ"]
+
+
+def test_prefix_condition_is_a_range():
+    assert filters.prefix_condition("normalize(title)", "ab") == (
+        "normalize(title) >= ? AND normalize(title) < ?", ["ab", "ac"]
+    )
+
+
+def test_compile_filters_nests_groups():
+    spec = ("or", [
+        ("writer", "in", ["Hickman", "Morrison"]),
+        ("and", [("title", "prefix", "ΣΠΆ"), ("story_year", "null", True)]),
+    ])
+    query, values = filters.compile_filters("superheroes", ("and", [("category", "eq", "Marvel"), spec]))
+    assert query == (
+        "SELECT id, title, writer, artist, collection, publisher, issues, main_character, event, story_year, "
+        "category FROM superheroes WHERE category = ? AND (writer IN (?, ?) OR "
+        "(title_norm >= ? AND title_norm < ? AND story_year IS NULL))"
+    )
+    assert values == ["Marvel", "Hickman", "Morrison", "σπα", "σπβ"]
+
+
+def test_compile_filters_caches_sql_per_shape():
+    first, _ = filters.compile_filters("arkas", ("year", "not_range", (1990, 2000)))
+    hits = filters._condition.cache_info().hits
+    second, values = filters.compile_filters("arkas", ("year", "not_range", (1970, 1980)))
+    assert second == first and values == [1970, 1980]
+    assert filters._condition.cache_info().hits == hits + 1
+    assert filters.compile_filters("arkas", ("id", "in", [1, 2, 3]))[0].endswith("id IN (?, ?, ?)")
+    assert filters.compile_filters("arkas", ("id", "in", []))[0].endswith("WHERE 0")
+
+
+def test_compile_filters_rejects_unknown_columns_and_operators():
+    with pytest.raises(ValueError):
+        filters.compile_filters("arkas", ("story", "eq", "x"))
+    with pytest.raises(ValueError):
+        filters.compile_filters("arkas", ("year", "prefix", "19"))
+    with pytest.raises(ValueError):
+        filters.compile_filters("arkas", ("year", "like", 1990))
+    with pytest.raises(TypeError):
+        filters.build_arkas_filters(writer="Hickman")
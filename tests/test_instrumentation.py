@@ -0,0 +1,83 @@
+import sys
+from pathlib import Path
+import os
+import pytest
+import sqlite3
+import threading
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from database.db_manager import DBManager
+from database.instrumentation import QueryMonitor, fingerprint
+
+TEST_DB = "test_instrumentation.db"
+
+@pytest.fixture
+def monitor():
+    return QueryMonitor(capacity=50, slow_threshold_ms=1e9)
+
+@pytest.fixture
+def db(monitor):
+    if os.path.exists(TEST_DB):
+        os.remove(TEST_DB)
+    db = DBManager(db_path=TEST_DB, monitor=monitor)
+    yield db
+    db.close()
+    if os.path.exists(TEST_DB):
+        os.remove(TEST_DB)
+
+def test_fingerprint_groups_literals():
+    assert fingerprint("SELECT * FROM mickey  WHERE year = 1990\n AND mainstory = 'x'") == \
+        "SELECT * FROM mickey WHERE year = ? AND mainstory = ?"
+    assert fingerprint("DELETE FROM arkas WHERE id IN (?, ?, ?)") == "DELETE FROM arkas WHERE id IN (?+)"
+
+def test_stats_aggregate_calls_and_rows(db, monitor):
+    db.add_mickey(1, 1, "Story", 1990)
+    db.add_mickey(2, 1, "Story", 1990)
+    db.advanced_search_mickey(year=1990)
+    db.advanced_search_mickey(year=1991)
+    stats = {entry["fingerprint"]: entry for entry in db.query_stats()}
+    search = stats["SELECT issue_num, vol_num, mainstory, year FROM mickey WHERE year = ? ORDER BY issue_num ASC, vol_num ASC"]
+    assert search["calls"] == 2
+    assert search["rows"] == 2
+    insert = "INSERT INTO mickey (issue_num, vol_num, mainstory, year, mainstory_norm) VALUES (?, ?, ?, ?, normalize(?))"
+    assert stats[insert]["calls"] == 2
+
+def test_ring_buffer_is_bounded(db, monitor):
+    for i in range(80):
+        db.search_mickey(issue_num=i)
+    assert len(monitor.records) == 50
+
+def test_slow_queries_keep_plan_and_log(db, monitor, tmp_path):
+    log_path = tmp_path / "slow.log"
+    monitor.configure(slow_threshold_ms=0, log_path=str(log_path))
+    db.advanced_search_superheroes(category="Marvel")
+    slow = db.slow_queries()[-1]
+    assert any("idx_superheroes_category_year" in step for step in slow.plan)
+    assert "slow query" in log_path.read_text(encoding="utf-8")
+
+def test_failed_statements_are_recorded(db, monitor):
+    with pytest.raises(sqlite3.OperationalError):
+        db.execute_sql("SELECT * FROM no_such_table")
+    record = monitor.records[-1]
+    assert record.sql == "SELECT * FROM no_such_table"
+    assert record.error
+    stats = {entry["fingerprint"]: entry for entry in db.query_stats()}
+    assert stats["SELECT * FROM no_such_table"]["errors"] == 1
+
+def test_concurrent_recording_keeps_every_record():
+    monitor = QueryMonitor(capacity=10000, slow_threshold_ms=1e9)
+
+    def work():
+        for i in range(500):
+            monitor.record(None, f"SELECT {i}", (), 0.1, 1)
+            if i % 50 == 0:
+                monitor.stats()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(monitor.records) == 2000
+    assert monitor.stats()[0]["calls"] == 2000
@@ -0,0 +1,119 @@
+import sys
+import sqlite3
+from pathlib import Path
+import os
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from database import migrations, models
+from database.db_manager import DBManager
+from services import filters
+
+TEST_DB = "test_migrations.db"
+
+@pytest.fixture
+def db_path():
+    if os.path.exists(TEST_DB):
+        os.remove(TEST_DB)
+    yield TEST_DB
+    if os.path.exists(TEST_DB):
+        os.remove(TEST_DB)
+
+def index_names(conn):
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+    return {row[0] for row in rows}
+
+def test_fresh_database_is_at_latest_version(db_path):
+    db = DBManager(db_path=db_path)
+    assert db.schema_version() == migrations.LATEST_VERSION
+    assert "idx_superheroes_category_year" in index_names(db.conn)
+    db.close()
+
+def test_existing_database_is_upgraded_in_place(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(models.CREATE_MICKEY_TABLE)
+    conn.execute(models.CREATE_SUPERHEROES_TABLE)
+    conn.execute(models.CREATE_ARKAS_TABLE)
+    conn.execute("INSERT INTO arkas (story_name, series_name, year) VALUES ('Old', 'Series', 1990)")
+    conn.commit()
+    conn.close()
+
+    db = DBManager(db_path=db_path)
+    assert db.schema_version() == migrations.LATEST_VERSION
+    assert {"idx_arkas_norm_series_name", "idx_mickey_sort_year"} <= index_names(db.conn)
+    assert db.search_arkas()[0]["story_name"] == "Old"
+    db.close()
+
+def test_migrate_is_idempotent(db_path):
+    db = DBManager(db_path=db_path)
+    assert migrations.migrate(db.conn) == []
+    db.close()
+
+def test_category_filter_uses_index(db_path):
+    db = DBManager(db_path=db_path)
+    plan = db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM superheroes WHERE category = ?", ("Marvel",)
+    ).fetchall()
+    assert any("idx_superheroes_category_year" in row[3] for row in plan)
+    db.close()
+
+def test_series_and_year_filters_use_index(db_path):
+    db = DBManager(db_path=db_path)
+    query, values = filters.build_arkas_filters(series_name="Ζωντανοί", year_range=(1990, 2000))
+    plan = db.conn.execute("EXPLAIN QUERY PLAN " + query, values).fetchall()
+    assert any("idx_arkas_norm_series_name" in row[3] for row in plan)
+    query, values, _ = filters.build_mickey_filters(year_range=(1990, 2000))
+    plan = db.conn.execute("EXPLAIN QUERY PLAN " + query, values).fetchall()
+    assert any("idx_mickey_sort_year" in row[3] for row in plan)
+    db.close()
+
+def _old_database(db_path, arkas_rows):
+    conn = sqlite3.connect(db_path)
+    conn.execute(models.CREATE_MICKEY_TABLE)
+    conn.execute(models.CREATE_SUPERHEROES_TABLE)
+    conn.execute(models.CREATE_ARKAS_TABLE)
+    conn.executemany("INSERT INTO arkas (story_name, series_name, year) VALUES (?, ?, ?)", arkas_rows)
+    conn.commit()
+    conn.close()
+
+def test_natural_key_migration_deletes_nothing(db_path):
+    _old_database(db_path, [("Story", "Series", 1990), ("Other", "Series", 1992), ("Other", "Series", 1992),
+                            (None, "Series", 1), (None, "Series", 1)])
+    db = DBManager(db_path=db_path)
+    rows = db.conn.execute("SELECT story_name, year FROM arkas ORDER BY id").fetchall()
+    assert [tuple(row) for row in rows] == [("Story", 1990), ("Other", 1992), ("Other", 1992), (None, 1), (None, 1)]
+    assert db.stats()["arkas"]["total"] == 5
+    # Identical rows are reported like any other shared key; NULL keys never conflict.
+    assert models.natural_key_conflicts(db.conn, "arkas") == [("Other", "Series", 2)]
+    assert "idx_arkas_natural_key" not in index_names(db.conn)
+    db.close()
+
+def test_null_key_parts_are_never_matched(db_path):
+    db = DBManager(db_path=db_path)
+    db.add_arkas(None, "Series", 1990)
+    db.add_arkas(None, "Series", 1990)
+    assert db.bulk_add_arkas([(None, "Series", 1990)], conflict="skip") == (1, [])
+    assert db.bulk_add_arkas([(None, "Series", 2000)], conflict="overwrite") == (1, [])
+    assert len(db.search_arkas()) == 4
+    assert models.natural_key_conflicts(db.conn, "arkas") == []
+    db.add_arkas("Story", "Series", 1990)
+    with pytest.raises(sqlite3.IntegrityError):
+        db.add_arkas("Story", "Series", 2000)
+    db.close()
+
+def test_natural_key_migration_keeps_conflicting_rows(db_path):
+    _old_database(db_path, [("Story", "Series", 1990), ("Story", "Series", 2005)])
+    db = DBManager(db_path=db_path)
+    rows = db.conn.execute("SELECT story_name, year FROM arkas ORDER BY id").fetchall()
+    assert [tuple(row) for row in rows] == [("Story", 1990), ("Story", 2005)]
+    assert models.natural_key_conflicts(db.conn, "arkas") == [("Story", "Series", 2)]
+    with pytest.raises(ValueError, match="Story / Series"):
+        db.bulk_add_arkas([("New", "Series", 2010)], conflict="skip")
+    # Once the user has merged the rows the key is enforced again.
+    db.conn.execute("DELETE FROM arkas WHERE year = 2005")
+    db.conn.commit()
+    assert db.bulk_add_arkas([("Story", "Series", 2010)], conflict="skip") == (0, [])
+    with pytest.raises(sqlite3.IntegrityError):
+        db.add_arkas("Story", "Series", 2000)
+    db.close()